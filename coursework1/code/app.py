@@ -5,10 +5,10 @@ import plotly.graph_objects as go
 from wordcloud import WordCloud, STOPWORDS
 import base64
 from io import BytesIO
-import sys
 from pathlib import Path
 import pandas as pd
 from nltk.sentiment import SentimentIntensityAnalyzer
+from coursework2.gla_grants_app.data_cache import load_cached_frame
 
 meta_tags = [
     {"name": "viewport", "content": "width=device-width, initial-scale=1"},
@@ -18,22 +18,37 @@ app = Dash(__name__, external_stylesheets=external_stylesheets,
            meta_tags=meta_tags)
 
 
+def read_grants_excel(excel_file_path):
+    """
+    Read the grants workbook and apply the standard processing.
+
+    Args:
+        excel_file_path (str): Path of the Excel workbook.
+
+    Returns:
+        pandas.DataFrame: Grants data with parsed award dates, sorted by date.
+    """
+    data = pd.read_excel(excel_file_path)
+    data['Award_Date'] = pd.to_datetime(data['Award_Date'])
+    data = data.sort_values(by='Award_Date')
+    return data
+
+
 def process_data():
     """
     Process and load the grants data from an Excel file.
 
+    The processed frame is cached next to the workbook in a columnar archive,
+    so Excel is only parsed again when the workbook changes.
+
     Returns:
         pandas.DataFrame: Processed DataFrame containing grants data with
         properly formatted datetime columns.
     """
     code_directory = Path(__file__).resolve().parent
     coursework1_root = code_directory.parent
-    sys.path.append(str(coursework1_root))
     excel_file_path = coursework1_root / 'data' / 'cleaned_grants_data.xlsx'
-    data = pd.read_excel(excel_file_path)
-    data['Award_Date'] = pd.to_datetime(data['Award_Date'])
-    data = data.sort_values(by='Award_Date')
-    return data
+    return load_cached_frame(str(excel_file_path), read_grants_excel)
 
 
 df = process_data()
@@ -0,0 +1,88 @@
+"""
+Benchmark for the admin application search.
+
+Fills a fresh database with synthetic applications, builds the FTS5 index
+through the schema upgrade, and compares a page of search_applications
+results with the LIKE query an unindexed search would run over the title,
+description and question, for a rare word and for one in almost every
+application. LIKE returns the first rows by id without ranking, so it stops
+early when most rows match; FTS5 ranks the newest RANK_LIMIT matches, so a
+common word must stay within COMMON_WORD_BUDGET_MS.
+
+Run from the project root:
+    python coursework2/benchmarks/bench_admin_search.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from flask import Flask
+
+from coursework2.gla_grants_app import db
+from coursework2.gla_grants_app.application_search import search_applications
+from coursework2.gla_grants_app.migrations import upgrade_schema
+from coursework2.gla_grants_app.models import GrantApplication, User
+
+APPLICATIONS = 300_000
+REPEAT = 20
+COMMON_WORD_BUDGET_MS = 200
+WORDS = ('community garden youth sport arts music health library housing school park '
+         'training food climate repair cafe theatre festival mural volunteer').split()
+LIKE_SQL = db.text("""
+    SELECT id, title FROM grant_applications
+    WHERE title LIKE :pattern OR description LIKE :pattern OR question LIKE :pattern
+    ORDER BY id LIMIT 20
+""")
+
+
+def fill(rng):
+    """Insert the users and synthetic applications, then build the search index."""
+    db.metadata.create_all(db.engine, tables=[User.__table__, GrantApplication.__table__])
+    db.session.add(User(username='user', password='hash'))
+    db.session.commit()
+    rows = [
+        {'user_id': 1, 'title': ' '.join(rng.choices(WORDS, k=4)), 'category': 'Community',
+         'description': ' '.join(rng.choices(WORDS, k=60)) + (' allotment' if i % 1000 == 0 else ''),
+         'question': ' '.join(rng.choices(WORDS, k=12)), 'date_submitted': date.today()}
+        for i in range(APPLICATIONS)
+    ]
+    db.session.execute(db.insert(GrantApplication), rows)
+    db.session.commit()
+    start = time.perf_counter()
+    upgrade_schema(db.engine)
+    print(f"{APPLICATIONS:,} applications, index built in {time.perf_counter() - start:.1f}s")
+
+
+def time_query(func, *args):
+    """Return the mean milliseconds of REPEAT calls."""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(*args)
+    return (time.perf_counter() - start) * 1000 / REPEAT
+
+
+def main():
+    """Build the database and time both searches for a rare and a common word."""
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(directory, 'bench.sqlite')}"
+        db.init_app(app)
+        with app.app_context():
+            fill(random.Random(0))
+            for word in ('allotment', 'festival'):
+                like = time_query(lambda: db.session.execute(LIKE_SQL, {'pattern': f'%{word}%'}).all())
+                fts = time_query(search_applications, word)
+                print(f"'{word}':")
+                print(f"  LIKE, first 20 by id   {like:9.2f}ms")
+                print(f"  FTS5, ranked page      {fts:9.2f}ms")
+            assert fts < COMMON_WORD_BUDGET_MS, f"searching '{word}' took {fts:.0f}ms"
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
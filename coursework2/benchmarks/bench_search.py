@@ -0,0 +1,73 @@
+"""
+Benchmark for the Grants Table search.
+
+Compares the original row scan (stringify every cell of every row with
+``row.astype(str).str.contains``) with TextSearchIndex lookups, on the
+shipped workbook and on copies replicated 10 and 100 times. The row scan is
+timed on a sample and extrapolated, since it takes minutes per keystroke on
+the larger copies.
+
+Run from the project root:
+    python coursework2/benchmarks/bench_search.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pandas as pd
+
+from coursework2.gla_grants_app.compact import compact_frame
+from coursework2.gla_grants_app.dash_app import process_data
+from coursework2.gla_grants_app.search_index import TextSearchIndex
+
+BASELINE_SAMPLE = 1000
+TERMS = ['youth', 'th clu', 'grant to', '2019-0', 'communit(?:y|ies)']
+
+
+def row_scan(df, term):
+    """The original update_table filter."""
+    return df[df.apply(lambda row: row.astype(str).str.contains(term, case=False).any(), axis=1)]
+
+
+def time_call(func, *args):
+    """Return (result, seconds) for a single call."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def bench(df, label):
+    """Time the row scan and the index for each term and print a summary."""
+    index, build_seconds = time_call(TextSearchIndex, df)
+    sample = df.head(BASELINE_SAMPLE)
+    print(f"{label}: {len(df):,} rows (index built in {build_seconds:.2f}s)")
+    for term in TERMS:
+        expected, sample_seconds = time_call(row_scan, sample, term)
+        baseline_seconds = sample_seconds * len(df) / len(sample)
+        matches, indexed_seconds = time_call(index.filter, df, term)
+        assert matches.head(len(expected)).equals(expected)
+        print(f"  {term!r:22} {len(matches):7,} rows   row scan {baseline_seconds * 1000:9.0f}ms   "
+              f"index {indexed_seconds * 1000:7.1f}ms ({baseline_seconds / indexed_seconds:,.0f}x)")
+
+
+def replicate(df, copies):
+    """Concatenate copies of df with distinct titles and descriptions."""
+    replicas = [
+        df.assign(Title=df['Title'] + f' {i}', Description_=df['Description_'] + f' {i}')
+        for i in range(copies)
+    ]
+    return compact_frame(pd.concat(replicas, ignore_index=True))
+
+
+def main():
+    """Run the benchmark on the shipped and the 10x and 100x replicated dataset."""
+    df = process_data()
+    bench(compact_frame(df), 'shipped workbook')
+    bench(replicate(df, 10), '10x replicated')
+    bench(replicate(df, 100), '100x replicated')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for the sentiment engine.
+
+Compares the original per-row scoring (a new SentimentIntensityAnalyzer for
+every description) with the batched engine, on the shipped workbook and on
+a copy replicated 100 times. The per-row baseline is timed on a sample and
+extrapolated, since running it on the replicated data takes many minutes.
+
+Run from the project root:
+    python coursework2/benchmarks/bench_sentiment.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pandas as pd
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+from coursework2.gla_grants_app.dash_app import process_data
+from coursework2.gla_grants_app.sentiment import score_descriptions
+
+BASELINE_SAMPLE = 200
+
+
+def per_row_sentiment(text):
+    """The original analyze_sentiment: one analyzer per call."""
+    if isinstance(text, str):
+        return SentimentIntensityAnalyzer().polarity_scores(text)['compound']
+    return 0
+
+
+def time_call(func, *args, **kwargs):
+    """Return (result, seconds) for a single call."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench(descriptions, label):
+    """Time baseline and engine on one input and print a summary line."""
+    sample = descriptions.head(BASELINE_SAMPLE)
+    baseline, sample_seconds = time_call(sample.apply, per_row_sentiment)
+    baseline_seconds = sample_seconds * len(descriptions) / len(sample)
+
+    serial, serial_seconds = time_call(
+        score_descriptions, descriptions, parallel_threshold=None)
+    pooled, pooled_seconds = time_call(
+        score_descriptions, descriptions, parallel_threshold=0)
+
+    assert baseline.equals(serial.head(BASELINE_SAMPLE))
+    assert serial.equals(pooled)
+
+    print(f"{label}: {len(descriptions):,} rows")
+    print(f"  per-row (extrapolated) {baseline_seconds:9.2f}s")
+    print(f"  engine, serial         {serial_seconds:9.2f}s "
+          f"({baseline_seconds / serial_seconds:,.0f}x)")
+    print(f"  engine, process pool   {pooled_seconds:9.2f}s "
+          f"({baseline_seconds / pooled_seconds:,.0f}x)")
+
+
+def main():
+    """Run the benchmark on the shipped and the 100x replicated dataset."""
+    df = process_data()
+    bench(df['Description_'], 'shipped workbook')
+
+    # Make every replica distinct so de-duplication does not hide the work.
+    replicated = pd.concat(
+        [df['Description_'] + f' {i}' for i in range(100)], ignore_index=True)
+    bench(replicated, '100x replicated')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark for the SQLite performance profile.
+
+Runs the same concurrent workload against a fresh database file with
+SQLite's default settings and with PERFORMANCE_PRAGMAS: several threads,
+each with its own connection, submit applications, review them (read, then
+update the comment, as the admin review route does) and read account
+histories. Reports write throughput, write latency percentiles and the
+writes that failed with "database is locked".
+
+Run from the project root:
+    python coursework2/benchmarks/bench_sqlite.py
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from coursework2.gla_grants_app import db
+from coursework2.gla_grants_app.models import GrantApplication, User
+from coursework2.gla_grants_app.sqlite_profile import PERFORMANCE_PRAGMAS, apply_sqlite_pragmas
+
+THREADS = 8
+OPERATIONS = 250
+USERS = 50
+SEED_APPLICATIONS = 2000
+
+
+def seed(engine):
+    """Create the tables with users and applications to review."""
+    db.metadata.create_all(engine, tables=[User.__table__, GrantApplication.__table__])
+    with Session(engine) as session:
+        session.add_all(User(username=f'user{i}', password='hash') for i in range(USERS))
+        session.add_all(
+            GrantApplication(user_id=i % USERS + 1, title=f'Application {i}', description='Description ' * 40,
+                             category='Community', question='Question', date_submitted=date.today())
+            for i in range(SEED_APPLICATIONS)
+        )
+        session.commit()
+
+
+def worker(engine, rng, latencies, errors):
+    """Run OPERATIONS mixed operations, timing every write."""
+    for _ in range(OPERATIONS):
+        operation = rng.choice(('submit', 'review', 'history'))
+        start = time.perf_counter()
+        try:
+            with Session(engine) as session:
+                if operation == 'submit':
+                    session.add(GrantApplication(
+                        user_id=rng.randint(1, USERS), title='New application', description='Description ' * 40,
+                        category='Health', question='Question', date_submitted=date.today()))
+                elif operation == 'review':
+                    application = session.get(GrantApplication, rng.randint(1, SEED_APPLICATIONS))
+                    application.comment = f'Reviewed at {time.time()}'
+                else:
+                    session.execute(select(GrantApplication).filter_by(user_id=rng.randint(1, USERS))
+                                    .order_by(GrantApplication.date_submitted.desc())).all()
+                session.commit()
+        except OperationalError as e:
+            errors.append(str(e.orig))
+            continue
+        if operation != 'history':
+            latencies.append(time.perf_counter() - start)
+
+
+def bench(label, pragmas):
+    """Run the workload on a fresh database with the given pragmas and print a summary."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.sqlite')}",
+                               pool_size=THREADS, max_overflow=0)
+        apply_sqlite_pragmas(engine, pragmas)
+        seed(engine)
+
+        latencies, errors = [], []
+        threads = [threading.Thread(target=worker, args=(engine, random.Random(i), latencies, errors))
+                   for i in range(THREADS)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - start
+        engine.dispose()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"{label}: {THREADS} threads x {OPERATIONS} operations")
+    print(f"  writes committed       {len(latencies):9,}")
+    print(f"  write throughput       {len(latencies) / seconds:9,.0f}/s")
+    print(f"  write latency p50      {percentiles[49] * 1000:9.2f}ms")
+    print(f"  write latency p99      {percentiles[98] * 1000:9.2f}ms")
+    print(f"  'database is locked'   {sum('locked' in e for e in errors):9,}")
+
+
+def main():
+    """Run the workload with SQLite's defaults and with the performance profile."""
+    bench('default settings', None)
+    bench('performance profile', PERFORMANCE_PRAGMAS)
+
+
+if __name__ == '__main__':
+    main()
@@ -63,8 +63,14 @@ def create_app(test_config=None):
         def internal_server_error(e):
             return render_template('errors/500.html'), 500
         
+        from coursework2.gla_grants_app.sqlite_profile import PERFORMANCE_PRAGMAS, apply_sqlite_pragmas
+        apply_sqlite_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS', PERFORMANCE_PRAGMAS))
+        
         db.create_all()
         
+        from coursework2.gla_grants_app.migrations import upgrade_schema
+        upgrade_schema(db.engine)
+        
         from coursework2.gla_grants_app.helpers import setup_db_data
         setup_db_data()
         
@@ -0,0 +1,166 @@
+"""
+Full-text search over submitted grant applications for admins.
+
+Matching a term with LIKE against the title, description and question of
+every application scans the whole table. grant_applications_fts is an FTS5
+index over those three columns, stored as an external-content table so the
+text is not duplicated: it only holds the inverted index and reads the
+columns back from grant_applications by rowid (the application id) for
+snippets. Triggers on grant_applications keep it in sync with every insert,
+delete and edit of the indexed columns, so the ORM needs no changes.
+
+The index is created by the schema upgrade (see migrations), which also
+indexes the applications already stored.
+"""
+import html
+import re
+
+from sqlalchemy import text
+
+from coursework2.gla_grants_app import db
+
+# Statements creating the index and its triggers, run once per database.
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS grant_applications_fts USING fts5(
+        title, description, question,
+        content='grant_applications', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS grant_applications_fts_insert AFTER INSERT ON grant_applications BEGIN
+        INSERT INTO grant_applications_fts (rowid, title, description, question)
+        VALUES (new.id, new.title, new.description, new.question);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS grant_applications_fts_delete AFTER DELETE ON grant_applications BEGIN
+        INSERT INTO grant_applications_fts (grant_applications_fts, rowid, title, description, question)
+        VALUES ('delete', old.id, old.title, old.description, old.question);
+    END""",
+    # Reviews only change the comment, which is not indexed
+    """CREATE TRIGGER IF NOT EXISTS grant_applications_fts_update
+    AFTER UPDATE OF id, title, description, question ON grant_applications BEGIN
+        INSERT INTO grant_applications_fts (grant_applications_fts, rowid, title, description, question)
+        VALUES ('delete', old.id, old.title, old.description, old.question);
+        INSERT INTO grant_applications_fts (rowid, title, description, question)
+        VALUES (new.id, new.title, new.description, new.question);
+    END""",
+    "INSERT INTO grant_applications_fts (grant_applications_fts) VALUES ('rebuild')",
+]
+
+# bm25 weights of the title, description and question columns
+COLUMN_WEIGHTS = (10.0, 1.0, 2.0)
+# Matches ranked per query by default: scoring every application containing
+# a common word takes hundreds of milliseconds, so only the newest are ranked
+RANK_LIMIT = 5000
+SNIPPET_TOKENS = 16
+
+# Control characters marking matches in snippets until the text is escaped
+_MATCH_START, _MATCH_END = '\x02', '\x03'
+_TERM = re.compile(r'\w+')
+
+# The newest :rank_limit matches are read from the index in id order and
+# ranked there, and snippets are only built for the rows of the requested
+# page, in one more pass over the matches within the page's id range.
+_SEARCH_SQL = text(f"""
+    WITH ranked AS (
+        SELECT rowid, bm25(grant_applications_fts, {', '.join(map(str, COLUMN_WEIGHTS))}) AS score
+        FROM grant_applications_fts
+        WHERE grant_applications_fts MATCH :expression
+        ORDER BY rowid DESC
+        LIMIT :rank_limit
+    ),
+    page AS (
+        SELECT rowid, score FROM ranked
+        ORDER BY score, rowid
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT grant_applications.id, grant_applications.title, grant_applications.category,
+           grant_applications.date_submitted, grant_applications.comment IS NOT NULL AS reviewed,
+           snippet(grant_applications_fts, -1, '{_MATCH_START}', '{_MATCH_END}', '…', {SNIPPET_TOKENS}) AS snippet
+    -- CROSS JOIN keeps the scan of the index outermost: looking prefix
+    -- terms up by rowid would rebuild their doclists once per row
+    FROM grant_applications_fts
+    CROSS JOIN page ON page.rowid = grant_applications_fts.rowid
+    JOIN grant_applications ON grant_applications.id = page.rowid
+    WHERE grant_applications_fts MATCH :expression
+      AND grant_applications_fts.rowid BETWEEN (SELECT MIN(rowid) FROM page) AND (SELECT MAX(rowid) FROM page)
+    ORDER BY page.score, page.rowid
+""")
+
+# Whether more than :rank_limit applications match; walks the doclist only
+_TRUNCATED_SQL = text("""
+    SELECT EXISTS (
+        SELECT 1 FROM grant_applications_fts
+        WHERE grant_applications_fts MATCH :expression
+        ORDER BY rowid DESC
+        LIMIT 1 OFFSET :rank_limit
+    )
+""")
+
+
+def match_expression(query):
+    """
+    Turn a search box query into an FTS5 MATCH expression.
+
+    Every word of the query must occur (in any column), and the last one
+    may be the beginning of a word, so results follow what is being typed.
+    Words are quoted, so FTS5 syntax such as ``OR``, ``NEAR`` or column
+    filters in the query is searched for literally.
+
+    Args:
+        query (str): Text typed by the admin.
+
+    Returns:
+        str: MATCH expression, or None if the query has no words.
+    """
+    terms = [f'"{term}"' for term in _TERM.findall(query)]
+    if not terms:
+        return None
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _snippet_html(snippet):
+    """Escape a snippet and wrap its matches in <mark> tags."""
+    return (html.escape(snippet or '')
+            .replace(_MATCH_START, '<mark>').replace(_MATCH_END, '</mark>'))
+
+
+def search_applications(query, page=1, per_page=20, rank_limit=RANK_LIMIT):
+    """
+    Return one page of applications matching a query, best matches first.
+
+    Matches are ranked by BM25, with title matches weighing the most. Only
+    the ``rank_limit`` newest matches are ranked and returned, so a word
+    found in most applications costs as much as one found in
+    ``rank_limit`` of them; the result says when older matches were left
+    out.
+
+    Args:
+        query (str): Text typed by the admin.
+        page (int, optional): 1-based page number.
+        per_page (int, optional): Results per page.
+        rank_limit (int, optional): Most recent matches ranked.
+
+    Returns:
+        tuple: (list of result dicts with 'id', 'title', 'category',
+        'date_submitted', 'reviewed' and 'snippet', an HTML-escaped extract
+        with the matches in <mark> tags; whether a later page exists;
+        whether more than ``rank_limit`` applications matched).
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return [], False, False
+    rows = db.session.execute(_SEARCH_SQL, {
+        'expression': expression,
+        'rank_limit': rank_limit,
+        'limit': per_page + 1,
+        'offset': (page - 1) * per_page,
+    }).mappings().all()
+    truncated = bool(db.session.execute(_TRUNCATED_SQL, {
+        'expression': expression,
+        'rank_limit': rank_limit,
+    }).scalar())
+    results = [
+        dict(row, reviewed=bool(row['reviewed']), snippet=_snippet_html(row['snippet']))
+        for row in rows[:per_page]
+    ]
+    return results, len(rows) > per_page, truncated
@@ -0,0 +1,59 @@
+"""
+Dash application that serves its layout as cached, ETag-tagged bytes.
+
+Dash serialises the layout to JSON on every ``/dash/_dash-layout`` request.
+CachedLayoutDash encodes the layout once per version of the data behind it,
+and sends it with an ETag and ``Cache-Control: no-cache``: browsers (e.g.
+the dashboard iframe on reload) revalidate and get a 304 Not Modified
+instead of the layout again.
+"""
+import hashlib
+
+from dash import Dash
+from flask import Response, request
+from plotly.io.json import to_json_plotly
+
+
+class CachedLayoutDash(Dash):
+    """
+    Dash app whose layout response is cached per layout version.
+
+    Args:
+        layout_version (callable): Function returning the version of the
+            current layout (e.g. the dataset version), or None when the
+            layout must not be cached (e.g. a loading page).
+        *args, **kwargs: Passed on to Dash.
+    """
+
+    def __init__(self, *args, layout_version, **kwargs):
+        self._layout_version = layout_version
+        self._encoded_layout = None  # (version, etag, body)
+        super().__init__(*args, **kwargs)
+
+    def encoded_layout(self):
+        """
+        Return the JSON-encoded layout and its ETag for the current version.
+
+        Returns:
+            tuple: (etag, body bytes), with etag None if the layout is not
+            cacheable.
+        """
+        version = self._layout_version()
+        if version is None:
+            return None, to_json_plotly(self.get_layout()).encode('utf-8')
+        if self._encoded_layout is None or self._encoded_layout[0] != version:
+            body = to_json_plotly(self.get_layout()).encode('utf-8')
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            self._encoded_layout = (version, etag, body)
+        return self._encoded_layout[1:]
+
+    def serve_layout(self):
+        """Serve the layout, answering revalidations with 304 Not Modified."""
+        etag, body = self.encoded_layout()
+        response = Response(body, mimetype='application/json')
+        if etag is None:
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
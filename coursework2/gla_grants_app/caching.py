@@ -0,0 +1,274 @@
+"""
+Bounded caches for rendered dashboard artefacts.
+
+LRUCache keeps at most ``maxsize`` entries, evicting the least recently
+used one first, and optionally expires entries after ``ttl`` seconds. It
+counts hits, misses, evictions and expirations, and may be shared by
+concurrent Dash callback threads.
+
+SQLiteCache has the same interface but keeps pickled values in an SQLite
+file, so it is shared by every worker process of the app and survives
+restarts.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with an optional time to live.
+
+    Args:
+        maxsize (int): Maximum number of entries; 0 disables caching.
+        ttl (float, optional): Seconds an entry stays valid; None keeps
+            entries until they are evicted.
+        clock (callable, optional): Time source, for tests.
+    """
+
+    def __init__(self, maxsize, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for ``key`` and mark it as recently used.
+
+        Args:
+            key: Cache key.
+            default: Value returned on a miss.
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self._clock() - entry[0] >= self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for ``key``, computing and storing it on a miss.
+
+        ``compute`` runs outside the lock, so a slow computation does not
+        block other keys; concurrent misses on the same key may each compute.
+
+        Args:
+            key: Cache key.
+            compute (callable): Function returning the value.
+
+        Returns:
+            The cached or newly computed value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Remove every entry (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Return the cache counters as a JSON-serialisable dict.
+
+        Returns:
+            dict: Size, limits, hits, misses, evictions and expirations.
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class SQLiteCache:
+    """
+    Least-recently-used cache of pickled values in an SQLite file.
+
+    Only pickle values produced by this app: the file must not be writable
+    by anyone else.
+
+    Args:
+        path (str): Path of the database file; its directory is created.
+        maxsize (int): Maximum number of entries; 0 disables caching.
+        ttl (float, optional): Seconds an entry stays valid; None keeps
+            entries until they are evicted.
+        clock (callable, optional): Time source, for tests.
+    """
+
+    def __init__(self, path, maxsize, ttl=None, clock=time.time):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                'stored_at REAL NOT NULL, used_at REAL NOT NULL)')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS ix_cache_entries_used_at ON cache_entries (used_at)')
+
+    def _connect(self):
+        """Return this thread's connection to the cache file."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for ``key`` and mark it as recently used.
+
+        Args:
+            key (str): Cache key.
+            default: Value returned on a miss.
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        now = self._clock()
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT value, stored_at FROM cache_entries WHERE key = ?', (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] >= self.ttl:
+                connection.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+                self._count('expirations')
+                row = None
+            if row is None:
+                self._count('misses')
+                return default
+            connection.execute('UPDATE cache_entries SET used_at = ? WHERE key = ?', (now, key))
+        self._count('hits')
+        return pickle.loads(row[0])
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key (str): Cache key.
+            value: Picklable value to store.
+        """
+        if self.maxsize <= 0:
+            return
+        now = self._clock()
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, stored_at, used_at) '
+                'VALUES (?, ?, ?, ?)', (key, data, now, now))
+            evicted = connection.execute(
+                'DELETE FROM cache_entries WHERE key IN ('
+                'SELECT key FROM cache_entries ORDER BY used_at DESC, rowid DESC '
+                'LIMIT -1 OFFSET ?)', (self.maxsize,)).rowcount
+        if evicted > 0:
+            with self._lock:
+                self.evictions += evicted
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for ``key``, computing and storing it on a miss.
+
+        Args:
+            key (str): Cache key.
+            compute (callable): Function returning the value.
+
+        Returns:
+            The cached or newly computed value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Remove every entry (the counters are kept)."""
+        with self._connect() as connection:
+            connection.execute('DELETE FROM cache_entries')
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+    def stats(self):
+        """
+        Return the cache counters as a JSON-serialisable dict.
+
+        Returns:
+            dict: Size, limits, hits, misses, evictions and expirations of
+            this process.
+        """
+        size = len(self)
+        with self._lock:
+            return {
+                'size': size,
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
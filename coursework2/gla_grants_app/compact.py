@@ -0,0 +1,161 @@
+"""
+Compact in-memory representation of the grants DataFrame.
+
+Repeated strings such as department and organisation names are stored as
+categoricals, integer columns are downcast, float columns are downcast only
+when no precision is lost, and the remaining string columns are interned so
+duplicate values share one Python object. memory_report() shows the bytes
+used per column before and after.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Columns with at most this share of distinct values become categoricals.
+DEFAULT_MAX_CATEGORY_RATIO = 0.5
+
+
+def _is_string_column(series):
+    """Return True for object/str columns whose non-null values are all str."""
+    if not (pd.api.types.is_object_dtype(series.dtype)
+            or pd.api.types.is_string_dtype(series.dtype)):
+        return False
+    return all(isinstance(value, str) for value in series.dropna())
+
+
+def _intern_values(series):
+    """Return the column with every str value replaced by its interned copy."""
+    values = [sys.intern(v) if isinstance(v, str) else v for v in series.to_numpy(dtype=object)]
+    return pd.Series(pd.array(values, dtype=series.dtype), index=series.index, name=series.name)
+
+
+def compact_column(series, max_category_ratio=DEFAULT_MAX_CATEGORY_RATIO):
+    """
+    Return a compact but value-identical version of a column.
+
+    Args:
+        series (pandas.Series): Column to compact.
+        max_category_ratio (float, optional): Maximum ratio of distinct values
+            to rows for a string column to become categorical.
+
+    Returns:
+        pandas.Series: The compacted column.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or len(series) == 0:
+        return series
+
+    if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return pd.to_numeric(series, downcast='integer')
+
+    if pd.api.types.is_float_dtype(dtype):
+        downcast = series.astype(np.float32)
+        if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+            return downcast
+        return series
+
+    if _is_string_column(series):
+        if series.nunique() <= max_category_ratio * len(series):
+            return series.astype('category')
+        return _intern_values(series)
+
+    if pd.api.types.is_object_dtype(dtype):
+        return _intern_values(series)
+
+    return series
+
+
+def compact_frame(df, max_category_ratio=DEFAULT_MAX_CATEGORY_RATIO):
+    """
+    Build a compact copy of a DataFrame with identical values.
+
+    Args:
+        df (pandas.DataFrame): Frame to compact.
+        max_category_ratio (float, optional): See compact_column.
+
+    Returns:
+        pandas.DataFrame: Compacted frame with the same index and columns.
+    """
+    return pd.DataFrame(
+        {column: compact_column(df[column], max_category_ratio) for column in df.columns},
+        index=df.index,
+    )
+
+
+def decode_categoricals(df):
+    """
+    Return a copy of a (small) frame with categorical columns decoded.
+
+    Used before handing aggregated results to plotly express, which
+    aggregates colour columns in ways unordered categoricals do not support.
+
+    Args:
+        df (pandas.DataFrame): Frame to decode.
+
+    Returns:
+        pandas.DataFrame: Frame with plain value columns.
+    """
+    decoded = df.copy()
+    for column in decoded.columns:
+        if isinstance(decoded[column].dtype, pd.CategoricalDtype):
+            decoded[column] = decoded[column].astype(decoded[column].cat.categories.dtype)
+    return decoded
+
+
+def column_nbytes(series):
+    """
+    Return the bytes held by a column, counting shared objects once.
+
+    pandas' deep memory usage counts every Python object per row, so it
+    cannot show the effect of interning; this counts the pointer array plus
+    each distinct object.
+
+    Args:
+        series (pandas.Series): Column to measure.
+
+    Returns:
+        int: Approximate number of bytes.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        return codes.nbytes + column_nbytes(pd.Series(series.cat.categories))
+
+    values = series.to_numpy()
+    if values.dtype != object:
+        return values.nbytes
+    distinct = {id(value): value for value in values}
+    return values.nbytes + sum(sys.getsizeof(value) for value in distinct.values())
+
+
+def memory_report(before, after):
+    """
+    Compare per-column memory use of two versions of a DataFrame.
+
+    Args:
+        before (pandas.DataFrame): Original frame.
+        after (pandas.DataFrame): Compacted frame.
+
+    Returns:
+        pandas.DataFrame: One row per column (plus a 'Total' row) with the
+        dtype and bytes before and after, and the bytes saved.
+    """
+    rows = []
+    for column in before.columns:
+        rows.append({
+            'column': column,
+            'dtype_before': str(before[column].dtype),
+            'dtype_after': str(after[column].dtype),
+            'bytes_before': column_nbytes(before[column]),
+            'bytes_after': column_nbytes(after[column]),
+        })
+    rows.append({
+        'column': 'Total',
+        'dtype_before': '',
+        'dtype_after': '',
+        'bytes_before': sum(row['bytes_before'] for row in rows),
+        'bytes_after': sum(row['bytes_after'] for row in rows),
+    })
+    report = pd.DataFrame(rows).set_index('column')
+    report['bytes_saved'] = report['bytes_before'] - report['bytes_after']
+    return report
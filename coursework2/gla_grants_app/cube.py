@@ -0,0 +1,197 @@
+"""
+Pre-aggregated grants cube for the metric, pie and duration callbacks.
+
+GrantsCube is built once per loaded dataset. It holds, per award year and
+department, the number of grants, the amount awarded, the longest duration
+and the position of the first grant, and per 100-day duration bucket the
+number of grants. Any year range is answered by summing slices of these
+arrays, so callback cost depends on the number of years, departments and
+buckets rather than the number of grants.
+
+Undated grants and grants without a department get their own slot, so totals
+over all rows stay exact.
+"""
+import numpy as np
+import pandas as pd
+
+# Width of a duration bucket in days, as used by the duration chart.
+DURATION_BUCKET_DAYS = 100
+
+
+class GrantsCube:
+    """
+    Year x department x duration-bucket aggregates of a grants DataFrame.
+
+    Attributes:
+        years: Distinct award years, ascending. Axis 0 of every array has
+            one extra slot at the end for undated grants.
+        departments: Department names, sorted. Axis 1 has one extra slot at
+            the end for grants without a department.
+        rows: Number of grants per (year, department).
+        amount: Sum of Amount_awarded per (year, department).
+        first_row: Position of the first grant per (year, department).
+        max_duration: Longest Duration_(Days) per (year, department).
+        duration_rows: Number of grants per (year, department, bucket).
+        duration_ids: Grants with an Identifier per (year, department, bucket).
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pandas.DataFrame): Grants frame with Award_Date,
+                Funding_Org:Department, Amount_awarded and Identifier
+                columns, and optionally Duration_(Days).
+        """
+        rows = len(df)
+        award_years = pd.to_datetime(df['Award_Date']).dt.year.to_numpy(dtype=float, na_value=np.nan)
+        dated = ~np.isnan(award_years)
+        self.years = np.unique(award_years[dated]).astype(np.int64)
+        year_slot = np.full(rows, len(self.years), dtype=np.int64)
+        year_slot[dated] = np.searchsorted(self.years, award_years[dated])
+
+        department_codes, departments = pd.factorize(df['Funding_Org:Department'], sort=True)
+        self.departments = [str(department) for department in departments]
+        department_slot = np.where(department_codes < 0, len(self.departments), department_codes)
+
+        if 'Duration_(Days)' in df.columns:
+            durations = df['Duration_(Days)'].to_numpy(dtype=float, na_value=np.nan)
+        else:
+            durations = np.full(rows, 365.0)  # Default if column doesn't exist
+        bucketed = durations >= 0
+        bucket = np.zeros(rows, dtype=np.int64)
+        bucket[bucketed] = durations[bucketed] // DURATION_BUCKET_DAYS
+        buckets = int(bucket.max()) + 1 if rows else 0
+
+        shape = (len(self.years) + 1, len(self.departments) + 1)
+        cell = np.ravel_multi_index((year_slot, department_slot), shape)
+        size = shape[0] * shape[1]
+
+        self.rows = np.bincount(cell, minlength=size).reshape(shape)
+        amounts = df['Amount_awarded'].to_numpy(dtype=float, na_value=np.nan)
+        self.amount = np.bincount(
+            cell, weights=np.nan_to_num(amounts, nan=0.0), minlength=size).reshape(shape)
+
+        self.first_row = np.full(size, rows, dtype=np.int64)
+        np.minimum.at(self.first_row, cell, np.arange(rows))
+        self.first_row = self.first_row.reshape(shape)
+
+        self.max_duration = np.full(size, -np.inf)
+        np.fmax.at(self.max_duration, cell, durations)
+        self.max_duration = self.max_duration.reshape(shape)
+
+        duration_cell = cell[bucketed] * buckets + bucket[bucketed]
+        self.duration_rows = np.bincount(
+            duration_cell, minlength=size * buckets).reshape(shape + (buckets,))
+        has_identifier = df['Identifier'].notna().to_numpy()[bucketed]
+        self.duration_ids = np.bincount(
+            duration_cell, weights=has_identifier, minlength=size * buckets
+        ).astype(np.int64).reshape(shape + (buckets,))
+
+    def year_slice(self, years_range=None):
+        """
+        Return the year-axis slice for an inclusive year range.
+
+        Args:
+            years_range (list, optional): ``[first_year, last_year]``; falsy
+                selects every grant, including undated ones.
+
+        Returns:
+            slice: Slice of axis 0.
+        """
+        if not years_range:
+            return slice(None)
+        return slice(np.searchsorted(self.years, years_range[0], side='left'),
+                     np.searchsorted(self.years, years_range[1], side='right'))
+
+    def totals(self, years_range=None):
+        """
+        Return the amount awarded and number of grants in a year range.
+
+        Args:
+            years_range (list, optional): Inclusive year range.
+
+        Returns:
+            tuple: (total amount, number of grants).
+        """
+        years = self.year_slice(years_range)
+        return float(self.amount[years].sum()), int(self.rows[years].sum())
+
+    def department_counts(self, years_range=None):
+        """
+        Count grants per department in a year range.
+
+        Matches ``value_counts()`` of the filtered department column,
+        including the order of departments with equal counts.
+
+        Args:
+            years_range (list, optional): Inclusive year range.
+
+        Returns:
+            pandas.Series: Counts indexed by department, largest first.
+        """
+        years = self.year_slice(years_range)
+        counts = self.rows[years, :-1].sum(axis=0)
+        first_rows = self.first_row[years, :-1].min(axis=0, initial=np.iinfo(np.int64).max)
+        present = np.flatnonzero(counts)
+        # value_counts lists values in order of first appearance before sorting.
+        present = present[np.argsort(first_rows[present], kind='stable')]
+        index = pd.Index([self.departments[i] for i in present], name='Funding_Org:Department')
+        return pd.Series(counts[present], index=index, name='count').sort_values(
+            ascending=False, kind='stable')
+
+    def duration_counts(self, years_range=None, department=None):
+        """
+        Count grants per duration bucket and department in a year range.
+
+        Reproduces the duration chart's ``pd.cut(..., right=False)`` over
+        bins from 0 to the longest selected duration, including the last
+        bucket being dropped when that duration is a multiple of the bucket
+        width.
+
+        Args:
+            years_range (list, optional): Inclusive year range.
+            department (str, optional): Restrict to one department.
+
+        Returns:
+            pandas.DataFrame: Columns Duration_Category (categorical),
+            Funding_Org:Department and Count, ordered by bucket then
+            department.
+        """
+        years = self.year_slice(years_range)
+        if department is None:
+            departments = slice(None)
+        elif department in self.departments:
+            index = self.departments.index(department)
+            departments = slice(index, index + 1)
+        else:
+            departments = slice(0, 0)
+
+        selected_max = self.max_duration[years, departments]
+        max_duration = selected_max.max() if selected_max.size else -np.inf
+        if max_duration == -np.inf:
+            raise ValueError("No grant durations in the selection")
+        max_duration = int(max_duration)
+        bins = list(range(0, max_duration + DURATION_BUCKET_DAYS, DURATION_BUCKET_DAYS))
+        labels = [f"{i}-{i+99}" for i in bins[:-1]]
+
+        department_slots = np.arange(len(self.departments) + 1)[departments]
+        rows = self.duration_rows[years, departments, :len(labels)].sum(axis=0)
+        ids = self.duration_ids[years, departments, :len(labels)].sum(axis=0)
+        # Grants without a department are not grouped.
+        named = department_slots < len(self.departments)
+        rows, ids, department_slots = rows[named], ids[named], department_slots[named]
+
+        slot_index, bucket_index = np.nonzero(rows)
+        order = np.lexsort((slot_index, bucket_index))
+        slot_index, bucket_index = slot_index[order], bucket_index[order]
+        duration_data = pd.DataFrame({
+            'Duration_Category': pd.Categorical.from_codes(bucket_index, categories=labels),
+            'Funding_Org:Department': [self.departments[department_slots[i]] for i in slot_index],
+            'Count': ids[slot_index, bucket_index],
+        })
+
+        total_counts = duration_data.groupby('Duration_Category', observed=True)['Count'].sum()
+        valid_categories = total_counts[total_counts > 0].index
+        return duration_data[
+            duration_data['Duration_Category'].isin(valid_categories)
+        ]
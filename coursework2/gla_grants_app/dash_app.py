@@ -5,18 +5,41 @@ This module defines a Dash application that provides interactive visualization
 of GLA grants data. It includes functions for processing data, generating
 visualizations, and setting up callbacks for interactivity.
 """
+import functools
+import hashlib
+import math
 import os
-from dash import Dash, html, dcc, Input, Output, dash_table
+from dash import html, dcc, Input, Output, State, ctx, dash_table
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
-from wordcloud import WordCloud, STOPWORDS
+from wordcloud import WordCloud
 import base64
 from io import BytesIO
 import pandas as pd
-from nltk.sentiment import SentimentIntensityAnalyzer
 import nltk
 from pathlib import Path
+from flask import request, session, url_for
+from coursework2.gla_grants_app.cached_layout import CachedLayoutDash
+from coursework2.gla_grants_app.caching import LRUCache, SQLiteCache
+from coursework2.gla_grants_app.compact import compact_frame, memory_report
+from coursework2.gla_grants_app.cube import GrantsCube
+from coursework2.gla_grants_app.data_cache import file_sha256, load_cached_frame
+from coursework2.gla_grants_app.dataset import GrantsDataset
+from coursework2.gla_grants_app.figure_patch import data_patch, figure_json, figure_kind
+from coursework2.gla_grants_app.image_store import IMAGE_FORMATS, ImageStore
+from coursework2.gla_grants_app.memoize import CallbackMemo
+from coursework2.gla_grants_app.render_pool import RenderPool, RenderSuperseded, RenderTimeout
+from coursework2.gla_grants_app.search_index import TextSearchIndex
+from coursework2.gla_grants_app.sentiment import lexicon_version, score_descriptions_with_store, score_text
+from coursework2.gla_grants_app.shared_dataset import load_or_publish
+from coursework2.gla_grants_app.table_index import TableIndex
+from coursework2.gla_grants_app.timeline import TimelineSeries
+from coursework2.gla_grants_app.top_grants import TopGrants
+from coursework2.gla_grants_app.warmup import Warmup
+from coursework2.gla_grants_app.word_frequencies import (
+    WORDCLOUD_MIN_WORD_LENGTH, WORDCLOUD_REGEXP, WORDCLOUD_STOPWORDS, TitleFrequencies)
 
 # Download NLTK resources
 try:
@@ -38,13 +61,38 @@ except Exception as e:
     def analyze_sentiment(text):
         return 0
 
-def process_data():
+# Rows per page of the Grants Table
+TABLE_PAGE_SIZE = 10
+
+# Timeline aggregation options (label, pandas period) and the default Top N
+TIMELINE_AGGREGATIONS = [('Yearly', 'Y'), ('Quarterly', 'Q'), ('Monthly', 'M')]
+DEFAULT_TOP_N = 10
+
+# Seed of the word cloud layout and colours
+WORDCLOUD_RANDOM_STATE = 42
+
+def read_grants_excel(excel_file_path):
     """
-    Process and load the grants data from an Excel file.
+    Read the grants workbook and apply the standard processing.
+
+    Args:
+        excel_file_path (str): Path of the Excel workbook.
 
     Returns:
-        pandas.DataFrame: Processed DataFrame containing grants data with
-        properly formatted datetime columns.
+        pandas.DataFrame: Grants data with parsed award dates, sorted by date.
+    """
+    print(f"Loading data from: {excel_file_path}")
+    data = pd.read_excel(excel_file_path)
+    data['Award_Date'] = pd.to_datetime(data['Award_Date'])
+    data = data.sort_values(by='Award_Date')
+    return data
+
+def find_grants_excel():
+    """
+    Locate the grants workbook.
+
+    Returns:
+        str: Path of the first existing candidate workbook, or None.
     """
     # Define the path to the Excel file
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -59,7 +107,24 @@ def process_data():
     ]
     
     # Find the first path that exists
-    excel_file_path = next((path for path in possible_paths if os.path.exists(path)), None)
+    return next((path for path in possible_paths if os.path.exists(path)), None)
+
+def process_data(cache_dir=None):
+    """
+    Process and load the grants data from an Excel file.
+
+    The processed frame is cached in a columnar archive (see data_cache), so
+    only the first load after the workbook changes needs to parse Excel.
+
+    Args:
+        cache_dir (str, optional): Directory for the columnar cache.
+            Defaults to the directory containing the workbook.
+
+    Returns:
+        pandas.DataFrame: Processed DataFrame containing grants data with
+        properly formatted datetime columns.
+    """
+    excel_file_path = find_grants_excel()
     
     if not excel_file_path:
         print("Warning: Excel file not found in any expected location.")
@@ -69,30 +134,45 @@ def process_data():
             'Award_Date', 'Funding_Org:Department', 'Recipient_Org:Name', 'Duration_(Days)'
         ])
     
-    # Load and process the data
-    print(f"Loading data from: {excel_file_path}")
-    data = pd.read_excel(excel_file_path)
-    data['Award_Date'] = pd.to_datetime(data['Award_Date'])
-    data = data.sort_values(by='Award_Date')
-    return data
+    # Load and process the data, reusing the columnar cache when valid
+    return load_cached_frame(excel_file_path, read_grants_excel, cache_dir=cache_dir)
 
 def analyze_sentiment(text):
     """
     Analyze the sentiment of a given text using NLTK's
     SentimentIntensityAnalyzer.
 
+    The analyzer is shared with the sentiment engine, so the VADER lexicon
+    is only loaded once per process.
+
     Args:
         text (str): The text to analyze.
 
     Returns:
         float: The compound sentiment score (-1 to 1) or 0 if text is invalid.
     """
-    if isinstance(text, str):
-        sid = SentimentIntensityAnalyzer()
-        scores = sid.polarity_scores(text)
-        return scores['compound']
-    else:
-        return 0
+    return score_text(text)
+
+def make_wordcloud():
+    """
+    Create an empty WordCloud with the dashboard's settings.
+
+    Returns:
+        WordCloud: Unrendered WordCloud object.
+    """
+    return WordCloud(
+        stopwords=WORDCLOUD_STOPWORDS,
+        # A fixed layout seed makes equal frequencies render identical images
+        random_state=WORDCLOUD_RANDOM_STATE,
+        width=900,
+        height=400,
+        background_color="white",
+        colormap="viridis",
+        collocations=True,
+        regexp=WORDCLOUD_REGEXP,
+        max_words=30,
+        min_word_length=WORDCLOUD_MIN_WORD_LENGTH
+    )
 
 def generate_wordcloud(data):
     """
@@ -105,22 +185,21 @@ def generate_wordcloud(data):
     Returns:
         WordCloud: Generated WordCloud object with customized parameters.
     """
-    stopwords = set(['to', 'the', 'and', 'for', 'of', 'in', 'on', 'with', 'a',
-                     'an', 'as', 'at', 'by', 'from', 'that', 'which', 'this',
-                     'be', 'grant', 'Grant']) | STOPWORDS
     text = ' '.join(data.dropna())
-    wc = WordCloud(
-        stopwords=stopwords,
-        width=900,
-        height=400,
-        background_color="white",
-        colormap="viridis",
-        collocations=True,
-        regexp=r"[a-zA-Z#&]+",
-        max_words=30,
-        min_word_length=4
-    ).generate(text)
-    return wc
+    return make_wordcloud().generate(text)
+
+def generate_wordcloud_from_frequencies(frequencies):
+    """
+    Generate a WordCloud object from precomputed word frequencies.
+
+    Args:
+        frequencies (dict): Word -> frequency, e.g. from
+        TitleFrequencies.frequencies().
+
+    Returns:
+        WordCloud: Generated WordCloud object with customized parameters.
+    """
+    return make_wordcloud().generate_from_frequencies(frequencies)
 
 def wordcloud_to_base64(wc):
     """
@@ -132,26 +211,227 @@ def wordcloud_to_base64(wc):
     Returns:
         str: Base64 encoded string representation of the WordCloud image.
     """
+    return base64.b64encode(wordcloud_to_bytes(wc)).decode()
+
+def wordcloud_to_bytes(wc, extension='png'):
+    """
+    Encode a WordCloud object as image bytes.
+
+    Args:
+        wc (WordCloud): WordCloud object to convert.
+        extension (str, optional): Image format, a key of IMAGE_FORMATS.
+
+    Returns:
+        bytes: The encoded image.
+    """
     img = BytesIO()
-    wc.to_image().save(img, format='PNG')
-    img.seek(0)
-    return base64.b64encode(img.getvalue()).decode()
+    wc.to_image().save(img, format=IMAGE_FORMATS[extension][0])
+    return img.getvalue()
+
+def render_wordcloud_image(frequencies, extension='png'):
+    """
+    Render a word cloud image from word frequencies.
+
+    Module-level so it can run on the render pool's worker processes.
+
+    Args:
+        frequencies (dict): Word -> frequency.
+        extension (str, optional): Image format, a key of IMAGE_FORMATS.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    return wordcloud_to_bytes(generate_wordcloud_from_frequencies(frequencies), extension)
+
+def build_top_grants_sunburst(top_grants, department_colors):
+    """
+    Build the sunburst chart of the top grants.
+
+    Module-level so it can run on the render pool's worker processes.
+
+    Args:
+        top_grants (pandas.DataFrame): Title, Funding_Org:Department and
+        Amount_awarded of the grants to show.
+        department_colors (dict): Department -> colour.
+
+    Returns:
+        plotly.graph_objects.Figure: The sunburst chart.
+    """
+    sunburst_fig = px.sunburst(
+        top_grants,
+        path=['Funding_Org:Department', 'Title'],
+        values='Amount_awarded',
+        color='Funding_Org:Department',
+        color_discrete_map=department_colors
+    )
+
+    sunburst_fig.update_layout(
+        margin=dict(l=0, r=0, b=0, t=10),
+        plot_bgcolor='rgba(0,0,0,0.02)',  # Very light gray for plot area
+        paper_bgcolor='rgba(0,0,0,0)'     # Transparent paper background
+    )
+    return sunburst_fig
+
+def build_dashboard_data(server):
+    """
+    Build the dashboard DataFrame from the workbook.
+
+    Must be called inside an application context (the sentiment score store
+    uses the database). The workbook's columnar cache is kept in
+    ``DATA_CACHE_DIR`` (default: the instance folder). Unless
+    ``DASH_COMPACT_DTYPES`` is disabled in the app config, the frame is
+    converted to its compact representation.
+
+    Args:
+        server (Flask): The Flask application instance.
+
+    Returns:
+        pandas.DataFrame: Grants data with a Sentiment_Score column.
+    """
+    df = process_data(cache_dir=server.config.get('DATA_CACHE_DIR', server.instance_path))
+    
+    # Add sentiment analysis, reusing scores stored by earlier starts
+    df['Sentiment_Score'] = score_descriptions_with_store(df['Description_'])
+    
+    if server.config.get('DASH_COMPACT_DTYPES', True):
+        compacted = compact_frame(df)
+        total = memory_report(df, compacted).loc['Total']
+        print(f"Compacted grants data: {total['bytes_before']:,} -> {total['bytes_after']:,} bytes")
+        df = compacted
+    return df
+
+def dashboard_data_key(server):
+    """
+    Identify the dashboard DataFrame that build_dashboard_data would produce.
+
+    Args:
+        server (Flask): The Flask application instance.
+
+    Returns:
+        str: Key derived from the workbook contents, the sentiment lexicon
+        version and the dtype settings.
+    """
+    excel_file_path = find_grants_excel()
+    parts = [
+        file_sha256(excel_file_path) if excel_file_path else 'no-workbook',
+        lexicon_version(),
+        'compact' if server.config.get('DASH_COMPACT_DTYPES', True) else 'plain',
+    ]
+    return hashlib.sha256('/'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+def load_dashboard_data(server):
+    """
+    Load the grants data and add the columns the dashboard needs.
+
+    If ``DASH_SHARED_DATASET_DIR`` is set in the app config, the frame is
+    shared between worker processes through memory-mapped files in that
+    directory: the first worker builds and publishes it, the others attach
+    without parsing the workbook or scoring sentiment (see shared_dataset).
+    Only the numeric, datetime and categorical code columns are mapped;
+    string columns and the derived structures are rebuilt in each worker.
+
+    Args:
+        server (Flask): The Flask application instance.
+
+    Returns:
+        pandas.DataFrame: Grants data with a Sentiment_Score column.
+    """
+    shared_dir = server.config.get('DASH_SHARED_DATASET_DIR')
+    if not shared_dir:
+        return build_dashboard_data(server)
+    return load_or_publish(shared_dir, dashboard_data_key(server),
+                           lambda: build_dashboard_data(server))
+
+def make_callback_cache(server):
+    """
+    Create the cache backend for memoized callback outputs.
+
+    ``DASH_CALLBACK_CACHE`` selects 'lru' (per process, the default) or
+    'disk' (an SQLite file shared by worker processes, in
+    ``DASH_CALLBACK_CACHE_DIR`` or the instance folder).
+
+    Args:
+        server (Flask): The Flask application instance.
+
+    Returns:
+        LRUCache or SQLiteCache: The backend.
+    """
+    maxsize = server.config.get('DASH_CALLBACK_CACHE_SIZE', 256)
+    ttl = server.config.get('DASH_CALLBACK_CACHE_TTL')
+    backend = server.config.get('DASH_CALLBACK_CACHE', 'lru')
+    if backend == 'disk':
+        directory = server.config.get('DASH_CALLBACK_CACHE_DIR', server.instance_path)
+        return SQLiteCache(os.path.join(directory, 'callback_cache.sqlite'), maxsize, ttl=ttl)
+    if backend != 'lru':
+        print(f"Warning: unknown DASH_CALLBACK_CACHE {backend!r}, using 'lru'")
+    return LRUCache(maxsize, ttl=ttl)
 
 def init_dash(server):
     """
     Initialize the Dash app as part of the Flask server.
 
+    By default the dataset is loaded before this function returns. With
+    ``DASH_LAZY_LOAD`` set in the app config it is loaded on a background
+    thread instead: ``/dash/`` shows a loading page until it is ready, and
+    the state is reported by the ``/health`` endpoints.
+
+    The layout carries no dataset records (the table rows are fetched by a
+    callback) and is served with an ETag, so reloads of the dashboard get a
+    304 Not Modified until the dataset changes.
+
     Args:
         server (Flask): The Flask application instance.
 
     Returns:
         Dash: The Dash application instance.
     """
-    # Load and process data
-    df = process_data()
+    dataset = GrantsDataset(lambda: load_dashboard_data(server))
+    server.extensions['grants_dataset'] = dataset
+    dataset.add_derived('cube', GrantsCube)
+    dataset.add_derived('timeline', TimelineSeries)
+    dataset.add_derived('search_index', TextSearchIndex)
+    dataset.add_derived('table_index', TableIndex)
+    dataset.add_derived('title_frequencies', TitleFrequencies)
+    dataset.add_derived('top_grants', TopGrants)
+    # Rendered word clouds, keyed by dataset version and department selection
+    wordcloud_cache = LRUCache(server.config.get('WORDCLOUD_CACHE_SIZE', 64),
+                               ttl=server.config.get('WORDCLOUD_CACHE_TTL', 3600))
+    server.extensions['wordcloud_cache'] = wordcloud_cache
+    # Rendered images are served by URL from a content-addressed store
+    image_format = server.config.get('WORDCLOUD_IMAGE_FORMAT', 'png')
+    image_store = ImageStore(
+        server.config.get('WORDCLOUD_IMAGE_DIR', os.path.join(server.instance_path, 'wordclouds')),
+        max_files=server.config.get('WORDCLOUD_IMAGE_MAX_FILES', 500))
+    server.extensions['wordcloud_images'] = image_store
+    # Heavy renders run once per client at a time, optionally on worker processes
+    render_pool = RenderPool(server.config.get('DASH_RENDER_WORKERS', 0),
+                             timeout=server.config.get('DASH_RENDER_TIMEOUT', 30))
+    server.extensions['render_pool'] = render_pool
+    # Outputs of pure callbacks, keyed by dataset version and inputs
+    memoize = CallbackMemo(make_callback_cache(server),
+                           version=lambda: dataset.version if dataset.ready else None)
+    server.extensions['callback_cache'] = memoize
+    lazy_load = server.config.get('DASH_LAZY_LOAD', False)
     
-    # Add sentiment analysis
-    df['Sentiment_Score'] = df['Description_'].apply(analyze_sentiment)
+    if not lazy_load:
+        dataset.load(server)
+    
+    def current_df():
+        """
+        Return the loaded DataFrame, skipping the callback until it exists.
+        """
+        if not dataset.ready:
+            raise PreventUpdate
+        return dataset.df
+    
+    def current_derived(name):
+        """
+        Return a structure derived from the loaded DataFrame (see
+        GrantsDataset.add_derived), skipping the callback until it exists.
+        """
+        if not dataset.ready:
+            raise PreventUpdate
+        return dataset.derived[name]
     
     # Define department colors
     department_colors = {
@@ -178,8 +458,9 @@ def init_dash(server):
     if not os.path.exists(assets_folder):
         os.makedirs(assets_folder)
     
-    app = Dash(
+    app = CachedLayoutDash(
         __name__,
+        layout_version=lambda: dataset.version if dataset.ready else None,
         server=server,
         url_base_pathname='/dash/',
         external_stylesheets=external_stylesheets,
@@ -203,238 +484,343 @@ def init_dash(server):
             className="shadow-sm",
         )
     
-    # Define filter function
-    def filter_dataframe(df, departments, years_range=None):
+    def run_render(name, fn, *args):
+        """
+        Run a heavy render on the render pool, skipping the callback if a
+        newer request from the same client superseded it or it timed out.
         """
-        Filter the DataFrame based on departments and year range.
+        channel = (name, session.get('user_id', request.remote_addr))
+        try:
+            return render_pool.run(channel, fn, *args)
+        except RenderSuperseded:
+            raise PreventUpdate
+        except RenderTimeout:
+            print(f"Warning: {name} render timed out after {render_pool.timeout} seconds")
+            raise PreventUpdate
+    
+    def wordcloud_src(selected_departments):
         """
-        filtered_df = df.copy()
+        Return the word cloud image URL for selected departments, rendering
+        and storing the image on a cache miss.
+        """
+        title_frequencies = current_derived('title_frequencies')
+        # The same selection in any order renders the same image
+        key = (dataset.version, tuple(sorted(set(selected_departments or []))))
 
-        if departments:
-            filtered_df = filtered_df[
-                filtered_df['Funding_Org:Department'].isin(departments)
-            ]
+        def render():
+            # Merge the per-department word tables instead of re-tokenising titles
+            frequencies = title_frequencies.frequencies(selected_departments)
+            image = run_render('wordcloud', render_wordcloud_image, frequencies, image_format)
+            return image_store.put(image, image_format)
 
-        if years_range:
-            filtered_df = filtered_df[
-                (filtered_df['Award_Date'].dt.year >= years_range[0]) &
-                (filtered_df['Award_Date'].dt.year <= years_range[1])
-            ]
+        # Only the image URL is sent; the browser fetches and caches the image
+        digest = wordcloud_cache.get_or_compute(key, render)
+        if image_store.path(digest, image_format) is None:
+            # The image was pruned from the store since it was cached
+            digest = render()
+            wordcloud_cache.set(key, digest)
+        return url_for('main.wordcloud_image', digest=digest, extension=image_format)
+    
+    def figure_updates(render, shown, *inputs):
+        """
+        Return the figures rendered for ``inputs`` and the record of what
+        the browser will show.
 
-        return filtered_df
+        Figures are sent whole on first render, after a dataset reload and
+        when their kind changes; otherwise only their traces are sent, as
+        Patches. The record holds the dataset version and the kinds of the
+        figures sent, so building a Patch needs no earlier figure.
+        """
+        figures = render(*inputs)
+        kinds = [figure_kind(figure) for figure in figures]
+        shown_kinds = shown.get('kinds') if shown and shown.get('version') == dataset.version else None
+        if not shown_kinds or len(shown_kinds) != len(figures):
+            shown_kinds = [None] * len(figures)
+        updates = [
+            data_patch(figure) if kind and kind == shown_kind else figure
+            for figure, kind, shown_kind in zip(figures, kinds, shown_kinds)
+        ]
+        return updates, {'version': dataset.version, 'kinds': kinds}
+    
+    def table_page(df, search_term=None, page_current=0, page_size=TABLE_PAGE_SIZE,
+                   sort_by=None, filter_query=None):
+        """
+        Return one page of the grants table as records, the page count and
+        the number of the page returned.
+
+        Rows are searched, filtered and sorted through the dataset's
+        TextSearchIndex and TableIndex, and only the requested page is
+        serialised. A page past the last one returns the last page.
+        """
+        mask = dataset.derived['search_index'].row_mask(search_term) if search_term else None
+        page, matches, page_current = dataset.derived['table_index'].page(
+            df, mask, sort_by, filter_query, page_current, page_size)
+        return page.to_dict('records'), max(1, math.ceil(matches / page_size)), page_current
+    
+    def default_years_range(df):
+        """
+        Return the year range initially selected on the year slider.
+        """
+        years = df['Award_Date'].dt.year
+        return [int(years.min()), int(years.max())]
+    
+    def default_department(df):
+        """
+        Return the department initially shown in the interactive timeline.
+        """
+        return df['Funding_Org:Department'].iloc[0]
     
     # Define app layout - optimized for iframe embedding with white background
-    app.layout = dbc.Container([
-        # Metrics cards
-        dbc.Row([
-            dbc.Col(MetricCard("Total Grants Value (Millions)", id="total-value"),
-                    width=6),
-            dbc.Col(MetricCard("Total Number of Grants", id="total-number"),
-                    width=6),
-        ], className="mb-3"),  # Reduced margin for iframe
-
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(
-                            "Grants by Department",
-                            className="mb-2 text-primary"),  # Smaller header
-                        dbc.Row([
-                            dbc.Col(
-                                dcc.RangeSlider(
-                                    id='department-year-slider',
-                                    min=df['Award_Date'].dt.year.min(),
-                                    max=df['Award_Date'].dt.year.max(),
-                                    step=1,
-                                    marks={
-                                        str(year): str(year)
-                                        for year in sorted(
-                                            df['Award_Date'].dt.year.unique()
-                                        )
-                                    },
-                                    value=[
-                                        df['Award_Date'].dt.year.min(),
-                                        df['Award_Date'].dt.year.max()
-                                    ]
+    def build_layout(df):
+        """
+        Build the dashboard layout for a loaded DataFrame.
+        """
+        return dbc.Container([
+            # Metrics cards
+            dbc.Row([
+                dbc.Col(MetricCard("Total Grants Value (Millions)", id="total-value"),
+                        width=6),
+                dbc.Col(MetricCard("Total Number of Grants", id="total-number"),
+                        width=6),
+            ], className="mb-3"),  # Reduced margin for iframe
+
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(
+                                "Grants by Department",
+                                className="mb-2 text-primary"),  # Smaller header
+                            dbc.Row([
+                                dbc.Col(
+                                    dcc.RangeSlider(
+                                        id='department-year-slider',
+                                        min=df['Award_Date'].dt.year.min(),
+                                        max=df['Award_Date'].dt.year.max(),
+                                        step=1,
+                                        marks={
+                                            str(year): str(year)
+                                            for year in sorted(
+                                                df['Award_Date'].dt.year.unique()
+                                            )
+                                        },
+                                        value=default_years_range(df)
+                                    ),
+                                    md=12
                                 ),
-                                md=12
+                                dcc.Store(id='department-charts-shown'),
+                                dbc.Col(dcc.Graph(id='department-pie-chart'), md=6),
+                                dbc.Col(
+                                    dcc.Graph(
+                                        id='department-duration-chart'), md=6),
+                            ])
+                        ])
+                    ], className="shadow-sm")
+                ])
+            ], className="mb-3"),  # Reduced margin for iframe
+
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(
+                                "Word Cloud of Grant Titles",
+                                className="mb-2 text-primary",
+                                style={'textAlign': 'center'}
                             ),
-                            dbc.Col(dcc.Graph(id='department-pie-chart'), md=6),
-                            dbc.Col(
-                                dcc.Graph(
-                                    id='department-duration-chart'), md=6),
+                            dcc.Dropdown(
+                                id='wordcloud-department-selector',
+                                options=[
+                                    {'label': dept, 'value': dept}
+                                    for dept in df['Funding_Org:Department'].unique()
+                                ],
+                                multi=True,
+                                placeholder="Select Departments",
+                                className="mb-2"  # Reduced margin
+                            ),
+                            html.Div(
+                                html.Img(id="wordcloud", style={'height': '350px'}),  # Reduced height for iframe
+                                style={
+                                    'display': 'flex',
+                                    'justifyContent': 'center'
+                                }
+                            )
                         ])
-                    ])
-                ], className="shadow-sm")
-            ])
-        ], className="mb-3"),  # Reduced margin for iframe
-
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(
-                            "Word Cloud of Grant Titles",
-                            className="mb-2 text-primary",
-                            style={'textAlign': 'center'}
-                        ),
-                        dcc.Dropdown(
-                            id='wordcloud-department-selector',
-                            options=[
-                                {'label': dept, 'value': dept}
-                                for dept in df['Funding_Org:Department'].unique()
-                            ],
-                            multi=True,
-                            placeholder="Select Departments",
-                            className="mb-2"  # Reduced margin
-                        ),
-                        html.Div(
-                            html.Img(id="wordcloud", style={'height': '350px'}),  # Reduced height for iframe
-                            style={
-                                'display': 'flex',
-                                'justifyContent': 'center'
-                            }
-                        )
-                    ])
-                ], className="shadow-sm")
-            ])
-        ], className="mb-3"),  # Reduced margin for iframe
-
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(
-                            "Overall Grants Timeline",
-                            className="mb-2 text-primary"  # Reduced margin
-                        ),
-                        dcc.Dropdown(
-                            id='timeline-aggregation',
-                            options=[
-                                {'label': 'Yearly', 'value': 'Y'},
-                                {'label': 'Quarterly', 'value': 'Q'},
-                                {'label': 'Monthly', 'value': 'M'}
-                            ],
-                            value='Y',
-                            clearable=False,
-                            className="mb-2"  # Reduced margin
-                        ),
-                        dcc.Graph(
-                            id='timeline-chart',
-                            style={'height': '350px'}  # Reduced height for iframe
-                        )
-                    ])
-                ], className="shadow-sm")
-            ], md=6),
-
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(
-                            id="interactive-timeline-title",
-                            className="mb-2 text-primary"  # Reduced margin
-                        ),
-                        dcc.Dropdown(
-                            id='department-selector',
-                            options=[
-                                {'label': dept, 'value': dept}
-                                for dept in df['Funding_Org:Department'].unique()
-                            ],
-                            value=df['Funding_Org:Department'].iloc[0],
-                            clearable=False,
-                            className="mb-2"  # Reduced margin
-                        ),
-                        dcc.Graph(
-                            id='interactive-timeline',
-                            style={'height': '350px'}  # Reduced height for iframe
-                        )
-                    ])
-                ], className="shadow-sm")
-            ], md=6)
-        ], className="mb-3"),  # Reduced margin for iframe
-
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4(
-                            id="top-grants-title",
-                            className="mb-2 text-primary",
-                            style={'textAlign': 'center'}
-                        ),
-                        dcc.Slider(
-                            id='top-n-slider',
-                            min=2,
-                            max=20,
-                            step=1,
-                            value=10,
-                            marks={i: str(i) for i in range(2, 21, 2)}
-                        ),
-                        html.Div(
-                            dcc.Graph(id='top-grants-sunburst', style={'height': '350px'}),  # Reduced height for iframe
-                            style={
-                                'display': 'flex',
-                                'justifyContent': 'center'
-                            }
-                        )
-                    ])
-                ], className="shadow-sm")
-            ])
-        ], className="mb-3"),  # Reduced margin for iframe
-
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4("Grants Table", className="mb-2 text-primary"),  # Smaller header
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Input(
-                                    type="search",
-                                    id="table-search",
-                                    placeholder="Search the table..."
-                                ),
-                            ])
-                        ], className="mb-2"),  # Reduced margin
-                        dash_table.DataTable(
-                            id='department-table',
-                            columns=[
-                                {"name": i, "id": i} for i in df.columns
-                            ],
-                            data=df.to_dict('records'),
-                            filter_action="native",
-                            sort_action="native",
-                            page_action="native",
-                            page_current=0,
-                            page_size=10,
-                            style_table={'overflowX': 'auto', 'height': '350px'},  # Added fixed height for iframe
-                            style_cell={
-                                'minWidth': '50px',
-                                'width': '100px',
-                                'maxWidth': '200px',
-                                'overflow': 'hidden',
-                                'textOverflow': 'ellipsis',
-                            },
-                            style_header={
-                                'backgroundColor': 'rgb(230, 230, 230)',
-                                'fontWeight': 'bold',
-                                'textAlign': 'center'
-                            },
-                            style_data_conditional=[
-                                {
-                                    'if': {'row_index': 'odd'},
-                                    'backgroundColor': 'rgb(248, 248, 248)'
+                    ], className="shadow-sm")
+                ])
+            ], className="mb-3"),  # Reduced margin for iframe
+
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(
+                                "Overall Grants Timeline",
+                                className="mb-2 text-primary"  # Reduced margin
+                            ),
+                            dcc.Dropdown(
+                                id='timeline-aggregation',
+                                options=[
+                                    {'label': label, 'value': value}
+                                    for label, value in TIMELINE_AGGREGATIONS
+                                ],
+                                value=TIMELINE_AGGREGATIONS[0][1],
+                                clearable=False,
+                                className="mb-2"  # Reduced margin
+                            ),
+                            dcc.Graph(
+                                id='timeline-chart',
+                                style={'height': '350px'}  # Reduced height for iframe
+                            )
+                        ])
+                    ], className="shadow-sm")
+                ], md=6),
+
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(
+                                id="interactive-timeline-title",
+                                className="mb-2 text-primary"  # Reduced margin
+                            ),
+                            dcc.Dropdown(
+                                id='department-selector',
+                                options=[
+                                    {'label': dept, 'value': dept}
+                                    for dept in df['Funding_Org:Department'].unique()
+                                ],
+                                value=default_department(df),
+                                clearable=False,
+                                className="mb-2"  # Reduced margin
+                            ),
+                            dcc.Store(id='interactive-timeline-shown'),
+                            dcc.Graph(
+                                id='interactive-timeline',
+                                style={'height': '350px'}  # Reduced height for iframe
+                            )
+                        ])
+                    ], className="shadow-sm")
+                ], md=6)
+            ], className="mb-3"),  # Reduced margin for iframe
+
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4(
+                                id="top-grants-title",
+                                className="mb-2 text-primary",
+                                style={'textAlign': 'center'}
+                            ),
+                            dcc.Slider(
+                                id='top-n-slider',
+                                min=2,
+                                max=20,
+                                step=1,
+                                value=DEFAULT_TOP_N,
+                                marks={i: str(i) for i in range(2, 21, 2)}
+                            ),
+                            html.Div(
+                                dcc.Graph(id='top-grants-sunburst', style={'height': '350px'}),  # Reduced height for iframe
+                                style={
+                                    'display': 'flex',
+                                    'justifyContent': 'center'
                                 }
-                            ],
-                            fixed_rows={'headers': True},
-                            virtualization=True,  # Enable for better performance in iframe
-                        ),
-                    ])
-                ], className="shadow-sm")
-            ])
-        ], className="mb-3"),  # Reduced margin for iframe
-    ], fluid=True, style={'background-color': '#ffffff', 'padding': '10px'})  # White background with reduced padding for iframe
+                            )
+                        ])
+                    ], className="shadow-sm")
+                ])
+            ], className="mb-3"),  # Reduced margin for iframe
+
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            html.H4("Grants Table", className="mb-2 text-primary"),  # Smaller header
+                            dbc.Row([
+                                dbc.Col([
+                                    dbc.Input(
+                                        type="search",
+                                        id="table-search",
+                                        placeholder="Search the table..."
+                                    ),
+                                ])
+                            ], className="mb-2"),  # Reduced margin
+                            dash_table.DataTable(
+                                id='department-table',
+                                columns=[
+                                    {"name": i, "id": i} for i in df.columns
+                                ],
+                                # Rows are fetched by update_table, so the
+                                # layout carries no dataset records
+                                data=[],
+                                filter_action="custom",
+                                filter_query='',
+                                sort_action="custom",
+                                sort_mode="single",
+                                sort_by=[],
+                                page_action="custom",
+                                page_current=0,
+                                page_size=TABLE_PAGE_SIZE,
+                                page_count=1,
+                                style_table={'overflowX': 'auto', 'height': '350px'},  # Added fixed height for iframe
+                                style_cell={
+                                    'minWidth': '50px',
+                                    'width': '100px',
+                                    'maxWidth': '200px',
+                                    'overflow': 'hidden',
+                                    'textOverflow': 'ellipsis',
+                                },
+                                style_header={
+                                    'backgroundColor': 'rgb(230, 230, 230)',
+                                    'fontWeight': 'bold',
+                                    'textAlign': 'center'
+                                },
+                                style_data_conditional=[
+                                    {
+                                        'if': {'row_index': 'odd'},
+                                        'backgroundColor': 'rgb(248, 248, 248)'
+                                    }
+                                ],
+                                fixed_rows={'headers': True},
+                            ),
+                        ])
+                    ], className="shadow-sm")
+                ])
+            ], className="mb-3"),  # Reduced margin for iframe
+        ], fluid=True, style={'background-color': '#ffffff', 'padding': '10px'})  # White background with reduced padding for iframe
+    
+    def build_loading_layout():
+        """
+        Build the placeholder layout shown while the dataset is loading.
+        """
+        return dbc.Container([
+            dcc.Interval(id='dataset-loading-poll', interval=1000),
+            dcc.Store(id='dataset-ready', data=False),
+            html.Div(
+                [
+                    dbc.Spinner(color="primary"),
+                    html.P("Loading grants data...", id='dataset-loading-status',
+                           className="lead mt-3"),
+                ],
+                className="text-center p-5"
+            ),
+        ], fluid=True, style={'background-color': '#ffffff', 'padding': '10px'})
+    
+    layout_cache = {}
+    
+    def serve_layout():
+        """
+        Serve the dashboard once the dataset is ready, else the loading page.
+        """
+        if not dataset.ready:
+            return build_loading_layout()
+        if dataset.version not in layout_cache:
+            layout_cache.clear()
+            layout_cache[dataset.version] = build_layout(dataset.df)
+        return layout_cache[dataset.version]
+    
+    app.layout = serve_layout
     
     # Define callbacks
     @app.callback(
@@ -442,30 +828,24 @@ def init_dash(server):
          Output('total-number', 'children')],
         [Input('department-year-slider', 'value')]
     )
+    @memoize
     def update_total_metrics(years_range):
         """
         Update the total metrics display based on the selected year range.
         """
-        filtered_df = filter_dataframe(df, None, years_range)
-        total_value = filtered_df['Amount_awarded'].sum()
+        total_value, total_grants = current_derived('cube').totals(years_range)
         total_value_millions = round(total_value / 1_000_000, 1)
-        total_grants = len(filtered_df)
         return f"{total_value_millions}m", f"{total_grants:,}"
     
-    @app.callback(
-        [Output('department-pie-chart', 'figure'),
-         Output('department-duration-chart', 'figure')],
-        [Input('department-year-slider', 'value'),
-         Input('department-pie-chart', 'clickData')]
-    )
-    def update_pie_and_duration_chart(years_range, click_data):
+    @memoize
+    def pie_and_duration_figures(years_range, click_data):
         """
-        Update the pie chart and duration chart based on
-        selected year range and clicks.
+        Build the pie chart and duration chart for a selected year range
+        and clicked department.
         """
-        filtered_df = filter_dataframe(df, None, years_range)
+        cube = current_derived('cube')
 
-        department_counts = filtered_df['Funding_Org:Department'].value_counts()
+        department_counts = cube.department_counts(years_range)
         department_counts = department_counts.reset_index()
         department_counts.columns = ['Department', 'Count']
 
@@ -480,41 +860,8 @@ def init_dash(server):
         # Make the pie chart more compact for iframe
         pie_fig.update_layout(margin=dict(l=20, r=20, t=30, b=20), paper_bgcolor='rgba(0,0,0,0)')
 
-        if click_data:
-            selected_department = click_data['points'][0]['label']
-            duration_df = filtered_df[
-                filtered_df['Funding_Org:Department'] == selected_department
-            ]
-        else:
-            duration_df = filtered_df
-
-        if 'Duration_(Days)' not in duration_df.columns:
-            duration_df['Duration_(Days)'] = 365  # Default if column doesn't exist
-
-        max_duration = int(duration_df['Duration_(Days)'].max())
-        bins = list(range(0, max_duration + 100, 100))
-        labels = [f"{i}-{i+99}" for i in bins[:-1]]
-
-        duration_df = duration_df.copy()
-        duration_df['Duration_Category'] = pd.cut(
-            duration_df['Duration_(Days)'],
-            bins=bins,
-            labels=labels,
-            right=False
-        )
-
-        duration_data = duration_df.groupby(
-            ['Duration_Category', 'Funding_Org:Department'],
-            observed=True
-        )['Identifier'].count().reset_index()
-        duration_data.rename(columns={'Identifier': 'Count'}, inplace=True)
-
-        total_counts = duration_data.groupby('Duration_Category',
-                                            observed=True)['Count'].sum()
-        valid_categories = total_counts[total_counts > 0].index
-        duration_data = duration_data[
-            duration_data['Duration_Category'].isin(valid_categories)
-        ]
+        selected_department = click_data['points'][0]['label'] if click_data else None
+        duration_data = cube.duration_counts(years_range, selected_department)
 
         duration_fig = px.bar(
             duration_data,
@@ -538,20 +885,38 @@ def init_dash(server):
             yaxis_gridcolor='rgba(0,0,0,0.1)',
             margin=dict(l=20, r=20, t=30, b=20)
         )
-        return pie_fig, duration_fig
+        return figure_json(pie_fig), figure_json(duration_fig)
+    
+    @app.callback(
+        [Output('department-pie-chart', 'figure'),
+         Output('department-duration-chart', 'figure'),
+         Output('department-charts-shown', 'data')],
+        [Input('department-year-slider', 'value'),
+         Input('department-pie-chart', 'clickData')],
+        [State('department-charts-shown', 'data')]
+    )
+    def update_pie_and_duration_chart(years_range, click_data, shown):
+        """
+        Update the pie chart and duration chart based on
+        selected year range and clicks.
+        """
+        (pie_fig, duration_fig), shown = figure_updates(
+            pie_and_duration_figures, shown, years_range, click_data)
+        return pie_fig, duration_fig, shown
     
     @app.callback(
         Output('timeline-chart', 'figure'),
         [Input('timeline-aggregation', 'value')]
     )
+    @memoize
     def update_timeline_chart(aggregation):
         """
         Update the timeline chart based on selected time aggregation.
         """
-        filtered_df = filter_dataframe(df, None)
+        timeline = current_derived('timeline')
         
-        # Check if DataFrame is empty or Award_Date column is missing
-        if filtered_df.empty or 'Award_Date' not in filtered_df.columns:
+        # Check if there is any dated grant to plot
+        if timeline.first_date is None:
             # Return an empty figure with a message
             fig = go.Figure()
             fig.update_layout(
@@ -572,71 +937,24 @@ def init_dash(server):
                 height=350
             )
             return fig
-                
-        # Ensure Award_Date is datetime type
-        if not pd.api.types.is_datetime64_any_dtype(filtered_df['Award_Date']):
-            filtered_df['Award_Date'] = pd.to_datetime(filtered_df['Award_Date'], errors='coerce')
-            # Drop rows where date conversion failed
-            filtered_df = filtered_df.dropna(subset=['Award_Date'])
-                
-        # Check if we still have data after cleaning
-        if filtered_df.empty:
-            fig = go.Figure()
-            fig.update_layout(
-                annotations=[{
-                    'text': 'No valid date information available',
-                    'showarrow': False,
-                    'font': {'size': 16},
-                    'xref': 'paper',
-                    'yref': 'paper',
-                    'x': 0.5,
-                    'y': 0.5
-                }],
-                xaxis=dict(title='Time'),
-                yaxis=dict(title='Total Amount Awarded (£)'),
-                template='plotly_white',
-                plot_bgcolor='rgba(0,0,0,0.02)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                height=350
-            )
-            return fig
 
         # Adapt aggregation based on data range
-        min_date = filtered_df['Award_Date'].min()
-        max_date = filtered_df['Award_Date'].max()
-        date_range = (max_date - min_date).days
+        date_range = timeline.date_range_days
         
-        if aggregation == 'Y' and date_range < 365:  # Changed from 'YE' to 'Y'
+        if aggregation == 'Y' and date_range < 365:
             # If less than a year of data, use quarterly
-            used_aggregation = 'Q'  # Changed from 'QE' to 'Q'
-        elif aggregation == 'Q' and date_range < 90:  # Changed from 'QE' to 'Q'
+            used_aggregation = 'Q'
+        elif aggregation == 'Q' and date_range < 90:
             # If less than 3 months, use monthly
-            used_aggregation = 'M'  # Changed from 'ME' to 'M'
-        elif aggregation == 'M' and date_range < 30:  # Changed from 'ME' to 'M'
+            used_aggregation = 'M'
+        elif aggregation == 'M' and date_range < 30:
             # If less than a month, use weekly
             used_aggregation = 'W'
         else:
             used_aggregation = aggregation
         
-        try:    
-            # Group data by time period
-            time_data = filtered_df.groupby(
-                pd.Grouper(key='Award_Date', freq=used_aggregation),
-                observed=True
-            )['Amount_awarded'].sum().reset_index()
-            
-            # Ensure we have data after grouping
-            if time_data.empty or time_data['Amount_awarded'].sum() == 0:
-                # If no data after grouping, try a different approach - directly use all points
-                time_data = filtered_df[['Award_Date', 'Amount_awarded']].copy()
-                time_data = time_data.sort_values('Award_Date')
-        except Exception as e:
-            # If there's any error with the grouping, fall back to using the raw data
-            print(f"Error in timeline grouping: {e}")
-            time_data = filtered_df[['Award_Date', 'Amount_awarded']].copy()
-            time_data = time_data.sort_values('Award_Date')
-                
-        time_data.rename(columns={'Award_Date': 'Time'}, inplace=True)
+        times, amounts = timeline.period_totals(used_aggregation)
+        time_data = pd.DataFrame({'Time': times, 'Amount_awarded': amounts})
 
         # Create the figure
         fig = go.Figure()
@@ -668,14 +986,12 @@ def init_dash(server):
                 'yanchor': 'top'
             },
             xaxis=dict(
-                title='Time Period',
-                titlefont=dict(size=12),
+                title=dict(text='Time Period', font=dict(size=12)),
                 showgrid=True,
                 gridcolor='rgba(0,0,0,0.1)'
             ),
             yaxis=dict(
-                title='Total Amount Awarded (£)',
-                titlefont=dict(size=12),
+                title=dict(text='Total Amount Awarded (£)', font=dict(size=12)),
                 showgrid=True,
                 gridcolor='rgba(0,0,0,0.1)',
                 range=[max(0, y_min - y_padding), y_max + y_padding]
@@ -688,22 +1004,18 @@ def init_dash(server):
         )
         return fig
     
-    @app.callback(
-        Output('interactive-timeline', 'figure'),
-        [Input('department-selector', 'value')]
-    )
-    def update_interactive_timeline(selected_department):
+    @memoize
+    def interactive_timeline_figure(selected_department):
         """
-        Update the interactive timeline based on selected department.
+        Build the interactive timeline for a selected department.
         """
-        filtered_df = df[df['Funding_Org:Department'] == selected_department]
-        time_data = filtered_df.groupby('Award_Date')['Amount_awarded'].sum()
-        time_data = time_data.reset_index()
+        dates, amounts = current_derived('timeline').department_totals(selected_department)
+        time_data = pd.DataFrame({'Award_Date': dates, 'Amount_awarded': amounts})
 
         if len(time_data) <= 1:
             if not time_data.empty:
                 amount = round(time_data['Amount_awarded'].iloc[0])
-                return {
+                return figure_json({
                     'layout': {
                         'annotations': [{
                             'text':
@@ -717,9 +1029,9 @@ def init_dash(server):
                         'plot_bgcolor': 'rgba(255,255,255,1)',  # White plot background,
                         'margin': dict(l=20, r=20, t=10, b=20)  # More compact for iframe
                     }
-                }
+                })
             else:
-                return {
+                return figure_json({
                     'layout': {
                         'annotations': [{
                             'text': "No grants found for this department.",
@@ -732,7 +1044,7 @@ def init_dash(server):
                         'plot_bgcolor': 'rgba(255,255,255,1)',  # White plot background,
                         'margin': dict(l=20, r=20, t=10, b=20)  # More compact for iframe
                     }
-                }
+                })
 
         fig = go.Figure()
         color = department_colors.get(selected_department, 'grey')
@@ -771,7 +1083,21 @@ def init_dash(server):
             template='plotly_white',
             margin=dict(l=20, r=20, t=10, b=20)  # More compact for iframe
         )
-        return fig
+        return figure_json(fig)
+    
+    @app.callback(
+        [Output('interactive-timeline', 'figure'),
+         Output('interactive-timeline-shown', 'data')],
+        [Input('department-selector', 'value')],
+        [State('interactive-timeline-shown', 'data')]
+    )
+    def update_interactive_timeline(selected_department, shown):
+        """
+        Update the interactive timeline based on selected department.
+        """
+        (fig,), shown = figure_updates(
+            lambda department: [interactive_timeline_figure(department)], shown, selected_department)
+        return fig, shown
     
     @app.callback(
         Output('wordcloud', 'src'),
@@ -781,69 +1107,44 @@ def init_dash(server):
         """
         Update the word cloud based on selected departments.
         """
-        if not selected_departments:
-            filtered_df = df.copy()
-        else:
-            filtered_df = df[
-                df['Funding_Org:Department'].isin(selected_departments)]
-
-        wc = generate_wordcloud(filtered_df['Title'])
-        img_data = wordcloud_to_base64(wc)
-        return f'data:image/png;base64,{img_data}'
+        return wordcloud_src(selected_departments)
     
     @app.callback(
         Output('top-grants-sunburst', 'figure'),
         [Input('top-n-slider', 'value')]
     )
+    @memoize
     def update_top_grants_sunburst(top_n):
         """
         Update the sunburst chart showing top N grants by value.
-        """
-        aggregated_grants = df.groupby(
-            ['Title', 'Funding_Org:Department'],
-            as_index=False
-        )['Amount_awarded'].sum()
 
-        top_grants = aggregated_grants.nlargest(top_n, 'Amount_awarded')
-
-        sunburst_fig = px.sunburst(
-            top_grants,
-            path=['Funding_Org:Department', 'Title'],
-            values='Amount_awarded',
-            color='Funding_Org:Department',
-            color_discrete_map=department_colors
-        )
-
-        sunburst_fig.update_layout(
-            margin=dict(l=0, r=0, b=0, t=10),
-            plot_bgcolor='rgba(0,0,0,0.02)',  # Very light gray for plot area
-            paper_bgcolor='rgba(0,0,0,0)'     # Transparent paper background
-        )
-
-        return sunburst_fig
+        The top N is a prefix of the dataset's TopGrants ranking, and the
+        figure for each N is memoized.
+        """
+        top_grants = current_derived('top_grants').top(top_n)
+        return run_render('sunburst', build_top_grants_sunburst, top_grants, department_colors)
     
     @app.callback(
-        Output('department-table', 'data'),
-        [Input('table-search', 'value')]
+        [Output('department-table', 'data'),
+         Output('department-table', 'page_count'),
+         Output('department-table', 'page_current')],
+        [Input('table-search', 'value'),
+         Input('department-table', 'page_current'),
+         Input('department-table', 'page_size'),
+         Input('department-table', 'sort_by'),
+         Input('department-table', 'filter_query')]
     )
-    def update_table(search_term):
-        """
-        Update the data table based on search term.
-        """
-        if search_term:
-            filtered_df = df[
-                df.apply(
-                    lambda row: row.astype(str).str.contains(
-                        search_term,
-                        case=False
-                    ).any(),
-                    axis=1
-                )
-            ]
-            data = filtered_df.to_dict('records')
-        else:
-            data = df.to_dict('records')
-        return data
+    def update_table(search_term, page_current, page_size, sort_by, filter_query):
+        """
+        Update the data table page based on the search term and the table's
+        page, sort and filter state.
+        """
+        df = current_df()
+        # A new search, sort or filter starts again from the first page
+        if 'department-table.page_current' not in ctx.triggered_prop_ids:
+            page_current = 0
+        return table_page(df, search_term, page_current or 0,
+                          page_size or TABLE_PAGE_SIZE, sort_by, filter_query)
     
     @app.callback(
         Output('interactive-timeline-title', 'children'),
@@ -865,6 +1166,33 @@ def init_dash(server):
         """
         return f"Top {top_n} Grants - Sunburst Chart"
     
+    @app.callback(
+        [Output('dataset-ready', 'data'),
+         Output('dataset-loading-status', 'children')],
+        [Input('dataset-loading-poll', 'n_intervals')]
+    )
+    def poll_dataset_ready(n_intervals):
+        """
+        Report the dataset load state to the loading page.
+        """
+        if dataset.error:
+            return False, f"Could not load grants data: {dataset.error}"
+        return dataset.ready, "Loading grants data..."
+    
+    # Reload the page to fetch the full layout once the dataset is ready
+    app.clientside_callback(
+        """
+        function(ready) {
+            if (ready) {
+                window.location.reload();
+            }
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output('dataset-loading-poll', 'disabled'),
+        [Input('dataset-ready', 'data')]
+    )
+    
     # Create the custom CSS file
     css_content = """
     /* Custom styles for embedded dashboard */
@@ -913,4 +1241,33 @@ def init_dash(server):
     except Exception as e:
         print(f"Warning: Could not write custom CSS file: {e}")
     
+    if lazy_load:
+        dataset.start_background_load(server)
+    
+    def warmup_steps():
+        """
+        Return the default dashboard states to compute ahead of requests.
+        """
+        df = dataset.df
+        years_range = default_years_range(df)
+        callbacks = memoize.functions
+        steps = [
+            ('totals', functools.partial(callbacks['update_total_metrics'], years_range)),
+            ('departments', functools.partial(callbacks['pie_and_duration_figures'], years_range, None)),
+        ]
+        steps += [(f'timeline-{value}', functools.partial(callbacks['update_timeline_chart'], value))
+                  for _, value in TIMELINE_AGGREGATIONS]
+        steps += [
+            ('interactive-timeline', functools.partial(callbacks['interactive_timeline_figure'],
+                                                       default_department(df))),
+            ('sunburst', functools.partial(callbacks['update_top_grants_sunburst'], DEFAULT_TOP_N)),
+            ('wordcloud', functools.partial(wordcloud_src, None)),
+        ]
+        return steps
+    
+    warmup = Warmup(warmup_steps)
+    server.extensions['dashboard_warmup'] = warmup
+    if server.config.get('DASH_WARMUP', False):
+        warmup.start(server, dataset)
+    
     return app
\ No newline at end of file
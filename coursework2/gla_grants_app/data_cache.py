@@ -0,0 +1,258 @@
+"""
+On-disk columnar cache for the grants workbook.
+
+Parsing ``cleaned_grants_data.xlsx`` with openpyxl dominates cold start, so
+this module converts the processed DataFrame once into a NumPy ``.npz``
+archive (one array per column) and reloads it from there on later starts.
+Loading the archive does not need openpyxl and does not unpickle anything.
+
+The cache is keyed on the source file: its modification time and size are
+checked first, and the SHA-256 of its contents decides whether a cache whose
+stat data no longer matches can be reused or must be rebuilt.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Bump when the archive layout changes so old caches are rebuilt.
+CACHE_FORMAT_VERSION = 1
+
+_META_KEY = '__meta__'
+
+# Cell kinds used to round-trip object columns holding mixed Python scalars.
+_KIND_NULL, _KIND_STR, _KIND_INT, _KIND_FLOAT, _KIND_BOOL = range(5)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path (str): Path of the file to hash.
+        chunk_size (int, optional): Bytes read per iteration.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path_for(source_path, cache_dir=None):
+    """
+    Return the path of the cache archive for a source file.
+
+    Args:
+        source_path (str): Path of the source workbook.
+        cache_dir (str, optional): Directory to hold the cache. Defaults to
+            the directory containing the source file.
+
+    Returns:
+        str: Path of the ``.npz`` archive.
+    """
+    directory = cache_dir or os.path.dirname(os.path.abspath(source_path))
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(directory, f"{stem}.cache.npz")
+
+
+def _encode_column(series):
+    """
+    Encode a column as a dict of plain (non-object) NumPy arrays.
+
+    Returns None if the column holds values that cannot be stored without
+    pickling, in which case the frame is not cached.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return None
+    if dtype.kind in 'biufcmM':
+        return {'values': series.to_numpy()}
+
+    values = series.to_numpy(dtype=object)
+    kinds = np.empty(len(values), dtype=np.int8)
+    text = []
+    for i, value in enumerate(values):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            kinds[i] = _KIND_NULL
+            text.append('')
+        elif isinstance(value, str):
+            kinds[i] = _KIND_STR
+            text.append(value)
+        elif isinstance(value, (bool, np.bool_)):
+            kinds[i] = _KIND_BOOL
+            text.append(str(bool(value)))
+        elif isinstance(value, (int, np.integer)):
+            kinds[i] = _KIND_INT
+            text.append(str(int(value)))
+        elif isinstance(value, (float, np.floating)):
+            kinds[i] = _KIND_FLOAT
+            text.append(repr(float(value)))
+        else:
+            return None
+    encoded = [t.encode('utf-8') for t in text]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return {'kinds': kinds, 'blob': blob, 'offsets': offsets}
+
+
+def _decode_column(arrays):
+    """Rebuild column values from the arrays written by _encode_column."""
+    if 'values' in arrays:
+        return arrays['values']
+
+    kinds = arrays['kinds']
+    blob = arrays['blob'].tobytes()
+    offsets = arrays['offsets'].tolist()
+    values = np.empty(len(kinds), dtype=object)
+    values[:] = [blob[start:end].decode('utf-8')
+                 for start, end in zip(offsets[:-1], offsets[1:])]
+    values[kinds == _KIND_NULL] = np.nan
+    for kind, convert in ((_KIND_INT, int), (_KIND_FLOAT, float),
+                          (_KIND_BOOL, lambda s: s == 'True')):
+        positions = np.flatnonzero(kinds == kind)
+        for i in positions:
+            values[i] = convert(values[i])
+    return values
+
+
+def write_frame_cache(df, cache_path, source_meta):
+    """
+    Write a DataFrame to a columnar ``.npz`` cache archive.
+
+    The archive is written to a temporary file and moved into place so
+    concurrent readers never see a partial file.
+
+    Args:
+        df (pandas.DataFrame): Frame to cache.
+        cache_path (str): Destination archive path.
+        source_meta (dict): Fingerprint of the source file (mtime, size,
+            sha256) stored alongside the data.
+
+    Returns:
+        bool: True if the cache was written, False if the frame could not
+        be encoded or the archive could not be written.
+    """
+    arrays = {'index': df.index.to_numpy()}
+    columns = []
+    for position, column in enumerate(df.columns):
+        encoded = _encode_column(df[column])
+        if encoded is None:
+            print(f"Warning: column {column!r} cannot be cached; using the source file.")
+            return False
+        for part, array in encoded.items():
+            arrays[f"c{position}_{part}"] = array
+        columns.append({'name': column, 'dtype': str(df[column].dtype)})
+
+    meta = dict(source_meta, format=CACHE_FORMAT_VERSION, columns=columns)
+    arrays[_META_KEY] = np.array(json.dumps(meta))
+
+    directory = os.path.dirname(cache_path)
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+    except Exception as e:
+        print(f"Warning: could not write data cache {cache_path}: {e}")
+        return False
+    finally:
+        # A partial archive is never left behind, whatever interrupted it
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+    return True
+
+
+def read_frame_cache(cache_path):
+    """
+    Read a cache archive written by write_frame_cache.
+
+    Args:
+        cache_path (str): Archive path.
+
+    Returns:
+        tuple: ``(meta, DataFrame)``; the DataFrame is None if only the
+        metadata could be read.
+    """
+    with np.load(cache_path, allow_pickle=False) as archive:
+        meta = json.loads(str(archive[_META_KEY]))
+        if meta.get('format') != CACHE_FORMAT_VERSION:
+            return meta, None
+        index = pd.Index(archive['index'])
+        data = {}
+        for position, column in enumerate(meta['columns']):
+            prefix = f"c{position}_"
+            parts = {
+                key[len(prefix):]: archive[key]
+                for key in archive.files if key.startswith(prefix)
+            }
+            data[column['name']] = pd.Series(
+                _decode_column(parts), index=index, dtype=column['dtype'])
+    df = pd.DataFrame(data, columns=[c['name'] for c in meta['columns']])
+    return meta, df
+
+
+def _read_meta(cache_path):
+    """Read only the metadata member of a cache archive, or None."""
+    try:
+        with np.load(cache_path, allow_pickle=False) as archive:
+            return json.loads(str(archive[_META_KEY]))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def load_cached_frame(source_path, build, cache_dir=None):
+    """
+    Load a processed DataFrame, using the columnar cache when it is valid.
+
+    The cache is reused when the source file's mtime and size match the
+    stored fingerprint. If they differ, the file is hashed: an identical
+    hash only refreshes the stored fingerprint, a different hash rebuilds
+    the cache by calling ``build``.
+
+    Args:
+        source_path (str): Path of the source workbook.
+        build (callable): Function taking ``source_path`` and returning the
+            processed DataFrame (parsed dates, sort order, etc.).
+        cache_dir (str, optional): Directory for the cache archive.
+
+    Returns:
+        pandas.DataFrame: The processed DataFrame.
+    """
+    cache_path = cache_path_for(source_path, cache_dir)
+    stat = os.stat(source_path)
+    source_meta = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    meta = _read_meta(cache_path) if os.path.exists(cache_path) else None
+    if meta is not None and meta.get('format') == CACHE_FORMAT_VERSION:
+        stat_matches = (meta.get('mtime_ns') == source_meta['mtime_ns']
+                        and meta.get('size') == source_meta['size'])
+        if not stat_matches:
+            source_meta['sha256'] = file_sha256(source_path)
+        if stat_matches or meta.get('sha256') == source_meta['sha256']:
+            try:
+                _, df = read_frame_cache(cache_path)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Warning: could not read data cache {cache_path}: {e}")
+                df = None
+            if df is not None:
+                if not stat_matches:
+                    write_frame_cache(df, cache_path, source_meta)
+                return df
+
+    df = build(source_path)
+    source_meta.setdefault('sha256', file_sha256(source_path))
+    write_frame_cache(df, cache_path, source_meta)
+    return df
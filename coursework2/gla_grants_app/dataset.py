@@ -0,0 +1,155 @@
+"""
+Dataset holder for the Dash dashboard.
+
+GrantsDataset owns the grants DataFrame used by the Dash callbacks and
+tracks whether it has been loaded. The data can be loaded synchronously or
+on a background thread, so the Flask routes can serve requests while the
+dataset and its derived artefacts are still being built.
+"""
+import hashlib
+import threading
+import time
+
+import pandas as pd
+
+
+def frame_version(df):
+    """
+    Return a short content hash identifying a DataFrame.
+
+    Args:
+        df (pandas.DataFrame): Frame to fingerprint.
+
+    Returns:
+        str: 16-character hex digest, stable across processes.
+    """
+    digest = hashlib.sha256()
+    digest.update(','.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class GrantsDataset:
+    """
+    Grants data shared by the dashboard callbacks, with its load state.
+
+    Attributes:
+        df: The loaded DataFrame, or None until loading has finished.
+        version: Content hash of ``df``, or None until loaded.
+        error: Error message if the last load failed.
+        load_seconds: Duration of the last successful load.
+        derived: Name -> structure built from ``df`` by the functions
+            registered with add_derived (indexes, aggregates, ...).
+    """
+
+    def __init__(self, loader):
+        """
+        Args:
+            loader (callable): Function returning the processed DataFrame.
+                It is called inside an application context.
+        """
+        self._loader = loader
+        self._ready = threading.Event()
+        self._thread = None
+        self._builders = {}
+        self.df = None
+        self.derived = {}
+        self.version = None
+        self.error = None
+        self.load_seconds = None
+
+    @property
+    def ready(self):
+        """bool: True once the dataset has been loaded."""
+        return self._ready.is_set()
+
+    @property
+    def state(self):
+        """str: One of 'ready', 'loading', 'error' or 'idle'."""
+        if self.ready:
+            return 'ready'
+        if self.error:
+            return 'error'
+        if self._thread is not None:
+            return 'loading'
+        return 'idle'
+
+    def add_derived(self, name, build):
+        """
+        Register a structure to build from the DataFrame on every load.
+
+        Derived structures are built before the dataset is marked ready, so
+        callbacks never see a DataFrame without them.
+
+        Args:
+            name (str): Key in ``derived``.
+            build (callable): Function taking the DataFrame.
+        """
+        self._builders[name] = build
+
+    def load(self, app):
+        """
+        Load the dataset synchronously.
+
+        Args:
+            app (Flask): Application whose context the loader runs in.
+        """
+        start = time.perf_counter()
+        with app.app_context():
+            df = self._loader()
+        self.derived = {name: build(df) for name, build in self._builders.items()}
+        self.df = df
+        self.version = frame_version(df)
+        self.load_seconds = round(time.perf_counter() - start, 3)
+        self.error = None
+        self._ready.set()
+
+    def _load_in_background(self, app):
+        """Thread target: load and record any failure instead of raising."""
+        try:
+            self.load(app)
+        except Exception as e:
+            print(f"Error loading dashboard dataset: {e}")
+            self.error = str(e)
+
+    def start_background_load(self, app):
+        """
+        Start loading the dataset on a daemon thread.
+
+        Args:
+            app (Flask): Application whose context the loader runs in.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._load_in_background, args=(app,),
+            name='grants-dataset-loader', daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Block until the dataset is loaded.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the dataset is ready.
+        """
+        return self._ready.wait(timeout)
+
+    def status(self):
+        """
+        Return the load state as a JSON-serialisable dict.
+
+        Returns:
+            dict: State, readiness, row count, version and any error.
+        """
+        return {
+            'state': self.state,
+            'ready': self.ready,
+            'rows': len(self.df) if self.df is not None else None,
+            'version': self.version,
+            'load_seconds': self.load_seconds,
+            'error': self.error,
+        }
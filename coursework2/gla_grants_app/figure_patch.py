@@ -0,0 +1,64 @@
+"""
+Partial figure updates for Dash callbacks.
+
+A callback returning a whole figure re-sends its layout, template, colours
+and annotations even when only the trace data changed. When the browser
+already shows a figure of the same kind (see figure_kind), data_patch
+returns a ``dash.Patch`` replacing only the traces, so the layout and
+template are neither sent nor re-rendered, and no previous figure has to be
+rebuilt or compared to build it.
+
+This relies on figure builders only varying their traces between inputs
+that give figures of the same kind; figures without traces (e.g. a message
+shown as an annotation) are always sent whole.
+
+Figures are handled in their JSON form (see figure_json), as Dash would
+send them.
+"""
+import json
+
+from dash import Patch
+from plotly.io.json import to_json_plotly
+
+
+def figure_json(figure):
+    """
+    Return a figure as plain JSON data.
+
+    Args:
+        figure (plotly.graph_objects.Figure or dict): Figure to convert.
+
+    Returns:
+        dict: The figure as Dash would serialise it.
+    """
+    # The json engine formats dates like Dash's response encoding does
+    return json.loads(to_json_plotly(figure, engine='json'))
+
+
+def figure_kind(figure):
+    """
+    Return the kind of a figure: the types of its traces.
+
+    Args:
+        figure (dict): Figure as returned by figure_json.
+
+    Returns:
+        list: Sorted distinct trace types; empty for a figure without
+        traces.
+    """
+    return sorted({trace.get('type', 'scatter') for trace in figure.get('data', [])})
+
+
+def data_patch(figure):
+    """
+    Return a Patch replacing the traces of a shown figure of the same kind.
+
+    Args:
+        figure (dict): Figure to show, as returned by figure_json.
+
+    Returns:
+        dash.Patch: Assignment of the figure's traces.
+    """
+    patch = Patch()
+    patch['data'] = figure['data']
+    return patch
@@ -9,6 +9,18 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField, SelectField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Length, Email, EqualTo
 
+# Categories a grant application can be submitted under
+APPLICATION_CATEGORIES = [
+    'Arts & Culture',
+    'Business',
+    'Community',
+    'Education',
+    'Environment',
+    'Health',
+    'Housing',
+    'Youth Services',
+]
+
 class LoginForm(FlaskForm):
     """Form for user login."""
     username = StringField('Username', validators=[DataRequired()])
@@ -36,15 +48,6 @@ class ApplicationForm(FlaskForm):
     title = StringField('Title', validators=[DataRequired(), Length(max=200)])
     description = TextAreaField('Description (max 500 words)', validators=[DataRequired(), Length(max=5000)])
     category = SelectField('Category', validators=[DataRequired()], 
-                         choices=[
-                             ('Arts & Culture', 'Arts & Culture'),
-                             ('Business', 'Business'),
-                             ('Community', 'Community'),
-                             ('Education', 'Education'),
-                             ('Environment', 'Environment'),
-                             ('Health', 'Health'),
-                             ('Housing', 'Housing'),
-                             ('Youth Services', 'Youth Services')
-                         ])
+                         choices=[(category, category) for category in APPLICATION_CATEGORIES])
     question = TextAreaField('Question', validators=[DataRequired()])
     submit = SubmitField('Submit Application')
\ No newline at end of file
@@ -2,13 +2,15 @@
 Helper functions for the GLA Grants application.
 
 This module provides utility functions used throughout the application,
-primarily for setting up initial database data.
+primarily for setting up initial database data and querying and
+reviewing grant applications for the admin dashboard.
 """
 import pandas as pd
 import os
+from sqlalchemy import case, func, update
 from werkzeug.security import generate_password_hash
 from coursework2.gla_grants_app import db
-from coursework2.gla_grants_app.models import User
+from coursework2.gla_grants_app.models import User, GrantApplication
 
 def setup_db_data():
     """
@@ -41,4 +43,137 @@ def setup_db_data():
             print("Database setup complete with sample users")
         except Exception as e:
             print(f"Error setting up database: {e}")
-            db.session.rollback()
\ No newline at end of file
+            db.session.rollback()
+
+def is_reviewed():
+    """
+    SQL condition for applications that have admin feedback.
+    
+    Empty feedback is stored as NULL (see GrantApplication.validate_comment),
+    so pending applications are exactly those with a NULL comment and can be
+    listed from the partial index ix_grant_applications_pending.
+    
+    Returns:
+        ColumnElement: Boolean SQL expression.
+    """
+    return GrantApplication.comment.is_not(None)
+
+def application_summary():
+    """
+    Count all, reviewed and pending applications in one aggregate query.
+    
+    Returns:
+        dict: 'total', 'reviewed' and 'pending' counts.
+    """
+    total, reviewed = db.session.execute(
+        db.select(
+            func.count(GrantApplication.id),
+            func.coalesce(func.sum(case((is_reviewed(), 1), else_=0)), 0),
+        )
+    ).one()
+    return {'total': total, 'reviewed': reviewed, 'pending': total - reviewed}
+
+def application_page(status=None, category=None, after=None, before=None, per_page=20):
+    """
+    Return one page of applications by keyset pagination on the id.
+    
+    Pages are addressed by the id of the last application of the previous
+    page (``after``) or the first of the next page (``before``), so the
+    cost of a page does not depend on how far into the list it is.
+    
+    Args:
+        status (str, optional): 'pending' or 'reviewed'; anything else
+            lists all applications.
+        category (str, optional): Only list applications in this category.
+        after (int, optional): List applications with a larger id.
+        before (int, optional): List applications with a smaller id
+            (ignored if ``after`` is given).
+        per_page (int, optional): Applications per page.
+    
+    Returns:
+        tuple: (applications in ascending id order, whether an earlier page
+        exists, whether a later page exists).
+    """
+    query = db.select(GrantApplication)
+    if status == 'reviewed':
+        query = query.where(is_reviewed())
+    elif status == 'pending':
+        query = query.where(GrantApplication.comment.is_(None))
+    if category:
+        query = query.where(GrantApplication.category == category)
+    
+    if after is None and before is not None:
+        query = query.where(GrantApplication.id < before).order_by(GrantApplication.id.desc())
+        rows = db.session.execute(query.limit(per_page + 1)).scalars().all()
+        applications = list(reversed(rows[:per_page]))
+        return applications, len(rows) > per_page, True
+    
+    if after is not None:
+        query = query.where(GrantApplication.id > after)
+    query = query.order_by(GrantApplication.id)
+    rows = db.session.execute(query.limit(per_page + 1)).scalars().all()
+    return rows[:per_page], after is not None, len(rows) > per_page
+
+def validate_reviews(reviews):
+    """
+    Check a batch of reviews sent to the bulk review endpoint.
+    
+    Each review must be an object with an integer ``application_id`` of an
+    existing application and a ``comment`` that is a string or null. The
+    updates bypass the ORM's validators, so comments are normalised here
+    with GrantApplication.normalise_comment. The applications are looked up
+    in a single query.
+    
+    Args:
+        reviews (list): Review objects decoded from the request JSON.
+    
+    Returns:
+        tuple: (list of {'id', 'comment'} updates, list of {'index',
+        'error'} dicts, empty if every review is valid).
+    """
+    updates, errors, seen = [], [], set()
+    for index, review in enumerate(reviews):
+        if not isinstance(review, dict):
+            errors.append({'index': index, 'error': 'Review must be an object'})
+            continue
+        application_id = review.get('application_id')
+        comment = review.get('comment')
+        if not isinstance(application_id, int) or isinstance(application_id, bool):
+            errors.append({'index': index, 'error': 'application_id must be an integer'})
+        elif comment is not None and not isinstance(comment, str):
+            errors.append({'index': index, 'error': 'comment must be a string or null'})
+        elif application_id in seen:
+            errors.append({'index': index, 'error': f'Application {application_id} is reviewed more than once'})
+        else:
+            seen.add(application_id)
+            updates.append({'id': application_id, 'comment': GrantApplication.normalise_comment(comment)})
+    
+    if updates:
+        existing = set(db.session.execute(
+            db.select(GrantApplication.id).where(GrantApplication.id.in_([u['id'] for u in updates]))
+        ).scalars())
+        errors.extend(
+            {'index': index, 'error': f"Application {review['application_id']} does not exist"}
+            for index, review in enumerate(reviews)
+            if isinstance(review, dict) and review.get('application_id') in seen - existing
+        )
+        errors.sort(key=lambda error: error['index'])
+    return updates, errors
+
+def apply_reviews(updates):
+    """
+    Store the comments of many applications in one transaction.
+    
+    The updates run as a single executemany UPDATE by primary key, so
+    either every comment is stored or, if an application disappeared since
+    validation (StaleDataError), none is.
+    
+    Args:
+        updates (list): {'id', 'comment'} dicts from validate_reviews.
+    """
+    try:
+        db.session.execute(update(GrantApplication), updates)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,121 @@
+"""
+Content-addressed store for rendered dashboard images.
+
+Word clouds used to be returned to the browser as base64 data URIs inside
+the callback response, which adds a third to their size and cannot be
+cached by the browser. ImageStore writes each rendered image once under the
+SHA-256 of its bytes, so the callback only returns a URL and the image
+route can serve the file with that digest as a strong ETag and
+``immutable`` cache headers: the content behind a URL never changes.
+
+The files live on disk (by default in the instance folder), so every worker
+process of the app can serve images rendered by any other. Rendering must be
+deterministic for the store to deduplicate, and the number of files kept is
+bounded: the least recently used images are deleted once there are more
+than ``max_files``. Looking an image up or storing it again marks it as
+used by refreshing its modification time.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+# Image formats accepted by the store: file extension -> (Pillow format, MIME type).
+IMAGE_FORMATS = {
+    'png': ('PNG', 'image/png'),
+    'webp': ('WEBP', 'image/webp'),
+}
+
+_DIGEST = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ImageStore:
+    """
+    Directory of images named ``<sha256>.<extension>``.
+
+    Args:
+        directory (str): Directory holding the images; created on first
+            write.
+        max_files (int, optional): Images kept; the least recently used are
+            deleted when a new image would exceed it. None keeps every
+            image.
+    """
+
+    def __init__(self, directory, max_files=None):
+        self.directory = directory
+        self.max_files = max_files
+
+    def path(self, digest, extension):
+        """
+        Return the path of a stored image, marking it as recently used.
+
+        Args:
+            digest (str): SHA-256 hex digest of the image bytes.
+            extension (str): File extension, a key of IMAGE_FORMATS.
+
+        Returns:
+            str: Path of the image, or None if the digest or extension is
+            invalid or the image is not stored.
+        """
+        if extension not in IMAGE_FORMATS or not _DIGEST.match(digest):
+            return None
+        path = os.path.join(self.directory, f'{digest}.{extension}')
+        return path if self._touch(path) else None
+
+    def put(self, data, extension):
+        """
+        Store image bytes under their digest.
+
+        Writing is atomic, and an image that is already stored is not
+        rewritten, only marked as recently used.
+
+        Args:
+            data (bytes): Encoded image.
+            extension (str): File extension, a key of IMAGE_FORMATS.
+
+        Returns:
+            str: SHA-256 hex digest of ``data``.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.directory, f'{digest}.{extension}')
+        if not self._touch(path):
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=f'.{extension}.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._prune(keep=path)
+        return digest
+
+    @staticmethod
+    def _touch(path):
+        """Set an image's modification time to now; False if it is not stored."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _prune(self, keep):
+        """Delete the least recently used images beyond max_files, except ``keep``."""
+        if self.max_files is None:
+            return
+        entries = []
+        for entry in os.scandir(self.directory):
+            name, _, extension = entry.name.partition('.')
+            if extension in IMAGE_FORMATS and _DIGEST.match(name) and entry.path != keep:
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        entries.sort()
+        for _, path in entries[:max(len(entries) + 1 - self.max_files, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Pruned by another worker process meanwhile
+                pass
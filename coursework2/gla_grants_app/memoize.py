@@ -0,0 +1,122 @@
+"""
+Memoization of Dash callback outputs.
+
+Most dashboard callbacks are pure functions of their inputs and the loaded
+dataset, yet every request from every user recomputed them. CallbackMemo
+wraps such callbacks and caches their outputs in an LRUCache (per process)
+or an SQLiteCache (shared by worker processes), keyed by the callback name,
+the dataset version and a hash of the normalised inputs. When the dataset
+version changes the backend is cleared, and a callback whose dataset is not
+loaded yet is not cached at all.
+
+Only callbacks whose output depends on nothing but their arguments and the
+dataset may be memoized: not ones reading ``dash.ctx``, the session or the
+time.
+"""
+import functools
+import hashlib
+import json
+import threading
+
+
+def inputs_key(args, kwargs=None):
+    """
+    Return a stable hash of callback arguments.
+
+    Args:
+        args (tuple): Positional arguments (JSON values sent by Dash).
+        kwargs (dict, optional): Keyword arguments.
+
+    Returns:
+        str: SHA-256 hex digest of the arguments' canonical JSON form.
+    """
+    canonical = json.dumps([list(args), kwargs or {}], sort_keys=True,
+                           separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class CallbackMemo:
+    """
+    Decorator factory memoizing callbacks in a shared cache backend.
+
+    Args:
+        backend: LRUCache or SQLiteCache holding the outputs.
+        version (callable): Function returning the current dataset version,
+            or None while no dataset is loaded.
+
+    Attributes:
+        functions: Callback name -> memoized function, so outputs can be
+            computed ahead of requests (e.g. by the startup warmup).
+    """
+
+    def __init__(self, backend, version):
+        self.backend = backend
+        self._version = version
+        self._seen_version = None
+        self._lock = threading.Lock()
+        self._counters = {}  # callback name -> {'hits': n, 'misses': n}
+        self.functions = {}
+
+    def _current_version(self):
+        """Return the dataset version, clearing the backend when it changes."""
+        version = self._version()
+        if version is None:
+            return None
+        with self._lock:
+            changed = self._seen_version is not None and version != self._seen_version
+            self._seen_version = version
+        if changed:
+            self.backend.clear()
+        return version
+
+    def _count(self, name, counter):
+        with self._lock:
+            self._counters[name][counter] += 1
+
+    def __call__(self, fn):
+        """
+        Memoize a callback.
+
+        Args:
+            fn (callable): Callback function.
+
+        Returns:
+            callable: The wrapped callback.
+        """
+        name = fn.__name__
+        self._counters.setdefault(name, {'hits': 0, 'misses': 0})
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            version = self._current_version()
+            if version is None:
+                return fn(*args, **kwargs)
+            key = f'{name}:{version}:{inputs_key(args, kwargs)}'
+            computed = []
+
+            def compute():
+                computed.append(True)
+                return fn(*args, **kwargs)
+
+            value = self.backend.get_or_compute(key, compute)
+            self._count(name, 'misses' if computed else 'hits')
+            return value
+
+        self.functions[name] = wrapper
+        return wrapper
+
+    def stats(self):
+        """
+        Return per-callback hit rates and the backend counters.
+
+        Returns:
+            dict: ``callbacks`` (name -> hits, misses, hit_rate) and
+            ``backend`` (the backend's stats).
+        """
+        with self._lock:
+            callbacks = {
+                name: dict(counts, hit_rate=round(counts['hits'] / (counts['hits'] + counts['misses']), 3)
+                           if counts['hits'] + counts['misses'] else None)
+                for name, counts in self._counters.items()
+            }
+        return {'callbacks': callbacks, 'backend': self.backend.stats()}
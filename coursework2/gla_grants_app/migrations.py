@@ -0,0 +1,123 @@
+"""
+In-place schema upgrades for existing GLA Grants databases.
+
+db.create_all() creates missing tables with the current schema but never
+alters a table that already exists, so a gla_grants.sqlite created by an
+earlier version of the app keeps its old column types and lacks the newer
+indexes. upgrade_schema brings such a database up to SCHEMA_VERSION and
+records the version in SQLite's ``user_version`` pragma, so each upgrade
+runs once per database.
+
+Schema versions:
+
+1. ``grant_applications.date_submitted`` is a DATE column (it was TEXT),
+   empty comments are stored as NULL, and the indexes declared on
+   GrantApplication exist.
+2. The grant_applications_fts full-text index and the triggers keeping it
+   in sync exist (see application_search).
+"""
+from coursework2.gla_grants_app.application_search import SEARCH_INDEX_DDL
+from coursework2.gla_grants_app.models import GrantApplication
+
+SCHEMA_VERSION = 2
+
+
+class SchemaUpgradeError(Exception):
+    """Raised when stored data cannot be converted to the current schema."""
+
+
+def _column_types(connection, table_name):
+    """Return column name -> declared type of a table."""
+    rows = connection.exec_driver_sql(f'PRAGMA table_info({table_name})').all()
+    return {row[1]: row[2].upper() for row in rows}
+
+
+def _rebuild_grant_applications(connection):
+    """
+    Recreate grant_applications with the current column types, keeping its rows.
+
+    SQLite cannot change the type of a column, so the table is renamed, the
+    new one created from the model and the rows copied across. Dates stored
+    with a time part are truncated to the date.
+
+    Raises:
+        SchemaUpgradeError: Some dates cannot be parsed. They could not be
+            loaded as dates, and date_submitted cannot be NULL, so they
+            must be corrected by hand before the upgrade can run.
+    """
+    invalid = connection.exec_driver_sql(
+        'SELECT id, date_submitted FROM grant_applications WHERE date(date_submitted) IS NULL ORDER BY id'
+    ).all()
+    if invalid:
+        listed = ', '.join(f'{row[0]} ({row[1]!r})' for row in invalid[:10])
+        more = f' and {len(invalid) - 10} more' if len(invalid) > 10 else ''
+        raise SchemaUpgradeError(
+            f"grant_applications.date_submitted is not a valid date in {len(invalid)} "
+            f"application(s): {listed}{more}. Correct them and restart the app."
+        )
+    table = GrantApplication.__table__
+    columns = [column.name for column in table.columns]
+    values = ['date(date_submitted)' if name == 'date_submitted' else name for name in columns]
+    connection.exec_driver_sql('ALTER TABLE grant_applications RENAME TO grant_applications_old')
+    table.create(connection)
+    connection.exec_driver_sql(
+        f"INSERT INTO grant_applications ({', '.join(columns)}) "
+        f"SELECT {', '.join(values)} FROM grant_applications_old"
+    )
+    connection.exec_driver_sql('DROP TABLE grant_applications_old')
+
+
+def _upgrade_to_1(connection):
+    """Type date_submitted as DATE, store empty comments as NULL and add the indexes."""
+    if _column_types(connection, 'grant_applications').get('date_submitted') != 'DATE':
+        _rebuild_grant_applications(connection)
+    connection.exec_driver_sql("UPDATE grant_applications SET comment = NULL WHERE comment = ''")
+    for index in GrantApplication.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _upgrade_to_2(connection):
+    """Create the full-text index over the applications and fill it."""
+    for statement in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+
+
+def upgrade_schema(engine):
+    """
+    Upgrade a database created by db.create_all() to SCHEMA_VERSION.
+
+    The upgrade runs in one immediate transaction, so it either applies
+    completely or not at all, and concurrent worker processes starting the
+    app wait for it instead of upgrading twice.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine of an SQLite database
+            whose tables exist.
+
+    Returns:
+        int: Schema version the database was at before the upgrade.
+
+    Raises:
+        SchemaUpgradeError: The stored data cannot be upgraded; the
+            database is left unchanged.
+    """
+    with engine.connect() as connection:
+        version = connection.exec_driver_sql('PRAGMA user_version').scalar()
+        if version >= SCHEMA_VERSION:
+            return version
+        # pysqlite does not open a transaction before DDL statements itself
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+        try:
+            version = connection.exec_driver_sql('PRAGMA user_version').scalar()
+            if version < 1:
+                _upgrade_to_1(connection)
+            if version < 2:
+                _upgrade_to_2(connection)
+            connection.exec_driver_sql(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        except Exception:
+            connection.rollback()
+            raise
+        connection.commit()
+        if version < SCHEMA_VERSION:
+            print(f"Database schema upgraded from version {version} to {SCHEMA_VERSION}")
+        return version
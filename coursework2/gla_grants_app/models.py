@@ -2,11 +2,12 @@
 Database models for the GLA Grants application.
 
 This module defines the SQLAlchemy ORM models that represent the
-database schema for the GLA Grants application, including User and
-GrantApplication models.
+database schema for the GLA Grants application, including User,
+GrantApplication and SentimentScore models.
 """
-from sqlalchemy import String, Integer, Float, Text, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from datetime import date
+from sqlalchemy import String, Integer, Float, Text, Date, ForeignKey, Index, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from typing import List, Optional
 from coursework2.gla_grants_app import db
 
@@ -41,11 +42,20 @@ class GrantApplication(db.Model):
         description: Detailed description of the grant application.
         category: Category of the grant application.
         question: Specific question posed by the applicant.
-        comment: Optional admin feedback on the application.
+        comment: Optional admin feedback on the application; None while the
+            application is pending review.
         date_submitted: Date when the application was submitted.
         user: Relationship to the user who submitted the application.
     """
     __tablename__ = 'grant_applications'
+    __table_args__ = (
+        # Account history: one user's applications, newest first
+        Index('ix_grant_applications_user_id_date_submitted', 'user_id', 'date_submitted'),
+        # Admin dashboard filtered by category, paged by id
+        Index('ix_grant_applications_category_id', 'category', 'id'),
+        # Admin dashboard listing only the applications awaiting review
+        Index('ix_grant_applications_pending', 'id', sqlite_where=text('comment IS NULL')),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
@@ -54,6 +64,31 @@ class GrantApplication(db.Model):
     category: Mapped[str] = mapped_column(Text, nullable=False)
     question: Mapped[str] = mapped_column(Text, nullable=False)
     comment: Mapped[Optional[str]] = mapped_column(Text)
-    date_submitted: Mapped[str] = mapped_column(Text, nullable=False)
+    date_submitted: Mapped[date] = mapped_column(Date, nullable=False)
     
-    user = relationship("User", back_populates="applications")
\ No newline at end of file
+    user = relationship("User", back_populates="applications")
+    
+    @staticmethod
+    def normalise_comment(comment):
+        """Return feedback as stored: empty feedback is None, so pending applications match the partial index."""
+        return comment or None
+    
+    @validates('comment')
+    def validate_comment(self, key, comment):
+        """Normalise feedback assigned to an application (see normalise_comment)."""
+        return self.normalise_comment(comment)
+
+class SentimentScore(db.Model):
+    """
+    Model caching VADER compound scores for grant descriptions.
+    
+    Attributes:
+        text_hash: SHA-256 hex digest of the description text.
+        lexicon_version: Version of the lexicon and nltk release used to score.
+        score: Compound sentiment score (-1 to 1).
+    """
+    __tablename__ = 'sentiment_scores'
+    
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    lexicon_version: Mapped[str] = mapped_column(String(16), primary_key=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
@@ -0,0 +1,169 @@
+"""
+Execution of heavy dashboard renders off the Flask request threads.
+
+The word cloud and sunburst callbacks run on the same server that handles
+logins and applications, and a burst of slider or dropdown changes used to
+start one full render per change. RenderPool runs such renders on a local
+process pool (or inline when no workers are configured) and coalesces them
+per channel, e.g. per callback and client:
+
+- only one render per channel runs at a time;
+- a request that was superseded by a newer one on its channel while it
+  waited is dropped without rendering (latest wins);
+- waiting for the channel is bounded by a timeout, and so is rendering on
+  worker processes (an inline render cannot be interrupted, so with no
+  workers the timeout only bounds the wait).
+
+A channel's state is dropped once its last pending request finishes, so
+channels for clients that have gone away do not accumulate.
+
+Functions run on the pool must be picklable (module-level) and take and
+return picklable values.
+"""
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class RenderCancelled(Exception):
+    """Raised when a render's result is not needed any more."""
+
+
+class RenderSuperseded(RenderCancelled):
+    """Raised when a newer render was requested on the same channel."""
+
+
+class RenderTimeout(RenderCancelled):
+    """Raised when a render did not finish within the timeout."""
+
+
+class RenderPool:
+    """
+    Latest-wins render executor with an optional process pool.
+
+    Args:
+        workers (int, optional): Worker processes; 0 renders on the calling
+            thread.
+        timeout (float, optional): Seconds a request may wait for its
+            channel and its render; None waits indefinitely. Inline renders
+            cannot be interrupted, so only the wait is bounded for them.
+    """
+
+    def __init__(self, workers=0, timeout=None):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._tokens = itertools.count()
+        self._latest = {}  # channel -> token of the newest request
+        self._channel_locks = {}
+        self._pending = {}  # channel -> requests waiting or rendering
+        self.completed = 0
+        self.superseded = 0
+        self.timeouts = 0
+
+    def _executor_for_run(self):
+        """Return the process pool, creating it on first use."""
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _check_latest(self, channel, token):
+        """Raise RenderSuperseded if a newer request exists on the channel."""
+        with self._lock:
+            latest = self._latest.get(channel) == token
+        if not latest:
+            self._count('superseded')
+            raise RenderSuperseded(channel)
+
+    def run(self, channel, fn, *args):
+        """
+        Run ``fn(*args)`` unless a newer request on the channel supersedes it.
+
+        A render that has started is returned even if it was superseded
+        meanwhile, so its result can still be cached.
+
+        Args:
+            channel: Hashable key; requests on the same channel supersede
+                each other.
+            fn (callable): Render function.
+            *args: Arguments for ``fn``.
+
+        Returns:
+            The value returned by ``fn``.
+
+        Raises:
+            RenderSuperseded: A newer request was made on the channel.
+            RenderTimeout: The wait for the channel, or a render on a worker
+                process, timed out. A timed-out render already running in a
+                worker process finishes in the background.
+        """
+        with self._lock:
+            token = next(self._tokens)
+            self._latest[channel] = token
+            channel_lock = self._channel_locks.setdefault(channel, threading.Lock())
+            self._pending[channel] = self._pending.get(channel, 0) + 1
+        try:
+            return self._run_locked(channel, channel_lock, token, fn, args)
+        finally:
+            self._release_channel(channel)
+
+    def _release_channel(self, channel):
+        """Forget a channel once no request on it is waiting or rendering."""
+        with self._lock:
+            self._pending[channel] -= 1
+            if not self._pending[channel]:
+                del self._pending[channel], self._latest[channel], self._channel_locks[channel]
+
+    def _run_locked(self, channel, channel_lock, token, fn, args):
+        """Render once the channel is free, unless superseded meanwhile."""
+        if not channel_lock.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            self._count('timeouts')
+            raise RenderTimeout(channel)
+        try:
+            # Requests that were superseded while waiting never render
+            self._check_latest(channel, token)
+            executor = self._executor_for_run()
+            if executor is None:
+                result = fn(*args)
+            else:
+                future = executor.submit(fn, *args)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    self._count('timeouts')
+                    raise RenderTimeout(channel)
+        finally:
+            channel_lock.release()
+        self._count('completed')
+        return result
+
+    def close(self):
+        """Shut the process pool down without waiting for running renders."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """
+        Return the pool counters as a JSON-serialisable dict.
+
+        Returns:
+            dict: Workers, timeout, completed, superseded and timed-out
+            renders.
+        """
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'timeout': self.timeout,
+                'completed': self.completed,
+                'superseded': self.superseded,
+                'timeouts': self.timeouts,
+            }
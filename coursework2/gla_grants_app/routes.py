@@ -5,17 +5,20 @@ This module defines all the URL routes for the Flask application, including
 routes for landing, login, registration, dashboard, application submission,
 and administrative functions.
 """
-from flask import Blueprint, render_template, redirect, url_for, request, flash, session
+from flask import Blueprint, render_template, redirect, url_for, request, flash, session, jsonify, current_app, abort, send_file
 from werkzeug.security import generate_password_hash, check_password_hash
 from coursework2.gla_grants_app import db
 from coursework2.gla_grants_app.models import User, GrantApplication
-from coursework2.gla_grants_app.forms import ApplicationForm, LoginForm, RegistrationForm, PasswordChangeForm
+from coursework2.gla_grants_app.image_store import IMAGE_FORMATS
+from coursework2.gla_grants_app.forms import ApplicationForm, LoginForm, RegistrationForm, PasswordChangeForm, APPLICATION_CATEGORIES
+from coursework2.gla_grants_app.helpers import application_page, application_summary, apply_reviews, validate_reviews
+from coursework2.gla_grants_app.application_search import RANK_LIMIT, search_applications
 from sqlalchemy import func
+from sqlalchemy.orm.exc import StaleDataError
 import plotly.express as px
-import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 main = Blueprint('main', __name__)
 
@@ -29,6 +32,76 @@ def landing():
     """
     return render_template('landing.html')
 
+@main.route('/health')
+def health():
+    """
+    Liveness endpoint reporting the state of the dashboard dataset.
+    
+    The Flask routes are served as soon as the app is created, so this
+    always returns 200; the dataset state ('loading', 'ready' or 'error'),
+    the word cloud cache, render pool and callback cache counters are
+    included in the body.
+    
+    Returns:
+        Response: JSON with the overall status, dataset and cache details.
+    """
+    dataset = current_app.extensions.get('grants_dataset')
+    dataset_status = dataset.status() if dataset else None
+    wordcloud_cache = current_app.extensions.get('wordcloud_cache')
+    render_pool = current_app.extensions.get('render_pool')
+    callback_cache = current_app.extensions.get('callback_cache')
+    return jsonify(status='ok', dataset=dataset_status,
+                   wordcloud_cache=wordcloud_cache.stats() if wordcloud_cache else None,
+                   render_pool=render_pool.stats() if render_pool else None,
+                   callback_cache=callback_cache.stats() if callback_cache else None)
+
+@main.route('/health/ready')
+def health_ready():
+    """
+    Readiness endpoint for the dashboard dataset.
+    
+    With DASH_WARMUP enabled the app only becomes ready once the warmup has
+    also finished, and its progress is included under 'warmup'.
+    
+    Returns:
+        Response: JSON dataset status, with 200 once the dataset is loaded
+        (and warmed up) and 503 while it is loading or if loading failed.
+    """
+    dataset = current_app.extensions.get('grants_dataset')
+    if dataset is None:
+        return jsonify(ready=False, state='missing'), 503
+    dataset_status = dataset.status()
+    warmup = current_app.extensions.get('dashboard_warmup')
+    if warmup is not None and current_app.config.get('DASH_WARMUP', False):
+        dataset_status['warmup'] = warmup.status()
+        dataset_status['ready'] = dataset_status['ready'] and warmup.finished
+    return jsonify(dataset_status), 200 if dataset_status['ready'] else 503
+
+@main.route('/wordcloud/<digest>.<extension>')
+def wordcloud_image(digest, extension):
+    """
+    Serve a rendered word cloud image by the SHA-256 of its bytes.
+    
+    The content behind a URL never changes, so the digest is a strong ETag
+    and the browser may cache the image indefinitely.
+    
+    Args:
+        digest (str): SHA-256 hex digest of the image.
+        extension (str): Image format, e.g. 'png'.
+    
+    Returns:
+        Response: The image (or 304 Not Modified), 404 if it is not stored.
+    """
+    image_store = current_app.extensions.get('wordcloud_images')
+    path = image_store.path(digest, extension) if image_store else None
+    if path is None:
+        abort(404)
+    response = send_file(path, mimetype=IMAGE_FORMATS[extension][1], etag=digest,
+                         max_age=31536000, conditional=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @main.route('/login', methods=['GET', 'POST'])
 def login():
     """
@@ -171,7 +244,7 @@ def submit_application():
             description=form.description.data,
             category=form.category.data,
             question=form.question.data,
-            date_submitted=pd.Timestamp.now().strftime('%Y-%m-%d')
+            date_submitted=date.today()
         )
         
         db.session.add(application)
@@ -187,7 +260,14 @@ def admin_dashboard():
     """
     Admin dashboard route.
     
-    Displays all submitted applications for admin review.
+    Displays submitted applications for admin review, one page at a time,
+    optionally filtered by review status and category. The summary counts
+    come from a single aggregate query.
+    
+    Query parameters:
+        status: 'pending' or 'reviewed'.
+        category: Application category.
+        after / before: Id bounding the page (keyset pagination).
     
     Returns:
         str: Rendered HTML template for admin dashboard or redirect if not authorized.
@@ -200,8 +280,60 @@ def admin_dashboard():
         flash('You do not have permission to access this page', 'danger')
         return redirect(url_for('main.index'))
         
-    applications = db.session.execute(db.select(GrantApplication)).scalars().all()
-    return render_template('admin_dashboard.html', applications=applications)
+    status = request.args.get('status', 'all')
+    category = request.args.get('category') or None
+    applications, has_previous, has_next = application_page(
+        status=status,
+        category=category,
+        after=request.args.get('after', type=int),
+        before=request.args.get('before', type=int),
+        per_page=current_app.config.get('ADMIN_PAGE_SIZE', 20),
+    )
+    return render_template('admin_dashboard.html',
+                           applications=applications,
+                           summary=application_summary(),
+                           status=status,
+                           category=category,
+                           categories=APPLICATION_CATEGORIES,
+                           has_previous=has_previous,
+                           has_next=has_next)
+
+@main.route('/admin-search')
+def admin_search():
+    """
+    Admin full-text search over the submitted applications.
+    
+    Query parameters:
+        q: Words to search for in the title, description and question; the
+            last one may be incomplete.
+        page: 1-based results page.
+    
+    Only the newest ADMIN_SEARCH_RANK_LIMIT matches (default 5000) are
+    ranked, so common words stay fast; ``truncated`` is true when older
+    applications also matched and were left out, in which case a more
+    specific query finds them.
+    
+    Returns:
+        Response: JSON with the query, page, has_previous/has_next flags,
+        the truncated flag and the results, best matches first, each with a
+        highlighted snippet and the URL of the dashboard page showing the
+        application; 403 if the user is not an admin.
+    """
+    if not session.get('is_admin', False):
+        return jsonify(error='Admin access required'), 403
+    
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = current_app.config.get('ADMIN_PAGE_SIZE', 20)
+    rank_limit = current_app.config.get('ADMIN_SEARCH_RANK_LIMIT', RANK_LIMIT)
+    results, has_next, truncated = search_applications(query, page=page, per_page=per_page,
+                                                       rank_limit=rank_limit)
+    for result in results:
+        # The keyset page starting at the application, opened on it
+        result['url'] = url_for('main.admin_dashboard', after=result['id'] - 1, _anchor=f"heading{result['id']}")
+    return jsonify(query=query, page=page, per_page=per_page,
+                   has_previous=page > 1, has_next=has_next, truncated=truncated,
+                   rank_limit=rank_limit, results=results)
 
 @main.route('/admin-review/<int:application_id>', methods=['POST'])
 def admin_review(application_id):
@@ -222,12 +354,55 @@ def admin_review(application_id):
         
     application = db.get_or_404(GrantApplication, application_id)
     
+    # Blank feedback is stored as no feedback by GrantApplication.validate_comment
     application.comment = request.form.get('comment')
     db.session.commit()
     
     flash('Feedback submitted successfully!', 'success')
     return redirect(url_for('main.admin_dashboard'))
 
+@main.route('/admin-reviews', methods=['POST'])
+def admin_bulk_review():
+    """
+    Bulk admin review API.
+    
+    Stores the feedback on many applications at once, from a JSON body
+    ``{"reviews": [{"application_id": 1, "comment": "..."}, ...]}``. The
+    reviews are validated first and then applied in a single transaction:
+    either every comment is stored or none is. A null or empty comment
+    marks the application as pending again.
+    
+    Returns:
+        Response: JSON with the number of updated, reviewed and cleared
+        applications and the dashboard summary counts; 400 with per-review
+        errors if any review is invalid, 403 if the user is not an admin,
+        409 if an application was deleted meanwhile and 413 if the batch is
+        larger than ADMIN_BULK_REVIEW_LIMIT.
+    """
+    if not session.get('is_admin', False):
+        return jsonify(error='Admin access required'), 403
+    
+    data = request.get_json(silent=True)
+    reviews = data.get('reviews') if isinstance(data, dict) else None
+    if not isinstance(reviews, list):
+        return jsonify(error='Expected a JSON object with a "reviews" list'), 400
+    limit = current_app.config.get('ADMIN_BULK_REVIEW_LIMIT', 1000)
+    if len(reviews) > limit:
+        return jsonify(error=f'At most {limit} reviews can be sent at once'), 413
+    
+    updates, errors = validate_reviews(reviews)
+    if errors:
+        return jsonify(error='Invalid reviews; none were stored', errors=errors), 400
+    if updates:
+        try:
+            apply_reviews(updates)
+        except StaleDataError:
+            return jsonify(error='An application was deleted meanwhile; none were stored'), 409
+    
+    reviewed = sum(1 for u in updates if u['comment'] is not None)
+    return jsonify(updated=len(updates), reviewed=reviewed, cleared=len(updates) - reviewed,
+                   summary=application_summary())
+
 @main.route('/account', methods=['GET', 'POST'])
 def account():
     """
@@ -0,0 +1,138 @@
+"""
+Full-text index for the Grants Table search box.
+
+The table search matches a term against every cell of a row, stringified as
+``row.astype(str)`` would and compared with ``str.contains(term,
+case=False)``. TextSearchIndex stringifies each column once, keeps one copy
+of every distinct cell text, and maps each lowercased word to the texts that
+contain it. A plain search term then only needs to check the texts holding a
+word that contains the term's longest word, instead of every cell of every
+row. Terms using regular expression syntax are matched against the distinct
+texts.
+
+Candidates are always confirmed with the same case-insensitive regular
+expression the table used, so results are identical to scanning the rows.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+_WORD = re.compile(r'\w+')
+_REGEX_SYNTAX = set('.^$*+?{}[]\\|()')
+
+
+class TextSearchIndex:
+    """
+    Word index over the stringified cells of a DataFrame.
+
+    Attributes:
+        texts: Distinct cell texts.
+        cell_texts: Rows x columns array of positions in ``texts``; -1 for
+            missing cells.
+        postings: Lowercased word -> positions in ``texts`` containing it.
+        vocabulary: The words in ``postings``.
+        unindexed: Positions of non-ASCII texts, whose case-insensitive
+            matches the lowercased word index cannot vouch for; they are
+            always checked.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pandas.DataFrame): Frame whose rows are searched.
+        """
+        rows, columns = df.shape
+        stringified = pd.concat(
+            [df[column].astype(object).astype(str) for column in df.columns],
+            ignore_index=True)
+        codes, uniques = pd.factorize(stringified)
+        self.cell_texts = codes.astype(np.int32).reshape(columns, rows).T
+        self.texts = uniques.to_numpy(dtype=object)
+
+        postings = {}
+        unindexed = []
+        for position, text in enumerate(self.texts):
+            if not text.isascii():
+                unindexed.append(position)
+            for word in set(_WORD.findall(text.lower())):
+                postings.setdefault(word, []).append(position)
+        self.postings = {word: np.array(positions) for word, positions in postings.items()}
+        self.vocabulary = list(self.postings)
+        self.unindexed = np.array(unindexed, dtype=np.intp)
+
+    def _candidates(self, term):
+        """Return positions of texts that may match a plain ASCII term."""
+        words = _WORD.findall(term.lower())
+        if not words:
+            return np.arange(len(self.texts))
+        # Every match contains a word that contains the term's longest word.
+        longest = max(words, key=len)
+        postings = [self.postings[word] for word in self.vocabulary if longest in word]
+        return np.unique(np.concatenate(postings + [self.unindexed]))
+
+    def matching_texts(self, term):
+        """
+        Return a mask of the distinct texts matching a search term.
+
+        Args:
+            term (str): Search term, interpreted like ``str.contains(term,
+                case=False)``.
+
+        Returns:
+            numpy.ndarray: Boolean mask over ``texts``.
+        """
+        pattern = re.compile(term, re.IGNORECASE)
+        if term.isascii() and not _REGEX_SYNTAX.intersection(term):
+            candidates = self._candidates(term)
+        else:
+            candidates = np.arange(len(self.texts))
+        matched = np.zeros(len(self.texts), dtype=bool)
+        for position in candidates:
+            if pattern.search(self.texts[position]):
+                matched[position] = True
+        return matched
+
+    def positions(self, term):
+        """
+        Return the rows with at least one cell matching a search term.
+
+        Args:
+            term (str): Search term.
+
+        Returns:
+            numpy.ndarray: Ascending row positions.
+        """
+        # Trailing False slot for missing cells (code -1).
+        matched = np.append(self.matching_texts(term), False)
+        return np.flatnonzero(matched[self.cell_texts].any(axis=1))
+
+    def row_mask(self, term):
+        """
+        Return a boolean mask of the rows matching a search term.
+
+        Args:
+            term (str): Search term; falsy matches every row.
+
+        Returns:
+            numpy.ndarray: Boolean row mask.
+        """
+        mask = np.zeros(len(self.cell_texts), dtype=bool)
+        mask[self.positions(term) if term else slice(None)] = True
+        return mask
+
+    def filter(self, df, term):
+        """
+        Select the rows of ``df`` matching a search term.
+
+        Args:
+            df (pandas.DataFrame): The frame this index was built from.
+            term (str): Search term; falsy keeps every row.
+
+        Returns:
+            pandas.DataFrame: The matching rows (``df`` itself when there is
+            no term).
+        """
+        if not term:
+            return df
+        return df.iloc[self.positions(term)]
@@ -0,0 +1,239 @@
+"""
+Sentiment scoring engine for grant descriptions.
+
+The VADER lexicon is loaded once per process and reused for every text,
+instead of building a new SentimentIntensityAnalyzer per row. Descriptions
+are de-duplicated before scoring, and large inputs are split into batches
+that are scored in parallel on a process pool.
+
+Scores are also persisted in the ``sentiment_scores`` table, keyed by a hash
+of the description and the lexicon version, so restarts only score new or
+changed descriptions.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import nltk
+import pandas as pd
+from nltk.sentiment import SentimentIntensityAnalyzer
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from coursework2.gla_grants_app import db
+from coursework2.gla_grants_app.models import SentimentScore
+
+# Number of texts handed to a pool worker at a time.
+DEFAULT_BATCH_SIZE = 2000
+
+# Below this many distinct texts the pool start-up cost outweighs the gain.
+DEFAULT_PARALLEL_THRESHOLD = 20000
+
+# Keep IN (...) lists below SQLite's bound-parameter limit.
+_STORE_QUERY_CHUNK = 500
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+_lexicon_version = None
+
+
+def get_analyzer():
+    """
+    Return the process-wide SentimentIntensityAnalyzer.
+
+    The analyzer (and with it the VADER lexicon) is created on first use and
+    shared by every later call in the same process.
+
+    Returns:
+        SentimentIntensityAnalyzer: The shared analyzer instance.
+    """
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def lexicon_version():
+    """
+    Return a short identifier for the lexicon and scoring rules in use.
+
+    Derived from the VADER lexicon contents and the nltk release (which
+    holds the scoring rules), so stored scores are ignored after either
+    changes.
+
+    Returns:
+        str: 16-character hex identifier.
+    """
+    global _lexicon_version
+    if _lexicon_version is None:
+        lexicon = get_analyzer().lexicon_file
+        if not isinstance(lexicon, str):
+            lexicon = repr(sorted(get_analyzer().lexicon.items()))
+        digest = hashlib.sha256(f"{nltk.__version__}\n{lexicon}".encode('utf-8'))
+        _lexicon_version = digest.hexdigest()[:16]
+    return _lexicon_version
+
+
+def text_hash(text):
+    """
+    Return the store key for a description.
+
+    Args:
+        text (str): Description text.
+
+    Returns:
+        str: SHA-256 hex digest of the UTF-8 encoded text.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def score_text(text):
+    """
+    Score a single text.
+
+    Args:
+        text (str): The text to analyze.
+
+    Returns:
+        float: The compound sentiment score (-1 to 1) or 0 if text is invalid.
+    """
+    if isinstance(text, str):
+        return get_analyzer().polarity_scores(text)['compound']
+    return 0
+
+
+def score_batch(texts):
+    """
+    Score a batch of texts with the shared analyzer.
+
+    Args:
+        texts (list): Texts to analyze; non-string entries score 0.
+
+    Returns:
+        list: Compound scores in the same order as ``texts``.
+    """
+    analyzer = get_analyzer()
+    return [
+        analyzer.polarity_scores(text)['compound'] if isinstance(text, str) else 0
+        for text in texts
+    ]
+
+
+def _batches(items, batch_size):
+    """Yield consecutive slices of ``items`` of at most ``batch_size``."""
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def score_descriptions(descriptions, batch_size=DEFAULT_BATCH_SIZE,
+                       parallel_threshold=DEFAULT_PARALLEL_THRESHOLD,
+                       max_workers=None):
+    """
+    Score a column of descriptions.
+
+    Gives the same values as ``descriptions.apply(analyze_sentiment)``, but
+    each distinct text is scored only once and, when there are at least
+    ``parallel_threshold`` of them, batches are fanned out over a process
+    pool.
+
+    Args:
+        descriptions (pandas.Series): Texts to score.
+        batch_size (int, optional): Texts per pool task.
+        parallel_threshold (int, optional): Minimum number of distinct texts
+            before a process pool is used. Pass None to never use one.
+        max_workers (int, optional): Pool size. Defaults to the CPU count.
+
+    Returns:
+        pandas.Series: Compound scores aligned with ``descriptions``.
+    """
+    unique_texts = list(dict.fromkeys(
+        text if isinstance(text, str) else None for text in descriptions
+    ))
+    workers = max_workers or os.cpu_count() or 1
+    use_pool = (parallel_threshold is not None
+                and len(unique_texts) >= parallel_threshold
+                and workers > 1)
+
+    if use_pool:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scores = [
+                score
+                for batch_scores in pool.map(score_batch, _batches(unique_texts, batch_size))
+                for score in batch_scores
+            ]
+    else:
+        scores = score_batch(unique_texts)
+
+    lookup = dict(zip(unique_texts, scores))
+    return pd.Series(
+        [lookup[text if isinstance(text, str) else None] for text in descriptions],
+        index=descriptions.index,
+        dtype=float,
+    )
+
+
+def _load_stored_scores(hashes, version):
+    """Return {text_hash: score} for the hashes already in the store."""
+    stored = {}
+    for start in range(0, len(hashes), _STORE_QUERY_CHUNK):
+        chunk = hashes[start:start + _STORE_QUERY_CHUNK]
+        rows = db.session.execute(
+            db.select(SentimentScore.text_hash, SentimentScore.score).where(
+                SentimentScore.lexicon_version == version,
+                SentimentScore.text_hash.in_(chunk),
+            )
+        )
+        stored.update((row.text_hash, row.score) for row in rows)
+    return stored
+
+
+def score_descriptions_with_store(descriptions, **kwargs):
+    """
+    Score descriptions, reusing scores persisted in the database.
+
+    Only descriptions whose hash is not yet stored for the current lexicon
+    version are scored (with score_descriptions); their scores are then
+    saved. Must be called inside an application context. If the store
+    cannot be used, every description is scored.
+
+    Args:
+        descriptions (pandas.Series): Texts to score.
+        **kwargs: Passed on to score_descriptions.
+
+    Returns:
+        pandas.Series: Compound scores aligned with ``descriptions``.
+    """
+    texts = list(dict.fromkeys(text for text in descriptions if isinstance(text, str)))
+    hashes = {text: text_hash(text) for text in texts}
+    version = lexicon_version()
+
+    try:
+        stored = _load_stored_scores(list(hashes.values()), version)
+    except SQLAlchemyError as e:
+        print(f"Warning: sentiment score store unavailable, scoring all rows: {e}")
+        db.session.rollback()
+        return score_descriptions(descriptions, **kwargs)
+
+    missing = [text for text in texts if hashes[text] not in stored]
+    if missing:
+        new_scores = score_descriptions(pd.Series(missing), **kwargs)
+        rows = [
+            {'text_hash': hashes[text], 'lexicon_version': version, 'score': score}
+            for text, score in zip(missing, new_scores)
+        ]
+        try:
+            db.session.execute(sqlite_insert(SentimentScore).on_conflict_do_nothing(), rows)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            print(f"Warning: could not save sentiment scores: {e}")
+            db.session.rollback()
+        stored.update((row['text_hash'], row['score']) for row in rows)
+
+    return pd.Series(
+        [stored[hashes[text]] if isinstance(text, str) else 0 for text in descriptions],
+        index=descriptions.index,
+        dtype=float,
+    )
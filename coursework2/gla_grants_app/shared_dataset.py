@@ -0,0 +1,230 @@
+"""
+Memory-mapped grants dataset shared between worker processes.
+
+One process builds the dashboard DataFrame and publishes it to a directory
+as one ``.npy`` file per numeric, datetime or categorical column (codes for
+categoricals) plus a JSON manifest. Other workers attach to the published
+files with ``numpy.load(mmap_mode='r')``: those columns are backed by the
+shared page cache instead of private copies, and attaching needs no Excel
+parsing or sentiment scoring. String columns are stored once per distinct
+value and rebuilt from that list on attach, so each worker still holds its
+own copy of their Python strings.
+
+Only the DataFrame is shared: the structures derived from it (see
+GrantsDataset.add_derived) are rebuilt by every worker after attaching.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes.
+SHARED_FORMAT_VERSION = 1
+
+_MANIFEST = 'manifest.json'
+_LOCK_SUFFIX = '.lock'
+
+
+def _write_array(directory, name, array):
+    """Save an array as ``<name>.npy`` and return the file name."""
+    file_name = f"{name}.npy"
+    np.save(os.path.join(directory, file_name), np.ascontiguousarray(array))
+    return file_name
+
+
+def _publish_column(directory, position, series):
+    """Write one column and return its manifest entry."""
+    entry = {'name': series.name, 'dtype': str(series.dtype)}
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        entry['kind'] = 'categorical'
+        entry['codes'] = _write_array(directory, f"c{position}_codes", series.cat.codes.to_numpy())
+        entry['categories'] = series.cat.categories.tolist()
+        entry['categories_dtype'] = str(series.cat.categories.dtype)
+    elif dtype.kind in 'biufmM':
+        entry['kind'] = 'array'
+        entry['values'] = _write_array(directory, f"c{position}_values", series.to_numpy())
+    else:
+        # Strings and mixed objects: distinct values once, plus int32 codes.
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        values = [
+            value.item() if isinstance(value, np.generic) else value
+            for value in uniques.to_numpy(dtype=object)
+        ]
+        entry['kind'] = 'factorized'
+        entry['codes'] = _write_array(directory, f"c{position}_codes", codes.astype(np.int32))
+        entry['uniques'] = values
+    return entry
+
+
+def publish_frame(df, directory, key):
+    """
+    Publish a DataFrame so other processes can attach to it.
+
+    The files are written to a temporary directory that is renamed to
+    ``<directory>/<key>`` when complete, so readers never see a partial
+    dataset.
+
+    Args:
+        df (pandas.DataFrame): Frame to publish.
+        directory (str): Root directory for published datasets.
+        key (str): Identifier of this dataset version.
+
+    Returns:
+        str: Path of the published dataset directory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, key)
+    staging = tempfile.mkdtemp(dir=directory, prefix=f".{key}-")
+    try:
+        columns = [
+            _publish_column(staging, position, df[column])
+            for position, column in enumerate(df.columns)
+        ]
+        manifest = {
+            'format': SHARED_FORMAT_VERSION,
+            'key': key,
+            'rows': len(df),
+            'index': _write_array(staging, 'index', df.index.to_numpy()),
+            'columns': columns,
+        }
+        with open(os.path.join(staging, _MANIFEST), 'w') as f:
+            json.dump(manifest, f)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another process published the same key first.
+            shutil.rmtree(staging, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+
+def attach_frame(directory, key):
+    """
+    Attach to a published DataFrame.
+
+    Numeric, datetime and categorical columns are views over read-only
+    memory-mapped files.
+
+    Args:
+        directory (str): Root directory for published datasets.
+        key (str): Identifier of the dataset version.
+
+    Returns:
+        pandas.DataFrame: The attached frame, or None if ``key`` has not been
+        published.
+    """
+    root = os.path.join(directory, key)
+    try:
+        with open(os.path.join(root, _MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != SHARED_FORMAT_VERSION:
+        return None
+
+    def load(file_name):
+        # Plain ndarray view of the mapping, so pandas treats it like any
+        # other array while still sharing the mapped pages.
+        return np.load(os.path.join(root, file_name), mmap_mode='r').view(np.ndarray)
+
+    index = pd.Index(load(manifest['index']), copy=False)
+    data = {}
+    for entry in manifest['columns']:
+        if entry['kind'] == 'categorical':
+            categories = pd.Index(entry['categories'], dtype=entry['categories_dtype'])
+            values = pd.Categorical.from_codes(
+                load(entry['codes']), dtype=pd.CategoricalDtype(categories), validate=False)
+        elif entry['kind'] == 'array':
+            values = load(entry['values'])
+        else:
+            uniques = np.empty(len(entry['uniques']) + 1, dtype=object)
+            uniques[:-1] = entry['uniques']
+            uniques[-1] = np.nan
+            # Code -1 (missing) picks the trailing NaN.
+            values = pd.array(uniques[np.asarray(load(entry['codes']))], dtype=entry['dtype'])
+        data[entry['name']] = pd.Series(values, index=index, copy=False)
+    return pd.DataFrame(data, columns=[entry['name'] for entry in manifest['columns']], copy=False)
+
+
+def remove_stale(directory, keep_key):
+    """
+    Delete published datasets other than ``keep_key``.
+
+    Processes still attached to a removed dataset keep their mappings on
+    POSIX systems; failures (e.g. files in use on Windows) are ignored.
+
+    Args:
+        directory (str): Root directory for published datasets.
+        keep_key (str): Dataset version to keep.
+    """
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        in_progress = name.startswith('.') or name.endswith(_LOCK_SUFFIX)
+        if name != keep_key and not in_progress and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_or_publish(directory, key, build, timeout=120, poll_interval=0.2):
+    """
+    Attach to a published dataset, publishing it first if needed.
+
+    The first process to take the publish lock builds and publishes the
+    frame; processes that find the lock taken wait for the dataset to
+    appear. If it does not appear within ``timeout`` (e.g. the publisher
+    died) the lock is treated as stale and this process publishes.
+
+    Args:
+        directory (str): Root directory for published datasets.
+        key (str): Identifier of the dataset version.
+        build (callable): Function returning the DataFrame to publish.
+        timeout (float, optional): Seconds to wait for another publisher.
+        poll_interval (float, optional): Seconds between checks while
+            waiting.
+
+    Returns:
+        pandas.DataFrame: The attached (memory-mapped) frame.
+    """
+    df = attach_frame(directory, key)
+    if df is not None:
+        return df
+
+    os.makedirs(directory, exist_ok=True)
+    lock_path = os.path.join(directory, key + _LOCK_SUFFIX)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            df = attach_frame(directory, key)
+            if df is not None:
+                return df
+            if time.monotonic() >= deadline:
+                print(f"Warning: removing stale shared dataset lock {lock_path}")
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+                deadline = time.monotonic() + timeout
+            time.sleep(poll_interval)
+
+    try:
+        os.close(lock_fd)
+        df = attach_frame(directory, key)
+        if df is None:
+            publish_frame(build(), directory, key)
+            remove_stale(directory, key)
+            df = attach_frame(directory, key)
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+    return df
@@ -0,0 +1,78 @@
+"""
+SQLite performance profile applied to every database connection.
+
+With SQLite's default settings (a rollback journal, a full fsync per commit
+and no busy timeout) concurrent admin reviews and user submissions
+serialise on the journal, readers block writers, and a writer that finds
+the database locked fails at once with "database is locked".
+apply_sqlite_pragmas sets the pragmas of a profile, by default
+PERFORMANCE_PRAGMAS, on each connection the engine opens:
+
+- ``journal_mode=WAL``: readers and the writer no longer block each other,
+  and a commit appends to the write-ahead log instead of rewriting pages;
+- ``synchronous=NORMAL``: in WAL mode the log is only synced at
+  checkpoints, so a power loss may drop the last commits but cannot
+  corrupt the database;
+- ``busy_timeout``: a connection waits for a lock instead of failing;
+- ``cache_size`` and ``mmap_size``: a larger page cache, and reads through
+  a memory map of the database file.
+
+Only the journal mode is stored in the database file; the other pragmas
+hold per connection, hence the connect event.
+"""
+from sqlalchemy import event
+
+# Pragma name -> value set on every new connection.
+PERFORMANCE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds
+    'cache_size': -16384,  # negative sizes are in KiB: 16 MiB
+    'mmap_size': 134217728,  # bytes: 128 MiB
+}
+
+
+def apply_sqlite_pragmas(engine, pragmas=PERFORMANCE_PRAGMAS):
+    """
+    Set pragmas on every connection an SQLite engine opens from now on.
+
+    Must be called before the engine's first connection, as connections
+    already in its pool keep their settings.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine to configure.
+        pragmas (dict, optional): Pragma name -> value. Empty or None
+            leaves SQLite's defaults.
+
+    Returns:
+        bool: True if a listener was registered, False for other databases
+        or an empty profile.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return False
+    statements = [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return True
+
+
+def sqlite_pragmas(connection, names=PERFORMANCE_PRAGMAS):
+    """
+    Read the current value of pragmas on a connection.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): Open connection.
+        names (iterable, optional): Pragma names to read.
+
+    Returns:
+        dict: Pragma name -> value reported by SQLite.
+    """
+    return {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in names}
@@ -0,0 +1,211 @@
+"""
+Server-side paging, sorting and filtering for the Grants Table.
+
+With ``page_action``, ``sort_action`` and ``filter_action`` set to
+``"custom"`` the DataTable sends its page, sort and filter state to the
+server and only receives the rows of the current page. TableIndex holds the
+ascending and descending row order of every column, computed once per
+loaded dataset, and turns DataTable filter queries into vectorized row
+masks, so the work and payload per request do not depend on re-sorting or
+serialising the whole frame.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# DataTable filter operators, in the order they are tried. Longer symbols
+# come first so '>=' is not read as '>'.
+FILTER_OPERATORS = [
+    ('>=', 'ge'), ('<=', 'le'), ('!=', 'ne'), ('<', 'lt'), ('>', 'gt'), ('=', 'eq'),
+    ('ge ', 'ge'), ('le ', 'le'), ('lt ', 'lt'), ('gt ', 'gt'), ('ne ', 'ne'), ('eq ', 'eq'),
+    ('icontains ', 'icontains'), ('scontains ', 'contains'), ('contains ', 'contains'),
+    ('datestartswith ', 'datestartswith'), ('is blank', 'blank'),
+]
+
+_COLUMN = re.compile(r'^\{(?P<column>.+?)\}\s*(?P<rest>.*)$')
+_COMPARISONS = {
+    'eq': np.equal, 'ne': np.not_equal,
+    'lt': np.less, 'le': np.less_equal, 'gt': np.greater, 'ge': np.greater_equal,
+}
+
+
+def parse_filter_query(filter_query):
+    """
+    Split a DataTable filter query into conditions.
+
+    Args:
+        filter_query (str): Query such as
+            ``{Title} contains youth && {Amount_awarded} > 1000``.
+
+    Returns:
+        list: (column, operator, value) tuples. Parts that cannot be parsed
+        are skipped.
+    """
+    conditions = []
+    for part in (filter_query or '').split(' && '):
+        match = _COLUMN.match(part.strip())
+        if not match:
+            continue
+        column, rest = match.group('column'), match.group('rest')
+        for symbol, operator in FILTER_OPERATORS:
+            if rest.startswith(symbol):
+                value = rest[len(symbol):].strip()
+                if value[:1] in ('"', "'") and value[-1:] == value[:1] and len(value) > 1:
+                    value = value[1:-1].replace('\\' + value[0], value[0])
+                conditions.append((column, operator, value))
+                break
+    return conditions
+
+
+def _as_number(value):
+    """Return ``value`` as a float, or None if it is not numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _mixed_sort_key(value):
+    """Sort key for object columns: numbers, then text, then missing."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return (2, 0, '')
+    if isinstance(value, (int, float, np.number)):
+        return (0, float(value), '')
+    return (1, 0, str(value))
+
+
+def _row_orders(series):
+    """Return stable (ascending, descending) row orders, missing values last."""
+    try:
+        ranks = series.rank(method='dense', na_option='bottom').to_numpy(dtype=np.float64)
+    except TypeError:
+        keys = [_mixed_sort_key(value) for value in series.to_numpy(dtype=object)]
+        ranks = pd.Series(pd.factorize(pd.Series(keys), sort=True)[0]).to_numpy(dtype=np.float64)
+    missing = series.isna().to_numpy()
+    ascending = np.argsort(ranks, kind='stable').astype(np.int32)
+    # Negate ranks for descending order but keep missing values last.
+    descending = np.argsort(np.where(missing, np.inf, -ranks), kind='stable').astype(np.int32)
+    return ascending, descending
+
+
+class TableIndex:
+    """
+    Precomputed sort orders and filter evaluation for a DataFrame.
+
+    Attributes:
+        orders: Column -> {'asc': row order, 'desc': row order}.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pandas.DataFrame): Frame shown in the table.
+        """
+        self.rows = len(df)
+        self.orders = {}
+        for column in df.columns:
+            ascending, descending = _row_orders(df[column])
+            self.orders[column] = {'asc': ascending, 'desc': descending}
+
+    @staticmethod
+    def _values_mask(values, operator, value):
+        """Evaluate one condition over a Series of column values."""
+        dtype = values.dtype
+        if operator == 'blank':
+            return (values.isna() | (values.astype(object) == '')).to_numpy(dtype=bool)
+
+        if operator in ('contains', 'icontains', 'datestartswith'):
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                # Dates are sent to the table in ISO format.
+                text = values.dt.strftime('%Y-%m-%dT%H:%M:%S')
+            else:
+                text = values.astype(object).astype(str)
+            if operator == 'datestartswith':
+                result = text.str.startswith(value)
+            else:
+                result = text.str.contains(value, case=operator == 'contains', regex=False)
+            return result.to_numpy(dtype=bool, na_value=False)
+
+        compare = _COMPARISONS[operator]
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            try:
+                result = compare(values, pd.Timestamp(value))
+            except ValueError:
+                result = pd.Series(operator == 'ne', index=values.index)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            target = _as_number(value)
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            result = compare(numbers, np.nan if target is None else target)
+        else:
+            # Text and mixed columns compare as text, but '=' and '!=' also
+            # accept numerically equal values (1115303 = 1115303.0).
+            text = values.astype(object).astype(str)
+            if operator not in ('eq', 'ne'):
+                return compare(text, value).to_numpy(dtype=bool, na_value=False)
+            equal = (text == value).to_numpy(dtype=bool, na_value=False)
+            target = _as_number(value)
+            if target is not None:
+                equal = equal | (pd.to_numeric(values.astype(object), errors='coerce') == target).to_numpy()
+            return equal if operator == 'eq' else ~equal
+        return np.asarray(result, dtype=bool)
+
+    def condition_mask(self, df, column, operator, value):
+        """
+        Return the rows of ``df`` satisfying one filter condition.
+
+        Categorical columns are evaluated once per category.
+
+        Args:
+            df (pandas.DataFrame): The frame this index was built from.
+            column (str): Column name.
+            operator (str): Operator name from FILTER_OPERATORS.
+            value (str): Comparison value.
+
+        Returns:
+            numpy.ndarray: Boolean row mask; all True for unknown columns.
+        """
+        if column not in df.columns:
+            return np.ones(self.rows, dtype=bool)
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = pd.Series(values.cat.categories)
+            per_category = self._values_mask(categories, operator, value)
+            missing = self._values_mask(pd.Series([np.nan], dtype=object), operator, value)
+            return np.append(per_category, missing)[values.array.codes]
+        return self._values_mask(values, operator, value)
+
+    def page(self, df, mask=None, sort_by=None, filter_query=None, page_current=0, page_size=10):
+        """
+        Return one page of the filtered and sorted table.
+
+        Args:
+            df (pandas.DataFrame): The frame this index was built from.
+            mask (numpy.ndarray, optional): Rows to start from (e.g. the
+                search box matches); None for all rows.
+            sort_by (list, optional): DataTable ``sort_by`` entries; the first
+                one is used.
+            filter_query (str, optional): DataTable filter query.
+            page_current (int, optional): Zero-based page number; a page past
+                the last one returns the last page.
+            page_size (int, optional): Rows per page.
+
+        Returns:
+            tuple: (page DataFrame, number of matching rows, zero-based
+            number of the page returned).
+        """
+        selected = np.ones(self.rows, dtype=bool) if mask is None else mask.copy()
+        for column, operator, value in parse_filter_query(filter_query):
+            selected &= self.condition_mask(df, column, operator, value)
+
+        if sort_by and sort_by[0].get('column_id') in self.orders:
+            direction = 'desc' if sort_by[0].get('direction') == 'desc' else 'asc'
+            order = self.orders[sort_by[0]['column_id']][direction]
+            positions = order[selected[order]]
+        else:
+            positions = np.flatnonzero(selected)
+
+        last_page = max(0, (len(positions) - 1) // page_size)
+        page_current = min(page_current or 0, last_page)
+        start = page_current * page_size
+        return df.iloc[positions[start:start + page_size]], len(positions), page_current
@@ -0,0 +1,88 @@
+"""
+Materialized timeline series for the dashboard's timeline charts.
+
+TimelineSeries is built once per loaded dataset. It holds the total amount
+awarded per year, quarter, month and week (empty periods included, as with
+``pd.Grouper``) and, per department, the amount awarded on each award date.
+The timeline callbacks only pick a series and build the figure.
+"""
+import numpy as np
+import pandas as pd
+
+# Dashboard aggregation value -> pandas period-end frequency.
+GRANULARITY_FREQUENCIES = {'Y': 'YE', 'Q': 'QE', 'M': 'ME', 'W': 'W'}
+
+
+def _series_arrays(series):
+    """Return a (times, amounts) pair of plain arrays for a summed series."""
+    return series.index.to_numpy(), series.to_numpy(dtype=np.float64)
+
+
+class TimelineSeries:
+    """
+    Precomputed amount-awarded series of a grants DataFrame.
+
+    Attributes:
+        first_date: Earliest award date, or None if no grant is dated.
+        last_date: Latest award date, or None if no grant is dated.
+        periods: Granularity ('Y', 'Q', 'M', 'W') -> (period end dates,
+            amounts).
+        departments: Department -> (award dates, amounts).
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pandas.DataFrame): Grants frame with Award_Date,
+                Amount_awarded and Funding_Org:Department columns.
+        """
+        dated = df.loc[df['Award_Date'].notna(), ['Award_Date', 'Amount_awarded', 'Funding_Org:Department']]
+        dated = dated.assign(Award_Date=pd.to_datetime(dated['Award_Date']))
+        self.first_date = dated['Award_Date'].min() if len(dated) else None
+        self.last_date = dated['Award_Date'].max() if len(dated) else None
+
+        self.periods = {}
+        for granularity, freq in GRANULARITY_FREQUENCIES.items():
+            summed = dated.groupby(pd.Grouper(key='Award_Date', freq=freq))['Amount_awarded'].sum()
+            self.periods[granularity] = _series_arrays(summed)
+
+        by_date = dated.groupby(
+            ['Funding_Org:Department', 'Award_Date'], observed=True
+        )['Amount_awarded'].sum()
+        self.departments = {
+            str(department): _series_arrays(amounts.droplevel(0))
+            for department, amounts in by_date.groupby(level=0, observed=True)
+        }
+
+    @property
+    def date_range_days(self):
+        """int: Days between the first and last award date (0 if undated)."""
+        if self.first_date is None:
+            return 0
+        return (self.last_date - self.first_date).days
+
+    def period_totals(self, granularity):
+        """
+        Return the amount awarded per period.
+
+        Args:
+            granularity (str): 'Y', 'Q', 'M' or 'W'.
+
+        Returns:
+            tuple: (period end dates, amounts) as numpy arrays.
+        """
+        return self.periods[granularity]
+
+    def department_totals(self, department):
+        """
+        Return the amount awarded per award date for one department.
+
+        Args:
+            department (str): Department name.
+
+        Returns:
+            tuple: (award dates, amounts) as numpy arrays; empty if the
+            department has no dated grants.
+        """
+        empty = (np.array([], dtype='datetime64[ns]'), np.array([], dtype=np.float64))
+        return self.departments.get(department, empty)
@@ -0,0 +1,49 @@
+"""
+Ranked grant totals for the top-N sunburst.
+
+The sunburst callback grouped every grant by title and department and took
+``nlargest(top_n)`` on each slider move. TopGrants groups and sorts once per
+loaded dataset; the top N for any N is then a prefix of the ranking, so
+moving the slider no longer depends on the number of distinct titles.
+"""
+from coursework2.gla_grants_app.compact import decode_categoricals
+
+
+class TopGrants:
+    """
+    Amount awarded per (title, department), largest first.
+
+    Attributes:
+        ranked: Title, Funding_Org:Department and Amount_awarded columns,
+            with categoricals decoded for plotly express.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pandas.DataFrame): Frame with Title, Funding_Org:Department
+                and Amount_awarded columns.
+        """
+        aggregated = df.groupby(
+            ['Title', 'Funding_Org:Department'],
+            as_index=False,
+            observed=True
+        )['Amount_awarded'].sum()
+        # A stable descending sort keeps equal amounts in the order
+        # nlargest(keep='first') picks them.
+        self.ranked = decode_categoricals(
+            aggregated.sort_values('Amount_awarded', ascending=False, kind='stable'))
+
+    def top(self, n):
+        """
+        Return the ``n`` largest totals.
+
+        Equal to ``nlargest(n, 'Amount_awarded')`` of the grouped frame.
+
+        Args:
+            n (int): Number of rows.
+
+        Returns:
+            pandas.DataFrame: The first ``n`` rows of ``ranked``.
+        """
+        return self.ranked.iloc[:max(n, 0)]
@@ -0,0 +1,128 @@
+"""
+Background warming of the dashboard's caches after startup.
+
+After a deploy the first visitors used to pay for every cold callback: the
+default year range, each timeline aggregation, the default sunburst and the
+all-department word cloud. Warmup runs those states through the same
+memoized callbacks and caches once the dataset is loaded, on a daemon
+thread, and reports its progress so the readiness endpoint can hold traffic
+back until the caches are warm.
+"""
+import threading
+import time
+
+
+class Warmup:
+    """
+    Runs warmup steps in the background and records their progress.
+
+    Attributes:
+        state: One of 'idle', 'waiting' (for the dataset), 'running', 'done'
+            or 'error' (the dataset failed to load).
+        total: Number of steps, known once the dataset is loaded.
+        completed: Steps finished so far, including failed ones.
+        failed: Labels of the steps that raised.
+        current: Label of the running step.
+    """
+
+    def __init__(self, build_steps):
+        """
+        Args:
+            build_steps (callable): Function called once the dataset is
+                loaded, returning (label, callable) steps.
+        """
+        self._build_steps = build_steps
+        self._thread = None
+        self.state = 'idle'
+        self.total = None
+        self.completed = 0
+        self.failed = []
+        self.current = None
+        self.error = None
+        self.seconds = None
+
+    @property
+    def finished(self):
+        """bool: True once warmup has completed or given up."""
+        return self.state in ('done', 'error')
+
+    def run(self, app, dataset):
+        """
+        Wait for the dataset, then run every step synchronously.
+
+        Steps run inside a test request context of ``app``, as callbacks
+        expect a request (e.g. for ``url_for`` or the session). A failing
+        step is reported and skipped.
+
+        Args:
+            app (Flask): The Flask application.
+            dataset (GrantsDataset): Dataset the steps depend on.
+        """
+        self.state = 'waiting'
+        while not dataset.wait(0.5):
+            if dataset.error:
+                self.error = dataset.error
+                self.state = 'error'
+                return
+        start = time.perf_counter()
+        steps = self._build_steps()
+        self.total = len(steps)
+        self.state = 'running'
+        with app.test_request_context('/dash/'):
+            for label, step in steps:
+                self.current = label
+                try:
+                    step()
+                except Exception as e:
+                    print(f"Warning: dashboard warmup step {label} failed: {e!r}")
+                    self.failed.append(label)
+                self.completed += 1
+        self.current = None
+        self.seconds = round(time.perf_counter() - start, 3)
+        self.state = 'done'
+
+    def start(self, app, dataset):
+        """
+        Start warming up on a daemon thread.
+
+        Args:
+            app (Flask): The Flask application.
+            dataset (GrantsDataset): Dataset the steps depend on.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self.run, args=(app, dataset), name='dashboard-warmup', daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Block until the warmup thread has finished.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: True if warmup has finished.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished
+
+    def status(self):
+        """
+        Return the warmup progress as a JSON-serialisable dict.
+
+        Returns:
+            dict: State, step counts, failed steps, current step and
+            duration.
+        """
+        return {
+            'state': self.state,
+            'total': self.total,
+            'completed': self.completed,
+            'failed': list(self.failed),
+            'current': self.current,
+            'seconds': self.seconds,
+            'error': self.error,
+        }
@@ -0,0 +1,214 @@
+"""
+Precomputed word and bigram frequency tables for the dashboard word cloud.
+
+WordCloud.generate() re-tokenises the joined titles, drops stopwords, merges
+case variants and plurals and detects collocations on every call.
+TitleFrequencies tokenises the titles once per loaded dataset, with the same
+regexp, stopwords and minimum word length, and keeps per department the
+count and first position of every word and bigram spelling. A department
+selection merges those tables and replays WordCloud's case, plural and
+collocation rules on the merged counts, giving exactly the frequencies
+WordCloud.process_text() would return for the joined titles; the image is
+then drawn with generate_from_frequencies().
+
+Bigrams that span two consecutive titles (WordCloud sees one joined string)
+depend on which titles are selected, so they are counted per selection from
+per-title first and last words, with numpy.
+"""
+import re
+from collections import defaultdict
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from wordcloud import STOPWORDS
+from wordcloud.tokenization import score
+
+# Word cloud settings shared by tokenisation and rendering.
+WORDCLOUD_STOPWORDS = set(['to', 'the', 'and', 'for', 'of', 'in', 'on', 'with', 'a',
+                           'an', 'as', 'at', 'by', 'from', 'that', 'which', 'this',
+                           'be', 'grant', 'Grant']) | STOPWORDS
+WORDCLOUD_REGEXP = r"[a-zA-Z#&]+"
+WORDCLOUD_MIN_WORD_LENGTH = 4
+COLLOCATION_THRESHOLD = 30
+
+# Positions are row * _ROW_STRIDE + word index within the title.
+_ROW_STRIDE = 1 << 20
+
+
+def _fuse_cases(forms):
+    """
+    Merge case variants and plurals like wordcloud's process_tokens.
+
+    Args:
+        forms (list): (spelling, count) pairs in order of first appearance.
+
+    Returns:
+        tuple: (counts by most common spelling, standard spelling by
+        lowercased word), as process_tokens returns.
+    """
+    d = defaultdict(dict)
+    for word, count in forms:
+        case_dict = d[word.lower()]
+        case_dict[word] = case_dict.get(word, 0) + count
+    merged_plurals = {}
+    for key in list(d.keys()):
+        if key.endswith('s') and not key.endswith("ss"):
+            key_singular = key[:-1]
+            if key_singular in d:
+                dict_singular = d[key_singular]
+                for word, count in d[key].items():
+                    singular = word[:-1]
+                    dict_singular[singular] = dict_singular.get(singular, 0) + count
+                merged_plurals[key] = key_singular
+                del d[key]
+    fused_cases = {}
+    standard_cases = {}
+    for word_lower, case_dict in d.items():
+        first = max(case_dict.items(), key=itemgetter(1))[0]
+        fused_cases[first] = sum(case_dict.values())
+        standard_cases[word_lower] = first
+    for plural, singular in merged_plurals.items():
+        standard_cases[plural] = standard_cases[singular.lower()]
+    return fused_cases, standard_cases
+
+
+def _ordered(table):
+    """Return (spelling, count) pairs of a {spelling: [count, first]} table by first position."""
+    return [(form, entry[0]) for form, entry in sorted(table.items(), key=lambda item: item[1][1])]
+
+
+def _merge_into(target, table):
+    """Add a {spelling: [count, first]} table into ``target``."""
+    for form, (count, first) in table.items():
+        entry = target.get(form)
+        if entry is None:
+            target[form] = [count, first]
+        else:
+            entry[0] += count
+            entry[1] = min(entry[1], first)
+
+
+class TitleFrequencies:
+    """
+    Per-department word and bigram tables of the grant titles.
+
+    Attributes:
+        departments: Department name -> slot; rows without a department use
+            slot -1.
+        unigrams: Slot -> {spelling: [count, first position]} of non-stopwords.
+        bigrams: Slot -> {"word1 word2": [count, first position]} of
+            adjacent non-stopwords within a title.
+        row_slots, first_words, last_words, last_positions: Per title row
+            (rows with at least one word), used for bigrams across titles.
+        words: Spellings referenced by ``first_words`` / ``last_words``.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pandas.DataFrame): Frame with Title and Funding_Org:Department
+                columns.
+        """
+        stopwords = {word.lower() for word in WORDCLOUD_STOPWORDS}
+        pattern = re.compile(WORDCLOUD_REGEXP)
+        codes, names = pd.factorize(df['Funding_Org:Department'])
+        self.departments = {str(name): slot for slot, name in enumerate(names)}
+        self.unigrams = defaultdict(dict)
+        self.bigrams = defaultdict(dict)
+
+        word_ids = {}
+        title_rows, first_words, last_words, last_positions = [], [], [], []
+        for row, (title, slot) in enumerate(zip(df['Title'].to_numpy(dtype=object), codes)):
+            if not isinstance(title, str):
+                continue
+            words = [word for word in pattern.findall(title)
+                     if len(word) >= WORDCLOUD_MIN_WORD_LENGTH]
+            if not words:
+                continue
+            unigrams, bigrams = self.unigrams[slot], self.bigrams[slot]
+            base = row * _ROW_STRIDE
+            for index, word in enumerate(words):
+                if word.lower() in stopwords:
+                    continue
+                entry = unigrams.setdefault(word, [0, base + index])
+                entry[0] += 1
+                if index + 1 < len(words) and words[index + 1].lower() not in stopwords:
+                    entry = bigrams.setdefault(f"{word} {words[index + 1]}", [0, base + index])
+                    entry[0] += 1
+            title_rows.append(row)
+            first_words.append(word_ids.setdefault(words[0], len(word_ids)))
+            last_words.append(word_ids.setdefault(words[-1], len(word_ids)))
+            last_positions.append(base + len(words) - 1)
+
+        self.words = list(word_ids)
+        self.stopword_ids = np.array([word.lower() in stopwords for word in self.words], dtype=bool)
+        self.title_rows = np.array(title_rows, dtype=np.int64)
+        self.row_slots = codes[self.title_rows] if len(title_rows) else np.array([], dtype=np.int64)
+        self.first_words = np.array(first_words, dtype=np.int64)
+        self.last_words = np.array(last_words, dtype=np.int64)
+        self.last_positions = np.array(last_positions, dtype=np.int64)
+
+    def _slots(self, departments):
+        """Return the department slots for a selection; None means all."""
+        if not departments:
+            return None
+        return [self.departments[name] for name in departments if name in self.departments]
+
+    def _cross_title_bigrams(self, slots):
+        """Count bigrams formed by the last word of a title and the first of the next."""
+        if slots is None:
+            selected = np.ones(len(self.title_rows), dtype=bool)
+        else:
+            selected = np.isin(self.row_slots, slots)
+        last_words = self.last_words[selected][:-1]
+        first_words = self.first_words[selected][1:]
+        positions = self.last_positions[selected][:-1]
+        kept = ~(self.stopword_ids[last_words] | self.stopword_ids[first_words])
+        pairs = last_words[kept] * len(self.words) + first_words[kept]
+        unique_pairs, first_index, counts = np.unique(pairs, return_index=True, return_counts=True)
+        firsts = positions[kept][first_index]
+        return {
+            f"{self.words[pair // len(self.words)]} {self.words[pair % len(self.words)]}": [int(count), int(first)]
+            for pair, count, first in zip(unique_pairs, counts, firsts)
+        }
+
+    def frequencies(self, departments=None):
+        """
+        Return the word cloud frequencies for a department selection.
+
+        Equal to ``WordCloud(...).process_text(' '.join(titles))`` for the
+        selected rows' titles with the dashboard's word cloud settings.
+
+        Args:
+            departments (list, optional): Department names; falsy selects
+                every title.
+
+        Returns:
+            dict: Word or collocation -> frequency.
+        """
+        slots = self._slots(departments)
+        selected_slots = list(self.unigrams) if slots is None else slots
+        unigram_table, bigram_table = {}, {}
+        for slot in selected_slots:
+            _merge_into(unigram_table, self.unigrams.get(slot, {}))
+            _merge_into(bigram_table, self.bigrams.get(slot, {}))
+        _merge_into(bigram_table, self._cross_title_bigrams(slots))
+
+        ordered_unigrams = _ordered(unigram_table)
+        n_words = sum(count for _, count in ordered_unigrams)
+        counts_unigrams, standard_form = _fuse_cases(ordered_unigrams)
+        counts_bigrams, _ = _fuse_cases(_ordered(bigram_table))
+        orig_counts = counts_unigrams.copy()
+
+        # Include bigrams that are also collocations, as WordCloud does
+        for bigram_string, count in counts_bigrams.items():
+            first, second = bigram_string.split(" ")
+            word1 = standard_form[first.lower()]
+            word2 = standard_form[second.lower()]
+            collocation_score = score(count, orig_counts[word1], orig_counts[word2], n_words)
+            if collocation_score > COLLOCATION_THRESHOLD:
+                counts_unigrams[word1] -= count
+                counts_unigrams[word2] -= count
+                counts_unigrams[bigram_string] = count
+        return {word: count for word, count in counts_unigrams.items() if count > 0}
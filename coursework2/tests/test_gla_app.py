@@ -7,14 +7,34 @@ It also includes browser-based integration tests using Selenium WebDriver.
 """
 import pytest
 import os
-from datetime import datetime
+import re
+import copy
+import json
+import hashlib
+import sqlite3
+import pandas as pd
+from datetime import date, datetime
 import uuid
 import time
 import threading
 from werkzeug.security import generate_password_hash
 from werkzeug.serving import make_server
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 from coursework2.gla_grants_app import create_app, db
-from coursework2.gla_grants_app.models import User, GrantApplication
+from coursework2.gla_grants_app.models import User, GrantApplication, SentimentScore
+from coursework2.gla_grants_app.helpers import application_page
+from coursework2.gla_grants_app.migrations import SCHEMA_VERSION, SchemaUpgradeError, upgrade_schema
+from coursework2.gla_grants_app.sqlite_profile import PERFORMANCE_PRAGMAS, apply_sqlite_pragmas, sqlite_pragmas
+from coursework2.gla_grants_app.caching import SQLiteCache
+from coursework2.gla_grants_app.compact import memory_report
+from coursework2.gla_grants_app.image_store import ImageStore
+from coursework2.gla_grants_app.memoize import CallbackMemo
+from coursework2.gla_grants_app.dash_app import make_wordcloud
+from coursework2.gla_grants_app.data_cache import load_cached_frame, cache_path_for
+from coursework2.gla_grants_app import application_search, data_cache, sentiment
+from coursework2.gla_grants_app.sentiment import score_descriptions
+from coursework2.gla_grants_app.render_pool import RenderPool, RenderSuperseded, RenderTimeout
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -22,7 +42,18 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 @pytest.fixture(scope="session")
-def app():
+def data_cache_dir(tmp_path_factory):
+    """
+    Create the workbook cache directory shared by the apps of the session.
+    
+    Returns:
+        str: Temporary directory, so no cache is written to the checkout.
+    """
+    return str(tmp_path_factory.mktemp('data_cache'))
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory, data_cache_dir):
     """
     Create a Flask app instance for the entire test session.
     
@@ -33,6 +64,8 @@ def app():
         'TESTING': True,
         'WTF_CSRF_ENABLED': False,
         'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'WORDCLOUD_IMAGE_DIR': str(tmp_path_factory.mktemp('wordclouds')),
+        'DATA_CACHE_DIR': data_cache_dir,
     })
     
     with test_app.app_context():
@@ -223,6 +256,36 @@ def flask_server(app):
     server.shutdown()
     server_thread.join()
 
+def dash_callback(client, outputs, inputs, state=None):
+    """
+    Invoke a Dash callback through the test client.
+    
+    Args:
+        client (FlaskClient): Flask test client.
+        outputs (list): (component_id, property) pairs of the callback outputs.
+        inputs (list): (component_id, property, value) triples for the inputs.
+        state (list, optional): (component_id, property, value) triples.
+        
+    Returns:
+        dict: The callback response, keyed by component id.
+    """
+    output_specs = [{'id': cid, 'property': prop} for cid, prop in outputs]
+    multi = len(outputs) > 1
+    payload = {
+        'output': '..' + '...'.join(f'{cid}.{prop}' for cid, prop in outputs) + '..'
+        if multi else f'{outputs[0][0]}.{outputs[0][1]}',
+        'outputs': output_specs if multi else output_specs[0],
+        'inputs': [{'id': cid, 'property': prop, 'value': value} for cid, prop, value in inputs],
+        'state': [{'id': cid, 'property': prop, 'value': value} for cid, prop, value in (state or [])],
+        'changedPropIds': [f'{cid}.{prop}' for cid, prop, _ in inputs],
+    }
+    response = client.post('/dash/_dash-update-component', json=payload)
+    if response.status_code == 204:
+        return None
+    assert response.status_code == 200, response.data
+    return response.get_json()['response']
+
+
 def test_landing_page(client):
     """
     Test the landing page.
@@ -426,7 +489,7 @@ def test_admin_review(client, logged_in_admin, db_session):
         description='Application description',
         category='Community',
         question='Application question',
-        date_submitted=datetime.now().strftime('%Y-%m-%d')
+        date_submitted=date.today()
     )
     db_session.add(test_application)
     db_session.commit()
@@ -513,6 +576,1268 @@ def test_404_error(client):
     assert response.status_code == 404
 
 
+
+def test_data_cache_round_trip_and_invalidation(tmp_path, monkeypatch):
+    """
+    Test the columnar cache used by process_data.
+    
+    GIVEN a source file and a build function
+    WHEN the frame is loaded twice and the source content then changes
+    THEN check that the second load is served from the cache with identical
+    values, a content change triggers a rebuild, and a failed write leaves
+    no temporary file behind
+    """
+    import pandas as pd
+    source = tmp_path / 'grants.csv'
+    source.write_text("Title,Amount_awarded,Number\nA,1.5,1\nB,2.25,x\nC,,\n")
+    calls = []
+
+    def build(path):
+        calls.append(path)
+        return pd.read_csv(path, dtype={'Number': object})
+
+    first = load_cached_frame(str(source), build, cache_dir=str(tmp_path))
+    second = load_cached_frame(str(source), build, cache_dir=str(tmp_path))
+    assert len(calls) == 1
+    assert os.path.exists(cache_path_for(str(source), str(tmp_path)))
+    pd.testing.assert_frame_equal(first, second)
+
+    # Touching the file without changing content keeps the cache
+    os.utime(source, ns=(0, 0))
+    load_cached_frame(str(source), build, cache_dir=str(tmp_path))
+    assert len(calls) == 1
+
+    source.write_text("Title,Amount_awarded,Number\nD,3.0,2\n")
+    third = load_cached_frame(str(source), build, cache_dir=str(tmp_path))
+    assert len(calls) == 2
+    assert third['Title'].tolist() == ['D']
+
+    # A failed write leaves neither an archive nor its temporary file
+    def fail(*args, **kwargs):
+        raise ValueError('disk full')
+    monkeypatch.setattr(data_cache.np, 'savez', fail)
+    assert not data_cache.write_frame_cache(third, str(tmp_path / 'failed.cache.npz'), {})
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    assert not os.path.exists(tmp_path / 'failed.cache.npz')
+
+
+def test_sentiment_engine_matches_per_row_scores():
+    """
+    Test the batched sentiment engine against per-row scoring.
+    
+    GIVEN descriptions including duplicates and missing values
+    WHEN they are scored serially and through the process pool
+    THEN check that both match a fresh analyzer per row
+    """
+    import pandas as pd
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    descriptions = pd.Series(
+        ['A wonderful community project', None, 'Terrible delays', 'A wonderful community project', 42],
+        index=[10, 3, 7, 1, 5]
+    )
+    expected = [
+        SentimentIntensityAnalyzer().polarity_scores(text)['compound'] if isinstance(text, str) else 0
+        for text in descriptions
+    ]
+    
+    serial = score_descriptions(descriptions)
+    pooled = score_descriptions(descriptions, batch_size=2, parallel_threshold=0, max_workers=2)
+    
+    assert serial.tolist() == expected
+    assert pooled.tolist() == expected
+    assert serial.index.tolist() == [10, 3, 7, 1, 5]
+
+
+def test_sentiment_store_only_scores_new_descriptions(app, monkeypatch):
+    """
+    Test the persistent sentiment score store.
+    
+    GIVEN descriptions whose scores were stored by an earlier load
+    WHEN the descriptions are scored again with one new description added
+    THEN check that only the new description is scored and all are stored
+    """
+    import pandas as pd
+    first_text = f'Excellent youth programme {uuid.uuid4().hex}'
+    second_text = f'Disappointing outcome {uuid.uuid4().hex}'
+    
+    with app.app_context():
+        first = sentiment.score_descriptions_with_store(pd.Series([first_text, None]))
+        
+        scored = []
+        original = sentiment.score_descriptions
+        
+        def recording_score(descriptions, **kwargs):
+            scored.extend(descriptions)
+            return original(descriptions, **kwargs)
+        
+        monkeypatch.setattr(sentiment, 'score_descriptions', recording_score)
+        second = sentiment.score_descriptions_with_store(pd.Series([first_text, second_text]))
+        
+        assert scored == [second_text]
+        assert second.iloc[0] == first.iloc[0]
+        assert first.iloc[1] == 0
+        stored = db.session.get(
+            SentimentScore, (sentiment.text_hash(second_text), sentiment.lexicon_version()))
+        assert stored.score == second.iloc[1]
+
+
+def test_lazy_dataset_loading(monkeypatch, tmp_path, data_cache_dir):
+    """
+    Test background loading of the dashboard dataset.
+    
+    GIVEN an app created with DASH_LAZY_LOAD and a dataset load in progress
+    WHEN Flask routes, the health endpoints and the Dash layout are requested
+    THEN check that routes work immediately, readiness is reported as 503
+    with a loading page, and the full dashboard is served once loaded
+    """
+    from coursework2.gla_grants_app import dash_app
+    release = threading.Event()
+    original_loader = dash_app.load_dashboard_data
+    
+    def blocking_loader(server):
+        release.wait(30)
+        return original_loader(server)
+    
+    monkeypatch.setattr(dash_app, 'load_dashboard_data', blocking_loader)
+    lazy_app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'WORDCLOUD_IMAGE_DIR': str(tmp_path / 'wordclouds'),
+        'DATA_CACHE_DIR': data_cache_dir,
+        'DASH_LAZY_LOAD': True,
+    })
+    lazy_client = lazy_app.test_client()
+    
+    assert lazy_client.get('/login').status_code == 200
+    response = lazy_client.get('/health/ready')
+    assert response.status_code == 503
+    assert response.get_json()['state'] == 'loading'
+    assert lazy_client.get('/health').get_json()['dataset']['ready'] is False
+    loading = lazy_client.get('/dash/_dash-layout')
+    assert b'dataset-loading-poll' in loading.data
+    assert loading.headers['Cache-Control'] == 'no-store'
+    
+    release.set()
+    assert lazy_app.extensions['grants_dataset'].wait(60)
+    
+    response = lazy_client.get('/health/ready')
+    assert response.status_code == 200
+    assert response.get_json()['rows'] > 0
+    assert b'department-table' in lazy_client.get('/dash/_dash-layout').data
+
+
+def test_compact_dtypes_give_identical_callback_results(app, client, tmp_path, data_cache_dir):
+    """
+    Test that the compact DataFrame representation does not change results.
+    
+    GIVEN the default app (compact dtypes) and one with compaction disabled
+    WHEN the dashboard callbacks are invoked with the same inputs
+    THEN check that every callback response is identical
+    """
+    dataset = app.extensions['grants_dataset']
+    assert isinstance(dataset.df['Funding_Org:Department'].dtype, pd.CategoricalDtype)
+    
+    plain_app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'WORDCLOUD_IMAGE_DIR': str(tmp_path / 'wordclouds'),
+        'DATA_CACHE_DIR': data_cache_dir,
+        'DASH_COMPACT_DTYPES': False,
+    })
+    plain_client = plain_app.test_client()
+    department = dataset.df['Funding_Org:Department'].iloc[0]
+    
+    cases = [
+        ([('total-value', 'children'), ('total-number', 'children')],
+         [('department-year-slider', 'value', [2016, 2019])]),
+        ([('department-pie-chart', 'figure'), ('department-duration-chart', 'figure'),
+          ('department-charts-shown', 'data')],
+         [('department-year-slider', 'value', [2015, 2021]),
+          ('department-pie-chart', 'clickData', {'points': [{'label': department}]})]),
+        ([('interactive-timeline', 'figure'), ('interactive-timeline-shown', 'data')],
+         [('department-selector', 'value', department)]),
+        ([('timeline-chart', 'figure')], [('timeline-aggregation', 'value', 'Q')]),
+        ([('top-grants-sunburst', 'figure')], [('top-n-slider', 'value', 8)]),
+        ([('department-table', 'data'), ('department-table', 'page_count'),
+          ('department-table', 'page_current')],
+         [('table-search', 'value', 'youth'), ('department-table', 'page_current', 1),
+          ('department-table', 'page_size', 10),
+          ('department-table', 'sort_by', [{'column_id': 'Funding_Org:Department', 'direction': 'asc'}]),
+          ('department-table', 'filter_query', '{Funding_Org:Department} contains Comm')]),
+    ]
+    
+    def figures(response):
+        # The records of shown figures hold each app's dataset version
+        return {cid: value for cid, value in response.items() if not cid.endswith('-shown')}
+    
+    for outputs, inputs in cases:
+        # First render: no figure shown yet
+        state = [(cid, 'data', None) for cid, _ in outputs if cid.endswith('-shown')]
+        assert figures(dash_callback(client, outputs, inputs, state)) == \
+            figures(dash_callback(plain_client, outputs, inputs, state))
+    
+    report = memory_report(plain_app.extensions['grants_dataset'].df, dataset.df)
+    assert report.loc['Funding_Org:Department', 'dtype_after'] == 'category'
+    assert report.loc['Total', 'bytes_after'] < report.loc['Total', 'bytes_before']
+
+def test_shared_dataset_publish_and_attach(tmp_path):
+    """
+    Test sharing the dashboard DataFrame between worker processes.
+    
+    GIVEN a frame with categorical, string, integer, float and datetime columns
+    WHEN one worker publishes it and another calls load_or_publish for the same key
+    THEN check that the second worker attaches without building, gets identical
+    values, and numeric and categorical columns are memory-mapped
+    """
+    import numpy as np
+    from coursework2.gla_grants_app.shared_dataset import load_or_publish
+    df = pd.DataFrame({
+        'Funding_Org:Department': pd.Categorical(['Housing', 'Health', 'Housing']),
+        'Title': pd.array(['Grant A', None, 'Grant C'], dtype='str'),
+        'Duration_(Days)': np.array([30, 365, 90], dtype=np.int16),
+        'Amount_awarded': [1000.5, 250.0, np.nan],
+        'Award_Date': pd.to_datetime(['2018-01-02', '2019-05-06', '2020-07-08']),
+        'Mixed': pd.array(['a', 1, 2.5], dtype=object),
+    }, index=[5, 2, 9])
+    builds = []
+    
+    def build():
+        builds.append(1)
+        return df
+    
+    published = load_or_publish(str(tmp_path), 'v1', build)
+    attached = load_or_publish(str(tmp_path), 'v1', build)
+    
+    assert len(builds) == 1
+    pd.testing.assert_frame_equal(published, df)
+    pd.testing.assert_frame_equal(attached, df)
+    def is_mapped(array):
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return True
+            array = getattr(array, 'base', None)
+        return False
+    
+    assert is_mapped(attached['Duration_(Days)'].to_numpy())
+    assert is_mapped(attached['Award_Date'].to_numpy())
+    assert is_mapped(attached['Funding_Org:Department'].array.codes)
+    
+    load_or_publish(str(tmp_path), 'v2', build)
+    assert sorted(os.listdir(tmp_path)) == ['v2']
+
+
+def test_grants_cube_matches_row_scans(app):
+    """
+    Test the pre-aggregated year x department x duration cube.
+    
+    GIVEN the loaded grants data and a small frame whose longest duration is
+    a multiple of 100 days
+    WHEN totals, department counts and duration buckets are read from the cube
+    THEN check that they match scanning and pd.cut-ing the rows
+    """
+    from coursework2.gla_grants_app.cube import GrantsCube
+    
+    def value_counts(series):
+        # Count the decoded values, as an uncompacted column would be counted
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.cat.categories.dtype)
+        return series.value_counts()
+    
+    def scan_duration_counts(df, department):
+        if department is not None:
+            df = df[df['Funding_Org:Department'] == department]
+        bins = list(range(0, int(df['Duration_(Days)'].max()) + 100, 100))
+        categories = pd.cut(df['Duration_(Days)'], bins=bins,
+                            labels=[f"{i}-{i+99}" for i in bins[:-1]], right=False)
+        counts = df.assign(Duration_Category=categories).groupby(
+            ['Duration_Category', 'Funding_Org:Department'], observed=True
+        )['Identifier'].count().reset_index()
+        return counts.rename(columns={'Identifier': 'Count'})
+    
+    small = pd.DataFrame({
+        'Identifier': ['a', 'b', 'c', 'd', 'e'],
+        'Award_Date': pd.to_datetime(['2018-01-01', '2018-06-01', '2019-01-01', '2019-02-01', None]),
+        'Funding_Org:Department': ['Health', 'Housing', 'Health', None, 'Housing'],
+        'Amount_awarded': [10.0, 20.0, None, 40.0, 50.0],
+        'Duration_(Days)': [50, 300, 150, 250, 120],
+    })
+    small_cube = GrantsCube(small)
+    assert small_cube.totals(None) == (120.0, 5)
+    assert small_cube.totals([2019, 2019]) == (40.0, 2)
+    assert small_cube.duration_counts([2018, 2019], 'Housing').empty
+    
+    dataset = app.extensions['grants_dataset']
+    df = dataset.df
+    cube = dataset.derived['cube']
+    years = df['Award_Date'].dt.year
+    department = value_counts(df['Funding_Org:Department']).index[0]
+    for years_range in [[2016, 2019], [2020, 2020], [2010, 2030]]:
+        rows = df[(years >= years_range[0]) & (years <= years_range[1])]
+        assert cube.totals(years_range) == (
+            pytest.approx(rows['Amount_awarded'].sum()), len(rows))
+        pd.testing.assert_series_equal(
+            cube.department_counts(years_range),
+            value_counts(rows['Funding_Org:Department']), check_index_type=False)
+        for selected in [None, department]:
+            expected = scan_duration_counts(rows, selected)
+            actual = cube.duration_counts(years_range, selected)
+            assert actual['Duration_Category'].astype(str).tolist() == \
+                expected['Duration_Category'].astype(str).tolist()
+            assert actual['Funding_Org:Department'].tolist() == \
+                expected['Funding_Org:Department'].astype(str).tolist()
+            assert actual['Count'].tolist() == expected['Count'].tolist()
+
+
+def test_timeline_series_match_grouping(app, client):
+    """
+    Test the materialized timeline series.
+    
+    GIVEN the loaded grants data and its TimelineSeries
+    WHEN each granularity and a department's series are read and the
+    timeline callback is invoked
+    THEN check that they match grouping the rows and the chart plots the
+    grouped totals
+    """
+    dataset = app.extensions['grants_dataset']
+    df = dataset.df
+    timeline = dataset.derived['timeline']
+    
+    for granularity, freq in [('Y', 'YE'), ('Q', 'QE'), ('M', 'ME'), ('W', 'W')]:
+        expected = df.groupby(pd.Grouper(key='Award_Date', freq=freq))['Amount_awarded'].sum()
+        times, amounts = timeline.period_totals(granularity)
+        assert times.tolist() == expected.index.to_numpy().tolist()
+        assert amounts.tolist() == pytest.approx(expected.tolist())
+    
+    department = df['Funding_Org:Department'].iloc[0]
+    rows = df[df['Funding_Org:Department'] == department]
+    expected = rows.groupby('Award_Date')['Amount_awarded'].sum()
+    dates, amounts = timeline.department_totals(department)
+    assert dates.tolist() == expected.index.to_numpy().tolist()
+    assert amounts.tolist() == pytest.approx(expected.tolist())
+    assert len(timeline.department_totals('No such department')[0]) == 0
+    
+    figure = dash_callback(client, [('timeline-chart', 'figure')],
+                           [('timeline-aggregation', 'value', 'Y')])['timeline-chart']['figure']
+    assert len(figure['data'][0]['x']) == len(timeline.period_totals('Y')[0])
+    assert figure['layout']['title']['text'] == 'Grant Amounts Over Time (Yearly)'
+
+
+def test_table_search_index_matches_row_scan(app):
+    """
+    Test the full-text index behind the Grants Table search box.
+    
+    GIVEN the loaded grants data and its TextSearchIndex
+    WHEN plain, mixed-case, numeric, date and regular expression terms are
+    searched
+    THEN check that the rows match stringifying and scanning every row
+    """
+    dataset = app.extensions['grants_dataset']
+    df = dataset.df
+    index = dataset.derived['search_index']
+    
+    for term in ['youth', 'GRANT TO', 'th clu', '67000.0', '2019-0', 'communit(?:y|ies)', ' - ', 'zzzz']:
+        expected = df[df.apply(
+            lambda row: row.astype(str).str.contains(term, case=False).any(), axis=1)]
+        pd.testing.assert_frame_equal(index.filter(df, term), expected)
+    assert index.filter(df, '') is df
+
+
+def test_server_side_table_paging(app, client):
+    """
+    Test server-side paging, sorting and filtering of the Grants Table.
+    
+    GIVEN the dashboard with the table in custom page/sort/filter mode
+    WHEN a page is requested with a search term, a sort and a filter query,
+    and then a page past the end of the filtered rows
+    THEN check that only that page is returned and it matches searching,
+    filtering and sorting the DataFrame, and that a page past the end
+    returns the last page's rows and number
+    """
+    from coursework2.gla_grants_app.table_index import TableIndex, parse_filter_query
+    assert parse_filter_query('{Title} contains "youth club" && {Amount_awarded} >= 1000 && bad') == [
+        ('Title', 'contains', 'youth club'), ('Amount_awarded', 'ge', '1000')]
+    
+    dataset = app.extensions['grants_dataset']
+    df = dataset.df
+    department = df['Funding_Org:Department'].iloc[0]
+    response = dash_callback(
+        client,
+        [('department-table', 'data'), ('department-table', 'page_count'),
+         ('department-table', 'page_current')],
+        [('table-search', 'value', 'grant'), ('department-table', 'page_current', 1),
+         ('department-table', 'page_size', 10),
+         ('department-table', 'sort_by', [{'column_id': 'Amount_awarded', 'direction': 'desc'}]),
+         ('department-table', 'filter_query',
+          f'{{Funding_Org:Department}} = "{department}" && {{Award_Date}} datestartswith 20')])
+    
+    expected = dataset.derived['search_index'].filter(df, 'grant')
+    expected = expected[(expected['Funding_Org:Department'] == department)
+                        & (expected['Award_Date'].dt.year >= 2000)]
+    expected = expected.sort_values('Amount_awarded', ascending=False, kind='stable')
+    table = response['department-table']
+    assert table['page_count'] == -(-len(expected) // 10)
+    assert table['page_current'] == 1
+    assert [row['Identifier'] for row in table['data']] == expected['Identifier'].iloc[10:20].tolist()
+    
+    # A page left behind by a narrower filter shows the new last page
+    late = dash_callback(
+        client,
+        [('department-table', 'data'), ('department-table', 'page_count'),
+         ('department-table', 'page_current')],
+        [('table-search', 'value', 'grant'), ('department-table', 'page_current', 500),
+         ('department-table', 'page_size', 10),
+         ('department-table', 'sort_by', [{'column_id': 'Amount_awarded', 'direction': 'desc'}]),
+         ('department-table', 'filter_query', f'{{Funding_Org:Department}} = "{department}"')])
+    narrowed = dataset.derived['search_index'].filter(df, 'grant')
+    narrowed = narrowed[narrowed['Funding_Org:Department'] == department].sort_values(
+        'Amount_awarded', ascending=False, kind='stable')
+    table = late['department-table']
+    last_page = -(-len(narrowed) // 10) - 1
+    assert table['page_current'] == last_page < 500
+    assert [row['Identifier'] for row in table['data']] == narrowed['Identifier'].iloc[last_page * 10:].tolist()
+    
+    mixed = pd.DataFrame({'Number': pd.array([5, 'a', None, 2.5, 5], dtype=object)})
+    index = TableIndex(mixed)
+    assert index.orders['Number']['asc'].tolist() == [3, 0, 4, 1, 2]
+    assert index.orders['Number']['desc'].tolist() == [1, 0, 4, 3, 2]
+    page, matches, page_current = index.page(mixed, filter_query='{Number} = 5.0', page_current=3, page_size=1)
+    assert matches == 2 and page_current == 1 and page.index.tolist() == [4]
+
+
+def test_layout_served_with_etag(app, client):
+    """
+    Test the cached Dash layout response.
+    
+    GIVEN the loaded dashboard
+    WHEN the layout is requested, then requested again with its ETag
+    THEN check that it carries no table records, is cached with an ETag tied
+    to the dataset, and revalidation returns 304 Not Modified
+    """
+    response = client.get('/dash/_dash-layout')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+    layout = response.get_json()
+    assert b'"data":[]' in response.data
+    assert b'department-table' in response.data
+    
+    revalidated = client.get('/dash/_dash-layout', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert client.get('/dash/_dash-layout').get_json() == layout
+
+
+def test_lru_cache_eviction_ttl_and_threads():
+    """
+    Test the bounded LRU cache used for rendered word clouds.
+    
+    GIVEN a cache with two slots, a TTL and a controllable clock
+    WHEN entries are added, read, aged and accessed from many threads
+    THEN check LRU eviction, expiry and that the hit/miss counters add up
+    """
+    from coursework2.gla_grants_app.caching import LRUCache
+    now = [0.0]
+    cache = LRUCache(2, ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    now[0] = 10
+    assert cache.get('c') is None
+    assert cache.stats() == {'size': 1, 'maxsize': 2, 'ttl': 10, 'hits': 2,
+                             'misses': 2, 'evictions': 1, 'expirations': 1}
+    
+    shared = LRUCache(8)
+    calls = []
+    
+    def worker(offset):
+        for i in range(200):
+            shared.get_or_compute((offset + i) % 16, lambda: calls.append(1) or i)
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = shared.stats()
+    assert stats['hits'] + stats['misses'] == 1600
+    assert stats['misses'] == len(calls)
+    assert stats['size'] <= 8
+
+
+def test_wordcloud_cache_reuses_rendered_images(app, client):
+    """
+    Test that word clouds are rendered once per department selection.
+    
+    GIVEN the dashboard with an empty word cloud cache
+    WHEN the same departments are selected twice in a different order
+    THEN check that the second request is served from the cache and the
+    counters are reported by /health
+    """
+    cache = app.extensions['wordcloud_cache']
+    cache.clear()
+    before = cache.stats()
+    departments = app.extensions['grants_dataset'].df['Funding_Org:Department'].unique()[:2].tolist()
+    
+    first = dash_callback(client, [('wordcloud', 'src')],
+                          [('wordcloud-department-selector', 'value', departments)])
+    second = dash_callback(client, [('wordcloud', 'src')],
+                           [('wordcloud-department-selector', 'value', departments[::-1])])
+    
+    assert first == second
+    assert first['wordcloud']['src'].startswith('/wordcloud/')
+    stats = client.get('/health').get_json()['wordcloud_cache']
+    assert stats['misses'] == before['misses'] + 1
+    assert stats['hits'] == before['hits'] + 1
+
+
+def test_title_frequencies_match_wordcloud_tokenisation(app):
+    """
+    Test the precomputed per-department word cloud frequencies.
+    
+    GIVEN the loaded grants data and its TitleFrequencies tables
+    WHEN frequencies are merged for several department selections
+    THEN check that they equal WordCloud's own tokenisation of the joined
+    titles, including collocations and word order
+    """
+    dataset = app.extensions['grants_dataset']
+    df = dataset.df
+    frequencies = dataset.derived['title_frequencies']
+    wordcloud = make_wordcloud()
+    departments = df['Funding_Org:Department'].value_counts().index.tolist()
+    
+    for selected in [None, departments[:1], departments[1:3][::-1], departments, ['No such department']]:
+        expected_titles = df['Title'] if not selected else df.loc[df['Funding_Org:Department'].isin(selected), 'Title']
+        expected = wordcloud.process_text(' '.join(expected_titles.dropna()))
+        assert list(frequencies.frequencies(selected).items()) == list(expected.items())
+
+
+def test_wordcloud_served_by_content_hash(app, client, tmp_path):
+    """
+    Test that word clouds are sent as URLs of immutable, hashed images.
+    
+    GIVEN the dashboard
+    WHEN a word cloud is rendered, rendered again after its cache entry and
+    image are dropped, and its URL is fetched twice
+    THEN check that the callback returns only the URL, rendering is
+    deterministic so the URL is unchanged, the image is served with its
+    SHA-256 as a strong ETag and immutable cache headers, the revalidation
+    gets a 304 Not Modified, and the store keeps at most max_files images
+    """
+    departments = app.extensions['grants_dataset'].df['Funding_Org:Department'].unique()[:1].tolist()
+    response = dash_callback(client, [('wordcloud', 'src')],
+                             [('wordcloud-department-selector', 'value', departments)])
+    url = response['wordcloud']['src']
+    assert len(url) < 100
+    
+    image = client.get(url)
+    assert image.status_code == 200
+    assert image.mimetype == 'image/png'
+    assert image.data.startswith(b'\x89PNG')
+    digest = hashlib.sha256(image.data).hexdigest()
+    assert url == f'/wordcloud/{digest}.png'
+    assert image.headers['ETag'] == f'"{digest}"'
+    assert 'immutable' in image.headers['Cache-Control']
+    assert 'max-age=31536000' in image.headers['Cache-Control']
+    
+    revalidated = client.get(url, headers={'If-None-Match': image.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert client.get('/wordcloud/' + '0' * 64 + '.png').status_code == 404
+    assert client.get('/wordcloud/../config.png').status_code == 404
+    
+    # The same selection renders the same bytes, so the URL survives a
+    # cache clear and a pruned image is rendered again
+    os.remove(app.extensions['wordcloud_images'].path(digest, 'png'))
+    rerendered = dash_callback(client, [('wordcloud', 'src')],
+                               [('wordcloud-department-selector', 'value', departments)])
+    assert rerendered['wordcloud']['src'] == url
+    assert client.get(url).status_code == 200
+    app.extensions['wordcloud_cache'].clear()
+    rerendered = dash_callback(client, [('wordcloud', 'src')],
+                               [('wordcloud-department-selector', 'value', departments)])
+    assert rerendered['wordcloud']['src'] == url
+    
+    # The least recently stored or looked up images are pruned first
+    store = ImageStore(str(tmp_path), max_files=2)
+    digests = []
+    for i in range(2):
+        digests.append(store.put(f'image {i}'.encode(), 'png'))
+        os.utime(os.path.join(tmp_path, f'{digests[-1]}.png'), (i, i))
+    assert store.put(b'image 0', 'png') == digests[0]
+    digests.append(store.put(b'image 2', 'png'))
+    assert os.listdir(tmp_path).count(f'{digests[1]}.png') == 0
+    for i in (0, 2):
+        os.utime(os.path.join(tmp_path, f'{digests[i]}.png'), (i, i))
+    assert store.path(digests[0], 'png') is not None
+    digests.append(store.put(b'image 3', 'png'))
+    assert sorted(os.listdir(tmp_path)) == sorted(f'{d}.png' for d in (digests[0], digests[3]))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_render_pool_latest_wins_and_timeouts():
+    """
+    Test the render pool used for heavy dashboard callbacks.
+    
+    GIVEN an inline render pool with a render in progress on a channel
+    WHEN two more requests arrive on that channel before it finishes
+    THEN check that only the newest of them renders, and that a process pool
+    renders in worker processes and gives up on renders exceeding the timeout,
+    and that no state is kept for channels without pending requests
+    """
+    pool = RenderPool(workers=0, timeout=5)
+    release = threading.Event()
+    rendered = []
+    
+    def render(value):
+        if value == 'first':
+            release.wait(5)
+        rendered.append(value)
+        return value
+    
+    results = {}
+    
+    def request(value):
+        try:
+            results[value] = pool.run('slider', render, value)
+        except RenderSuperseded:
+            results[value] = 'superseded'
+    
+    threads = [threading.Thread(target=request, args=(value,)) for value in ['first', 'second', 'third']]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(10)
+    
+    assert rendered == ['first', 'third']
+    assert results == {'first': 'first', 'second': 'superseded', 'third': 'third'}
+    assert pool.run('other', render, 'other') == 'other'
+    assert pool.stats()['superseded'] == 1
+    # Channels without pending requests are forgotten
+    assert not pool._latest and not pool._channel_locks and not pool._pending
+    
+    workers = RenderPool(workers=1, timeout=2)
+    try:
+        assert workers.run('pid', os.getpid) != os.getpid()
+        with pytest.raises(RenderTimeout):
+            workers.run('sleep', time.sleep, 5)
+        assert workers.stats()['timeouts'] == 1
+    finally:
+        workers.close()
+
+
+def test_sqlite_cache_and_callback_memo(tmp_path):
+    """
+    Test the shared on-disk cache and the callback memoization decorator.
+    
+    GIVEN two SQLiteCache instances on the same file and a memoized function
+    WHEN values are stored, evicted and expired, and the function is called
+    again with equal inputs before and after the dataset version changes
+    THEN check that entries are shared between instances, evicted least
+    recently used first, recomputed only after a version change, and
+    counted per callback
+    """
+    now = [0.0]
+    path = str(tmp_path / 'cache' / 'callbacks.sqlite')
+    cache = SQLiteCache(path, maxsize=2, ttl=10, clock=lambda: now[0])
+    other_process = SQLiteCache(path, maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', {'figure': [1, 2]})
+    now[0] = 1
+    cache.set('b', 'b')
+    now[0] = 2
+    assert other_process.get('a') == {'figure': [1, 2]}
+    now[0] = 3
+    cache.set('c', 'c')
+    assert other_process.get('b') is None
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+    now[0] = 20
+    assert cache.get('a') is None and cache.stats()['expirations'] == 1
+    
+    version = ['v1']
+    calls = []
+    memo = CallbackMemo(cache, version=lambda: version[0])
+    
+    @memo
+    def total(years_range, click_data=None):
+        calls.append(years_range)
+        return sum(years_range)
+    
+    assert total([2016, 2020]) == total([2016, 2020]) == 4036
+    assert total([2017, 2020]) == 4037
+    version[0] = 'v2'
+    assert total([2016, 2020]) == 4036
+    version[0] = None
+    assert total([2016, 2020]) == 4036
+    assert calls == [[2016, 2020], [2017, 2020], [2016, 2020], [2016, 2020]]
+    assert memo.stats()['callbacks']['total'] == {'hits': 1, 'misses': 3, 'hit_rate': 0.25}
+
+
+def test_dash_callbacks_are_memoized(app, client):
+    """
+    Test that pure dashboard callbacks are served from the callback cache.
+    
+    GIVEN the dashboard
+    WHEN the timeline chart is requested twice with the same aggregation
+    THEN check that the responses are identical and /health reports a hit
+    for the timeline callback
+    """
+    before = client.get('/health').get_json()['callback_cache']['callbacks']['update_timeline_chart']
+    first = dash_callback(client, [('timeline-chart', 'figure')], [('timeline-aggregation', 'value', 'Q')])
+    second = dash_callback(client, [('timeline-chart', 'figure')], [('timeline-aggregation', 'value', 'Q')])
+    after = client.get('/health').get_json()['callback_cache']['callbacks']['update_timeline_chart']
+    
+    assert first == second
+    assert after['hits'] >= before['hits'] + 1
+    assert after['hits'] + after['misses'] == before['hits'] + before['misses'] + 2
+
+
+def test_startup_warmup_fills_caches(tmp_path, data_cache_dir):
+    """
+    Test warming the dashboard caches in the background after startup.
+    
+    GIVEN an app created with DASH_WARMUP
+    WHEN the warmup has finished
+    THEN check that readiness reports its progress, and that the default
+    dashboard states are then served from the caches
+    """
+    warm_app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'WORDCLOUD_IMAGE_DIR': str(tmp_path / 'wordclouds'),
+        'DATA_CACHE_DIR': data_cache_dir,
+        'DASH_WARMUP': True,
+    })
+    warm_client = warm_app.test_client()
+    warmup = warm_app.extensions['dashboard_warmup']
+    assert warmup.wait(120)
+    
+    response = warm_client.get('/health/ready')
+    assert response.status_code == 200
+    status = response.get_json()['warmup']
+    assert status['state'] == 'done'
+    assert status['completed'] == status['total'] == 8
+    assert status['failed'] == []
+    
+    before = warm_client.get('/health').get_json()
+    for aggregation in ['Y', 'Q', 'M']:
+        dash_callback(warm_client, [('timeline-chart', 'figure')],
+                      [('timeline-aggregation', 'value', aggregation)])
+    dash_callback(warm_client, [('top-grants-sunburst', 'figure')], [('top-n-slider', 'value', 10)])
+    dash_callback(warm_client, [('wordcloud', 'src')], [('wordcloud-department-selector', 'value', None)])
+    after = warm_client.get('/health').get_json()
+    
+    callbacks = after['callback_cache']['callbacks']
+    assert callbacks['update_timeline_chart']['misses'] == before['callback_cache']['callbacks']['update_timeline_chart']['misses']
+    assert callbacks['update_timeline_chart']['hits'] == 3
+    assert callbacks['update_top_grants_sunburst']['hits'] == 1
+    assert after['wordcloud_cache']['hits'] == before['wordcloud_cache']['hits'] + 1
+
+
+def test_top_grants_ranking_matches_nlargest(app):
+    """
+    Test the precomputed ranking behind the top-N sunburst.
+    
+    GIVEN the loaded grants data and its TopGrants ranking
+    WHEN the top N rows are taken for several values of N
+    THEN check that they equal nlargest of the grouped totals, including the
+    order of equal amounts
+    """
+    from coursework2.gla_grants_app.compact import decode_categoricals
+    dataset = app.extensions['grants_dataset']
+    aggregated = dataset.df.groupby(
+        ['Title', 'Funding_Org:Department'], as_index=False, observed=True
+    )['Amount_awarded'].sum()
+    top_grants = dataset.derived['top_grants']
+    
+    for n in [0, 2, 10, 20, 500, len(aggregated), len(aggregated) + 1]:
+        pd.testing.assert_frame_equal(
+            top_grants.top(n), decode_categoricals(aggregated.nlargest(n, 'Amount_awarded')))
+
+
+def apply_patch(figure, patch):
+    """
+    Apply the operations of a serialised Dash Patch to a figure.
+    
+    Args:
+        figure (dict): Figure to update in place.
+        patch (dict): Serialised Patch with Assign and Delete operations.
+    
+    Returns:
+        dict: The updated figure.
+    """
+    for operation in patch['operations']:
+        *path, last = operation['location']
+        target = figure
+        for key in path:
+            target = target[key]
+        if operation['operation'] == 'Assign':
+            target[last] = operation['params']['value']
+        else:
+            assert operation['operation'] == 'Delete'
+            del target[last]
+    return figure
+
+
+def test_figure_callbacks_send_patches_after_first_render(app, client):
+    """
+    Test partial updates of the interactive timeline and department charts.
+    
+    GIVEN the dashboard charts rendered once
+    WHEN another department or year range is selected
+    THEN check that only a smaller Patch replacing the traces is sent, and
+    that applying it to the shown figures gives the figures a first render
+    would send
+    """
+    departments = app.extensions['grants_dataset'].df['Funding_Org:Department'].value_counts().index
+    timeline = [('interactive-timeline', 'figure'), ('interactive-timeline-shown', 'data')]
+    first = dash_callback(client, timeline, [('department-selector', 'value', departments[0])],
+                          [('interactive-timeline-shown', 'data', None)])
+    shown = first['interactive-timeline-shown']['data']
+    assert shown['kinds'] == [['scatter']]
+    
+    for department in departments[1:4]:
+        update = dash_callback(client, timeline, [('department-selector', 'value', department)],
+                               [('interactive-timeline-shown', 'data', shown)])
+        full = dash_callback(client, timeline, [('department-selector', 'value', department)],
+                             [('interactive-timeline-shown', 'data', None)])
+        patch = update['interactive-timeline']['figure']
+        assert '__dash_patch_update' in patch
+        assert [operation['location'] for operation in patch['operations']] == [['data']]
+        assert len(json.dumps(patch)) < len(json.dumps(full['interactive-timeline']['figure'])) / 2
+        assert apply_patch(copy.deepcopy(first['interactive-timeline']['figure']), patch) == \
+            full['interactive-timeline']['figure']
+    
+    charts = [('department-pie-chart', 'figure'), ('department-duration-chart', 'figure'),
+              ('department-charts-shown', 'data')]
+    first = dash_callback(client, charts, [('department-year-slider', 'value', [2016, 2019]),
+                                           ('department-pie-chart', 'clickData', None)],
+                          [('department-charts-shown', 'data', None)])
+    inputs = [('department-year-slider', 'value', [2018, 2022]),
+              ('department-pie-chart', 'clickData', {'points': [{'label': departments[0]}]})]
+    update = dash_callback(client, charts, inputs,
+                           [('department-charts-shown', 'data', first['department-charts-shown']['data'])])
+    full = dash_callback(client, charts, inputs, [('department-charts-shown', 'data', None)])
+    for chart in ['department-pie-chart', 'department-duration-chart']:
+        assert '__dash_patch_update' in update[chart]['figure']
+        assert apply_patch(copy.deepcopy(first[chart]['figure']), update[chart]['figure']) == \
+            full[chart]['figure']
+
+
+def test_admin_dashboard_pages_and_filters(app, client, logged_in_admin, db_session):
+    """
+    Test the paginated, filtered admin dashboard.
+    
+    GIVEN a logged-in admin and 25 applications, some reviewed
+    WHEN the dashboard is paged through and filtered by status and category
+    THEN check that the summary counts cover every application, each page
+    holds at most ADMIN_PAGE_SIZE applications in order, and the filters and
+    keyset links select the right applications
+    """
+    db_session.query(GrantApplication).delete()
+    prefix = uuid.uuid4().hex[:8]
+    for i in range(25):
+        db_session.add(GrantApplication(
+            user_id=logged_in_admin.id,
+            title=f'{prefix} application {i:02d}',
+            description='Application description',
+            category='Health' if i % 5 == 0 else 'Community',
+            question='Application question',
+            comment='Looks good' if i % 3 == 0 else ('' if i % 3 == 1 else None),
+            date_submitted=date.today(),
+        ))
+    db_session.commit()
+    ids = [a.id for a in db_session.query(GrantApplication).order_by(GrantApplication.id)]
+    app.config['ADMIN_PAGE_SIZE'] = 10
+    
+    def titles(response):
+        return re.findall(rf'{prefix} application (\d+)', response.get_data(as_text=True))
+    
+    try:
+        first = client.get('/admin-dashboard')
+        page = first.get_data(as_text=True)
+        assert [int(n) for n in titles(first)] == list(range(10))
+        assert re.search(r'Total Applications</h5>\s*<p class="card-text display-6">25<', page)
+        assert re.search(r'Reviewed</h5>\s*<p class="card-text display-6">9<', page)
+        assert re.search(r'Pending Review</h5>\s*<p class="card-text display-6">16<', page)
+        
+        second = client.get(f'/admin-dashboard?after={ids[9]}')
+        assert [int(n) for n in titles(second)] == list(range(10, 20))
+        assert f'before={ids[10]}' in second.get_data(as_text=True)
+        previous = client.get(f'/admin-dashboard?before={ids[10]}')
+        assert titles(previous) == titles(first)
+        last = client.get(f'/admin-dashboard?after={ids[19]}')
+        assert [int(n) for n in titles(last)] == list(range(20, 25))
+        
+        reviewed = client.get('/admin-dashboard?status=reviewed')
+        assert [int(n) for n in titles(reviewed)] == [i for i in range(25) if i % 3 == 0]
+        pending_health = client.get('/admin-dashboard?status=pending&category=Health')
+        assert [int(n) for n in titles(pending_health)] == [5, 10, 20]
+    finally:
+        app.config.pop('ADMIN_PAGE_SIZE')
+        db_session.query(GrantApplication).delete()
+        db_session.commit()
+
+
+def test_admin_review_stores_blank_feedback_as_none(client, logged_in_admin, db_session):
+    """
+    Test that submitting empty feedback leaves an application pending.
+    
+    GIVEN a logged-in admin and an application
+    WHEN empty feedback is submitted for it
+    THEN check that the comment is stored as NULL
+    """
+    application = GrantApplication(
+        user_id=logged_in_admin.id,
+        title=f'Test Application {uuid.uuid4().hex[:8]}',
+        description='Application description',
+        category='Community',
+        question='Application question',
+        comment='Earlier feedback',
+        date_submitted=date.today()
+    )
+    db_session.add(application)
+    db_session.commit()
+    
+    client.post(f'/admin-review/{application.id}', data={'comment': ''})
+    db_session.expire_all()
+    assert db_session.get(GrantApplication, application.id).comment is None
+
+
+def test_schema_upgrade_migrates_legacy_database(tmp_path):
+    """
+    Test the in-place upgrade of a database created before the schema change.
+    
+    GIVEN an SQLite file with the old grant_applications table (TEXT dates,
+    empty comments and no indexes)
+    WHEN the schema is upgraded, twice
+    THEN check that the rows are kept, date_submitted is a DATE column read
+    back as dates, empty comments are NULL, the indexes exist and the second
+    upgrade does nothing
+    """
+    path = tmp_path / 'legacy.sqlite'
+    legacy = sqlite3.connect(path)
+    legacy.executescript("""
+        CREATE TABLE users (id INTEGER NOT NULL, username VARCHAR(50) NOT NULL,
+            password VARCHAR(100) NOT NULL, is_admin BOOLEAN NOT NULL,
+            PRIMARY KEY (id), UNIQUE (username));
+        CREATE TABLE grant_applications (id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+            title TEXT NOT NULL, description TEXT NOT NULL, category TEXT NOT NULL,
+            question TEXT NOT NULL, comment TEXT, date_submitted TEXT NOT NULL,
+            PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id));
+        INSERT INTO users VALUES (1, 'user2', 'hash', 0);
+        INSERT INTO grant_applications VALUES
+            (1, 1, 'First', 'Description', 'Arts', 'Question', 'Approved', '2025-03-30'),
+            (2, 1, 'Second', 'Description', 'Community', 'Question', '', '2025-03-31 14:05:00'),
+            (3, 1, 'Third', 'Description', 'Health', 'Question', NULL, '2025-04-01');
+    """)
+    legacy.close()
+    engine = create_engine(f'sqlite:///{path}')
+    
+    try:
+        assert upgrade_schema(engine) == 0
+        assert upgrade_schema(engine) == SCHEMA_VERSION
+        
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA user_version').scalar() == SCHEMA_VERSION
+            types = {row[1]: row[2] for row in connection.exec_driver_sql('PRAGMA table_info(grant_applications)')}
+            assert types['date_submitted'] == 'DATE'
+            indexes = {row[1] for row in connection.exec_driver_sql('PRAGMA index_list(grant_applications)')}
+            assert {index.name for index in GrantApplication.__table__.indexes} <= indexes
+            tables = {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            assert 'grant_applications_old' not in tables
+            # Applications stored before the upgrade are searchable
+            matches = connection.exec_driver_sql(
+                "SELECT rowid FROM grant_applications_fts WHERE grant_applications_fts MATCH 'second'").all()
+            assert matches == [(2,)]
+        
+        with Session(engine) as session:
+            applications = session.query(GrantApplication).order_by(GrantApplication.id).all()
+            assert [(a.title, a.comment, a.date_submitted) for a in applications] == [
+                ('First', 'Approved', date(2025, 3, 30)),
+                ('Second', None, date(2025, 3, 31)),
+                ('Third', None, date(2025, 4, 1)),
+            ]
+    finally:
+        engine.dispose()
+
+
+
+def test_schema_upgrade_refuses_malformed_dates(tmp_path):
+    """
+    Test the schema upgrade of a legacy database holding a malformed date.
+    
+    GIVEN an SQLite file with the old grant_applications table in which one
+    date_submitted is not a date
+    WHEN the schema is upgraded
+    THEN check that the upgrade fails naming the application and its value,
+    and leaves the database unchanged
+    """
+    path = tmp_path / 'legacy.sqlite'
+    legacy = sqlite3.connect(path)
+    legacy.executescript("""
+        CREATE TABLE grant_applications (id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+            title TEXT NOT NULL, description TEXT NOT NULL, category TEXT NOT NULL,
+            question TEXT NOT NULL, comment TEXT, date_submitted TEXT NOT NULL,
+            PRIMARY KEY (id));
+        INSERT INTO grant_applications VALUES
+            (1, 1, 'First', 'Description', 'Arts', 'Question', NULL, '2025-03-30'),
+            (2, 1, 'Second', 'Description', 'Arts', 'Question', '', '31/03/2025');
+    """)
+    legacy.close()
+    engine = create_engine(f'sqlite:///{path}')
+    
+    try:
+        with pytest.raises(SchemaUpgradeError, match=r"1 application\(s\): 2 \('31/03/2025'\)"):
+            upgrade_schema(engine)
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA user_version').scalar() == 0
+            types = {row[1]: row[2] for row in connection.exec_driver_sql('PRAGMA table_info(grant_applications)')}
+            assert types['date_submitted'] == 'TEXT'
+            assert connection.exec_driver_sql(
+                'SELECT date_submitted, comment FROM grant_applications WHERE id = 2').one() == ('31/03/2025', '')
+    finally:
+        engine.dispose()
+
+def test_application_queries_use_indexes(app):
+    """
+    Test the query plans of the account history and admin dashboard queries.
+    
+    GIVEN the app's upgraded schema
+    WHEN the account history and the admin dashboard pages run their queries
+    THEN check that SQLite searches the matching index for each of them
+    instead of scanning the table, and sorts none of them separately
+    """
+    statements = []
+    
+    def record(connection, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    
+    def plan(statement, parameters):
+        rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return ' / '.join(row[3] for row in rows)
+    
+    expected = {
+        'history': 'SEARCH grant_applications USING INDEX ix_grant_applications_user_id_date_submitted (user_id=?)',
+        'pending': 'USING INDEX ix_grant_applications_pending',
+        'pending_after': 'SEARCH grant_applications USING INDEX ix_grant_applications_pending (id>?)',
+        'category_after': 'SEARCH grant_applications USING INDEX ix_grant_applications_category_id (category=? AND id>?)',
+        'category_before': 'SEARCH grant_applications USING INDEX ix_grant_applications_category_id (category=? AND id<?)',
+    }
+    queries = {
+        'history': lambda: db.session.execute(
+            db.select(GrantApplication).filter_by(user_id=1).order_by(GrantApplication.date_submitted.desc())
+        ).all(),
+        'pending': lambda: application_page(status='pending'),
+        'pending_after': lambda: application_page(status='pending', after=10),
+        'category_after': lambda: application_page(category='Community', after=10),
+        'category_before': lambda: application_page(category='Community', before=50),
+    }
+    
+    with app.app_context():
+        for name, query in queries.items():
+            statements.clear()
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                query()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            assert len(statements) == 1
+            query_plan = plan(*statements[0])
+            assert expected[name] in query_plan, (name, query_plan)
+            assert 'TEMP B-TREE' not in query_plan, (name, query_plan)
+
+
+def test_sqlite_profile_applied_to_connections(app, tmp_path):
+    """
+    Test the SQLite performance profile.
+    
+    GIVEN the app's engine and engines on database files with and without
+    the profile
+    WHEN their connections' pragmas are read
+    THEN check that the app's connections use the profile, a file database
+    with the profile is in WAL mode with every pragma set, and one without
+    keeps SQLite's defaults
+    """
+    with app.app_context():
+        pragmas = sqlite_pragmas(db.session.connection())
+    assert pragmas['synchronous'] == 1  # NORMAL
+    assert pragmas['busy_timeout'] == PERFORMANCE_PRAGMAS['busy_timeout']
+    assert pragmas['cache_size'] == PERFORMANCE_PRAGMAS['cache_size']
+    
+    tuned = create_engine(f"sqlite:///{tmp_path / 'tuned.sqlite'}")
+    plain = create_engine(f"sqlite:///{tmp_path / 'plain.sqlite'}")
+    try:
+        assert apply_sqlite_pragmas(tuned)
+        assert not apply_sqlite_pragmas(plain, {})
+        with tuned.connect() as connection:
+            assert sqlite_pragmas(connection) == {
+                'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+                'cache_size': -16384, 'mmap_size': 134217728,
+            }
+        with plain.connect() as connection:
+            pragmas = sqlite_pragmas(connection)
+            assert pragmas['journal_mode'] == 'delete'
+            assert pragmas['synchronous'] == 2  # FULL
+    finally:
+        tuned.dispose()
+        plain.dispose()
+
+
+def test_admin_search_ranks_and_highlights_applications(app, client, logged_in_admin, db_session):
+    """
+    Test the admin full-text search endpoint.
+    
+    GIVEN a logged-in admin and applications mentioning a word in their
+    title, description or question, one of them containing HTML
+    WHEN the search endpoint is queried, paged, and the applications are
+    edited and deleted
+    THEN check that title matches rank first, snippets are escaped with the
+    matches marked, prefixes and word stems match, pages do not overlap,
+    only the newest matches are ranked beyond the rank limit, edits and
+    deletions are reflected, the query searches the full-text index, and
+    non-admins are refused
+    """
+    word = f'allot{uuid.uuid4().hex[:8]}'
+    texts = [
+        ('Garden project', f'Plots for the {word} gardens <b>next</b> year', 'Question'),
+        (f'Community {word}', 'Description', 'Question'),
+        ('Youth club', 'Description', f'Can the {word} host us?'),
+        ('Unrelated', 'Nothing to see', 'Question'),
+    ]
+    applications = [
+        GrantApplication(user_id=logged_in_admin.id, title=title, description=description,
+                         category='Community', question=question, date_submitted=date.today())
+        for title, description, question in texts
+    ]
+    db_session.add_all(applications)
+    db_session.commit()
+    app.config['ADMIN_PAGE_SIZE'] = 2
+    
+    try:
+        first = client.get(f'/admin-search?q={word}').get_json()
+        second = client.get(f'/admin-search?q={word}&page=2').get_json()
+        assert [r['id'] for r in first['results']][0] == applications[1].id
+        assert first['has_next'] and not first['has_previous']
+        assert second['has_previous'] and not second['has_next']
+        found = [r['id'] for r in first['results'] + second['results']]
+        assert sorted(found) == sorted(a.id for a in applications[:3])
+        
+        garden = next(r for r in first['results'] + second['results'] if r['id'] == applications[0].id)
+        assert f'<mark>{word}</mark>' in garden['snippet']
+        assert '&lt;b&gt;next&lt;/b&gt;' in garden['snippet']
+        assert garden['reviewed'] is False
+        assert garden['url'] == f'/admin-dashboard?after={applications[0].id - 1}#heading{applications[0].id}'
+        assert not first['truncated']
+        
+        # Only the newest matches are ranked once there are more than the limit
+        app.config['ADMIN_SEARCH_RANK_LIMIT'] = 2
+        capped = client.get(f'/admin-search?q={word}').get_json()
+        assert capped['truncated'] and capped['rank_limit'] == 2
+        assert {r['id'] for r in capped['results']} == {applications[1].id, applications[2].id}
+        app.config.pop('ADMIN_SEARCH_RANK_LIMIT')
+        
+        # The last word may be incomplete, and words match their stems
+        assert {r['id'] for r in client.get(f'/admin-search?q=garden {word[:7]}').get_json()['results']} == {applications[0].id}
+        assert client.get('/admin-search?q=" OR *').get_json()['results'] == []
+        
+        applications[3].title = f'Now about {word}'
+        db_session.delete(applications[1])
+        db_session.commit()
+        app.config['ADMIN_PAGE_SIZE'] = 20
+        results = client.get(f'/admin-search?q={word}').get_json()['results']
+        assert {r['id'] for r in results} == {applications[0].id, applications[2].id, applications[3].id}
+        
+        with app.app_context():
+            plan = ' / '.join(row[3] for row in db.session.execute(
+                db.text(f'EXPLAIN QUERY PLAN {application_search._SEARCH_SQL}'),
+                {'expression': f'"{word}"', 'rank_limit': 5000, 'limit': 21, 'offset': 0}))
+        assert 'SCAN grant_applications_fts VIRTUAL TABLE INDEX' in plan
+        assert not re.search(r'SCAN grant_applications\b', plan)
+        assert 'SEARCH grant_applications USING INTEGER PRIMARY KEY' in plan
+        
+        client.get('/logout')
+        assert client.get(f'/admin-search?q={word}').status_code == 403
+    finally:
+        app.config.pop('ADMIN_PAGE_SIZE', None)
+        app.config.pop('ADMIN_SEARCH_RANK_LIMIT', None)
+
+
+def test_admin_bulk_review_single_transaction(app, client, logged_in_admin, db_session):
+    """
+    Test the bulk admin review API.
+    
+    GIVEN a logged-in admin and five applications
+    WHEN batches of reviews are posted, valid and invalid
+    THEN check that a valid batch is stored with a single executemany
+    UPDATE and summarised, that a batch with any invalid review is rejected
+    with per-review errors and stores nothing, and that malformed,
+    oversized and non-admin requests are refused
+    """
+    applications = [
+        GrantApplication(user_id=logged_in_admin.id, title=f'Bulk application {i}', description='Description',
+                         category='Community', question='Question', comment='Old feedback' if i == 4 else None,
+                         date_submitted=date.today())
+        for i in range(5)
+    ]
+    db_session.add_all(applications)
+    db_session.commit()
+    ids = [a.id for a in applications]
+    statements = []
+    
+    def record(connection, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE'):
+            statements.append((statement, executemany))
+    
+    def comments():
+        db_session.expire_all()
+        return [db_session.get(GrantApplication, i).comment for i in ids]
+    
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = client.post('/admin-reviews', json={'reviews': [
+                {'application_id': ids[0], 'comment': 'Approved'},
+                {'application_id': ids[1], 'comment': 'Needs a budget'},
+                {'application_id': ids[4], 'comment': ''},
+            ]})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data['updated'], data['reviewed'], data['cleared']) == (3, 2, 1)
+    assert set(data['summary']) == {'total', 'reviewed', 'pending'}
+    assert len(statements) == 1 and statements[0][1]
+    assert comments() == ['Approved', 'Needs a budget', None, None, None]
+    
+    response = client.post('/admin-reviews', json={'reviews': [
+        {'application_id': ids[2], 'comment': 'Fine'},
+        {'application_id': str(ids[3]), 'comment': 'Fine'},
+        {'application_id': ids[2], 'comment': 'Again'},
+        {'application_id': max(ids) + 1000, 'comment': 'Missing'},
+        {'application_id': ids[3], 'comment': 42},
+        'not a review',
+    ]})
+    assert response.status_code == 400
+    assert [error['index'] for error in response.get_json()['errors']] == [1, 2, 3, 4, 5]
+    assert comments() == ['Approved', 'Needs a budget', None, None, None]
+    
+    assert client.post('/admin-reviews', json=[{'application_id': ids[2]}]).status_code == 400
+    assert client.post('/admin-reviews', data='not json').status_code == 400
+    app.config['ADMIN_BULK_REVIEW_LIMIT'] = 1
+    try:
+        assert client.post('/admin-reviews', json={'reviews': [{}, {}]}).status_code == 413
+    finally:
+        app.config.pop('ADMIN_BULK_REVIEW_LIMIT')
+    client.get('/logout')
+    assert client.post('/admin-reviews', json={'reviews': []}).status_code == 403
+
+
 @pytest.mark.selenium
 @pytest.mark.skipif("GITHUB_ACTIONS" in os.environ, reason="Skipping Selenium tests in CI")
 def test_login_flow_with_selenium(chrome_driver, flask_server, db_session):